@@ -0,0 +1,110 @@
+"""
+gzip/brotli response compression
+"""
+
+import gzip
+from typing import Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Parquet pages and images are already compressed; everything else here shrinks well
+COMPRESSIBLE_TYPES = (
+    'application/json', 'application/msgpack', 'application/cbor',
+    'application/vnd.apache.arrow.stream', 'text/'
+)
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """'br' or 'gzip' by the client's q-values, preferring brotli on a tie"""
+    qualities = {}
+    for part in accept_encoding.split(','):
+        coding, *params = [piece.strip() for piece in part.split(';')]
+        quality = 1.0
+        for param in params:
+            if param.startswith('q='):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            qualities[coding.lower()] = quality
+
+    wildcard = qualities.get('*', 0.0)
+    candidates = [('br', qualities.get('br', wildcard))] if brotli is not None else []
+    candidates.append(('gzip', qualities.get('gzip', wildcard)))
+    coding, quality = max(candidates, key=lambda candidate: candidate[1])
+    return coding if quality > 0 else None
+
+
+class CompressionMiddleware:
+    """
+    Compress complete response bodies of at least minimum_size bytes
+
+    Only responses sent as a single body message are compressed. Streams
+    (NDJSON exports, server-sent events) pass through untouched, so their
+    events aren't held back in a compressor's buffer.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        coding = choose_encoding(Headers(scope=scope).get('accept-encoding', ''))
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        passthrough = False
+
+        async def send_compressed(message: Message):
+            nonlocal start, passthrough
+            if message['type'] == 'http.response.start':
+                start = message
+                return
+            if message['type'] != 'http.response.body' or passthrough:
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start['headers'])
+            body = message.get('body', b'')
+            if (
+                message.get('more_body', False)
+                or len(body) < self.minimum_size
+                or 'content-encoding' in headers
+                or not headers.get('content-type', '').startswith(COMPRESSIBLE_TYPES)
+            ):
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            body = self._compress(body, coding)
+            headers['Content-Encoding'] = coding
+            headers['Content-Length'] = str(len(body))
+            headers.add_vary_header('Accept-Encoding')
+            # A strong ETag names the uncompressed bytes; the compressed body is an equivalent
+            etag = headers.get('etag')
+            if etag and not etag.startswith('W/'):
+                headers['ETag'] = f'W/{etag}'
+            await send(start)
+            await send({'type': 'http.response.body', 'body': body})
+
+        await self.app(scope, receive, send_compressed)
+
+    def _compress(self, body: bytes, coding: str) -> bytes:
+        if coding == 'br':
+            return brotli.compress(body, quality=self.brotli_quality)
+        # mtime=0 keeps the output byte-identical for identical bodies
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
@@ -0,0 +1,280 @@
+"""
+Bounded worker pool for running the scoring pipeline off the event loop
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from app.config import settings
+
+
+class PoolSaturatedError(Exception):
+    """Raised when the pool and its queue are both full"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Evaluation queue is full")
+        self.retry_after = retry_after
+
+
+# Scorer owned by a worker process when running in process mode
+_process_scorer = None
+
+
+def _init_process_worker():
+    global _process_scorer
+    from app.scoring.scorer import SpeechScorer
+    _process_scorer = SpeechScorer()
+    # Each worker loads its own models as it starts, before taking requests
+    _process_scorer.warm_up()
+
+
+def _call_process_scorer(method: str, *args):
+    # The worker's cache counters travel back with every result, so the pool can report them
+    return getattr(_process_scorer, method)(*args), os.getpid(), _process_scorer.worker_stats()
+
+
+def _call_process_scorer_buffered(method: str, *args):
+    # Callbacks can't cross the process boundary, so events travel back with the result
+    events = []
+    result = getattr(_process_scorer, method)(*args, emit=lambda *event: events.append(event))
+    return (result, events), os.getpid(), _process_scorer.worker_stats()
+
+
+# Worker counters added up across processes; rates are recomputed from the sums
+SUMMED_STATS = (
+    'size', 'max_entries', 'memory_hits', 'disk_hits', 'misses', 'disk_evictions', 'agreed', 'disagreed'
+)
+
+
+def merge_worker_stats(snapshots: List[Dict]) -> Dict:
+    """One worker_stats() view of several processes"""
+    merged = {}
+    for section in snapshots[0]:
+        parts = [snapshot[section] for snapshot in snapshots]
+        combined = dict(parts[0])
+        for key in SUMMED_STATS:
+            if key in combined:
+                combined[key] = sum(part.get(key, 0) for part in parts)
+        if 'hit_rate' in combined:
+            hits = combined['memory_hits'] + combined['disk_hits']
+            lookups = hits + combined['misses']
+            combined['hit_rate'] = round(hits / lookups, 3) if lookups else 0.0
+        if 'agreement_rate' in combined:
+            total = combined['agreed'] + combined['disagreed']
+            combined['agreement_rate'] = round(combined['agreed'] / total, 4) if total else 0.0
+        merged[section] = combined
+    return merged
+
+
+# Marks the end of a thread-mode event stream
+_STREAM_END = object()
+
+
+class EvaluationPool:
+    """Runs SpeechScorer methods in a thread or process pool with a bounded queue"""
+
+    def __init__(
+        self,
+        scorer,
+        pool_type: Optional[str] = None,
+        workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        retry_after: Optional[int] = None
+    ):
+        self.scorer = scorer
+        self.pool_type = pool_type or settings.worker_pool_type
+        self.workers = workers or settings.worker_pool_size
+        self.queue_size = settings.worker_queue_size if queue_size is None else queue_size
+        self.retry_after = retry_after or settings.worker_retry_after_seconds
+
+        if self.pool_type not in ('thread', 'process'):
+            raise ValueError(f"Unknown worker pool type: {self.pool_type}")
+
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        # Latest worker_stats() from each worker process, by pid
+        self._worker_stats: Dict[int, Dict] = {}
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.queue_size
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.pool_type == 'process':
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    initializer=_init_process_worker
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix='scorer'
+                )
+        return self._executor
+
+    def _acquire(self, limit: Optional[int] = None):
+        with self._lock:
+            if self._in_flight >= (self.capacity if limit is None else limit):
+                # Background work held back by its own limit isn't a rejected request
+                if limit is None:
+                    self._rejected += 1
+                raise PoolSaturatedError(self.retry_after)
+            self._in_flight += 1
+
+    def _release(self, failed: bool):
+        with self._lock:
+            self._in_flight -= 1
+            if failed:
+                self._failed += 1
+            else:
+                self._completed += 1
+
+    def _unwrap(self, reply):
+        result, pid, stats = reply
+        with self._lock:
+            self._worker_stats[pid] = stats
+        return result
+
+    async def submit(self, method: str, *args, limit: Optional[int] = None):
+        """
+        Run a SpeechScorer method in the pool
+
+        limit caps the work in flight below the pool's capacity, so background
+        work can only take a free worker and never queues ahead of requests.
+
+        Raises:
+            PoolSaturatedError: if all workers are busy and the queue is full,
+                or the pool already holds `limit` evaluations
+        """
+        self._acquire(limit)
+        failed = True
+        try:
+            loop = asyncio.get_running_loop()
+            if self.pool_type == 'process':
+                future = loop.run_in_executor(
+                    self._get_executor(), _call_process_scorer, method, *args
+                )
+            else:
+                future = loop.run_in_executor(
+                    self._get_executor(), getattr(self.scorer, method), *args
+                )
+            result = await future
+            if self.pool_type == 'process':
+                result = self._unwrap(result)
+            failed = False
+            return result
+        finally:
+            self._release(failed)
+
+    def stream(self, method: str, *args) -> AsyncIterator[Tuple[str, object]]:
+        """
+        Run a SpeechScorer method that reports progress through an `emit` callback
+
+        The work is queued immediately, so saturation is raised here rather than
+        while iterating. The returned iterator yields each emitted (event, payload)
+        pair and then ('result', return value). In thread mode events arrive as
+        they are emitted; in process mode they arrive together when the worker
+        finishes. The pool slot is held until the work finishes, even if the
+        consumer stops early.
+
+        Raises:
+            PoolSaturatedError: if all workers are busy and the queue is full
+        """
+        self._acquire()
+        try:
+            loop = asyncio.get_running_loop()
+            queue: asyncio.Queue = asyncio.Queue()
+            if self.pool_type == 'process':
+                future = loop.run_in_executor(
+                    self._get_executor(), _call_process_scorer_buffered, method, *args
+                )
+            else:
+                emit = lambda *event: loop.call_soon_threadsafe(queue.put_nowait, event)
+                future = loop.run_in_executor(
+                    self._get_executor(), partial(getattr(self.scorer, method), *args, emit=emit)
+                )
+        except BaseException:
+            self._release(True)
+            raise
+
+        def finished(done: asyncio.Future):
+            # exception() also marks the error as retrieved when nobody is listening
+            self._release(done.cancelled() or done.exception() is not None)
+            queue.put_nowait(_STREAM_END)
+        future.add_done_callback(finished)
+
+        return self._stream_events(future, queue)
+
+    async def _stream_events(self, future: asyncio.Future, queue: asyncio.Queue):
+        if self.pool_type == 'process':
+            result, events = self._unwrap(await future)
+            for event in events:
+                yield event
+            yield 'result', result
+            return
+
+        while True:
+            event = await queue.get()
+            if event is _STREAM_END:
+                break
+            yield event
+        yield 'result', await future
+
+    def warm_up(self):
+        """
+        Load models where requests will run and record readiness on self.scorer
+
+        In process mode the workers warm themselves up on start; the readiness
+        reported back is that of the worker that answered.
+        """
+        if self.pool_type == 'process':
+            components = self._unwrap(self._get_executor().submit(
+                _call_process_scorer, 'readiness_components'
+            ).result())
+            self.scorer.readiness.restore(components)
+        else:
+            self.scorer.warm_up()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            in_flight = self._in_flight
+            return {
+                'pool_type': self.pool_type,
+                'workers': self.workers,
+                'queue_size': self.queue_size,
+                'active': min(in_flight, self.workers),
+                'queued': max(0, in_flight - self.workers),
+                'saturation': round(in_flight / self.capacity, 3) if self.capacity else 1.0,
+                'completed': self._completed,
+                'failed': self._failed,
+                'rejected': self._rejected
+            }
+
+    def worker_stats(self) -> Dict:
+        """
+        Result cache, embedding cache and grammar shadow-check counters
+
+        In process mode the scorer in this process never evaluates anything, so
+        the counters are summed over the workers, as of each one's last reply.
+        """
+        if self.pool_type != 'process':
+            return self.scorer.worker_stats()
+        with self._lock:
+            snapshots = list(self._worker_stats.values())
+        if not snapshots:
+            # No worker has answered yet, so nothing has been counted
+            return self.scorer.worker_stats()
+        return merge_worker_stats(snapshots)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
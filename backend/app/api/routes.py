@@ -1,8 +1,29 @@
-
-from fastapi import APIRouter, HTTPException, status
-from app.models import TranscriptRequest, EvaluationResponse, HealthResponse
+from fastapi import APIRouter, HTTPException, Path, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import ValidationError
+from app.models import (
+    TranscriptRequest, EvaluationResponse, IncrementalEvaluationRequest, IncrementalEvaluationResponse,
+    HealthResponse, ReadinessResponse, StatsResponse,
+    BatchEvaluationRequest, BatchEvaluationResponse, BatchItemResult,
+    JobRequest, JobStatus, JobResultsPage, RubricList
+)
+from app.scoring.registry import UnknownRubricError
 from app.scoring.scorer import SpeechScorer
+from app.api.pool import EvaluationPool, PoolSaturatedError
+from app.jobs import JobNotFoundError, JobRunner, create_job_store
+from app.formats import (
+    MEDIA_TYPES, RECORD_FORMATS, SCORES_ONLY_EXCLUDE, TABLE_FORMATS, NotAcceptableError,
+    encode_model, encode_record, encode_table, negotiate, scores_only
+)
+from app.config import settings
+from app.metrics import (
+    StageTimer, observe_evaluation, register_job_gauges, register_stats_gauges, server_timing_header
+)
 from app import __version__
+from typing import Callable, List, Optional, Tuple
+import json
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -11,28 +32,197 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 scorer = SpeechScorer()
+pool = EvaluationPool(scorer)
+register_stats_gauges(pool)
+
+job_store = create_job_store()
+job_runner = JobRunner(job_store, pool) if job_store is not None else None
+if job_store is not None:
+    register_job_gauges(job_store)
+
+NDJSON_TYPES = ('application/x-ndjson', 'application/jsonl')
+
+
+VIEW_PATTERN = '^(full|scores)$'
+
+
+def timed_response(encode: Callable[[], bytes], media_format: str, timings: dict) -> Tuple[Response, dict]:
+    """Serialize once here, so the cost shows up as its own stage and in Server-Timing"""
+    timer = StageTimer()
+    with timer.span('serialize'):
+        body = encode()
+    timings = {**timings, **timer.durations}
+    headers = {'Vary': 'Accept'}
+    if settings.server_timing_header:
+        headers['Server-Timing'] = server_timing_header(timings)
+    return Response(content=body, media_type=MEDIA_TYPES[media_format], headers=headers), timings
+
+
+def negotiate_format(http_request: Request, offered=RECORD_FORMATS) -> str:
+    try:
+        return negotiate(http_request.headers.get('accept'), offered)
+    except NotAcceptableError as e:
+        raise HTTPException(status_code=status.HTTP_406_NOT_ACCEPTABLE, detail=str(e))
+
+
+def result_etag(result_id: str, media_format: str, view: str) -> str:
+    # Weak: the representation is fixed by transcript and config, not by its exact bytes
+    return f'W/"{result_id}-{media_format}-{view}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(',')]
+    return '*' in candidates or etag.removeprefix('W/') in {c.removeprefix('W/') for c in candidates}
+
+
+def stored_result(result: str, view: str):
+    """A job item's stored result JSON, parsed and projected for re-encoding"""
+    if result is None:
+        return None
+    parsed = json.loads(result)
+    return scores_only(parsed) if view == 'scores' else parsed
+
+
+def format_stream_event(event: str, data: str, sse: bool) -> str:
+    """One stream message; data is already JSON"""
+    if sse:
+        return f"event: {event}\ndata: {data}\n\n"
+    return f'{{"event": "{event}", "data": {data}}}\n'
+
+
+def parse_job_upload(body: bytes) -> List[str]:
+    """Transcripts from JSONL: one JSON string or {"transcript": ...} object per line"""
+    transcripts = []
+    for number, line in enumerate(body.decode('utf-8').splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            raise ValueError(f"Line {number} is not valid JSON")
+        if isinstance(record, dict):
+            record = record.get('transcript')
+        if not isinstance(record, str):
+            raise ValueError(f"Line {number} has no transcript")
+        transcripts.append(record)
+    return transcripts
+
+
+def require_rubric(rubric_id: Optional[str]):
+    """422 for a rubric id that isn't loaded, before any work is queued"""
+    try:
+        scorer.rubrics.get(rubric_id)
+    except UnknownRubricError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+
+def require_job_store():
+    if job_store is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Job queue is disabled; set JOB_STORE_PATH to enable it"
+        )
+    return job_store
+
+
+async def read_job(job_id: str, method: str = 'get', *args):
+    try:
+        return await run_in_threadpool(getattr(require_job_store(), method), job_id, *args)
+    except JobNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job {job_id} not found")
 
 
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
+    # Liveness: the process is serving, whatever the state of its models
     return HealthResponse(
         status="healthy",
         version=__version__,
-        models_loaded=True
+        models_loaded=scorer.readiness.all_loaded,
+        components=scorer.readiness.components()
+    )
+
+
+@router.get("/ready", response_model=ReadinessResponse, responses={503: {"model": ReadinessResponse}})
+async def readiness_check():
+    # Readiness: 503 until warm-up has finished, so load balancers hold traffic back.
+    # Without warm-up, models load lazily on first use and there is nothing to wait for.
+    # A degraded node scores without some stages, so it is only ready if the operator allows it
+    degraded = scorer.readiness.degraded
+    body = ReadinessResponse(
+        ready=(scorer.readiness.ready or not settings.warm_up_on_startup)
+        and not (degraded and settings.ready_requires_all_loaded),
+        degraded=degraded,
+        components=scorer.readiness.components()
+    )
+    if not body.ready:
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=body.model_dump())
+    return body
+
+
+@router.get("/stats", response_model=StatsResponse)
+async def get_stats():
+    worker_stats = pool.worker_stats()
+    return StatsResponse(
+        pool=pool.stats(),
+        result_cache=worker_stats['result_cache'],
+        embedding_cache=worker_stats['embedding_cache']
     )
 
 
-@router.post("/evaluate", response_model=EvaluationResponse)
-async def evaluate_transcript(request: TranscriptRequest):
+@router.get("/rubrics", response_model=RubricList)
+async def list_rubrics():
+    """Rubrics that requests can name in rubric_id, and rubric files that failed to load"""
+    return RubricList(
+        rubrics=[compiled.describe() for compiled in scorer.rubrics.all()],
+        errors=scorer.rubrics.errors()
+    )
+
 
+@router.post("/evaluate", response_model=EvaluationResponse, responses={200: {"content": {MEDIA_TYPES[name]: {} for name in RECORD_FORMATS}}})
+async def evaluate_transcript(
+    request: TranscriptRequest,
+    http_request: Request,
+    view: str = Query('full', pattern=VIEW_PATTERN)
+):
+    """
+    Score one transcript
+
+    The body is JSON, MessagePack or CBOR following the Accept header;
+    view=scores leaves out the feedback text.
+    """
+    media_format = negotiate_format(http_request)
+    exclude = SCORES_ONLY_EXCLUDE if view == 'scores' else None
+    require_rubric(request.rubric_id)
+    
     try:
         logger.info(f"Evaluating transcript with {len(request.transcript)} characters")
         
-        result = scorer.evaluate(request.transcript)
+        result, timings = await pool.submit("evaluate_timed", request.transcript, request.rubric_id)
+        response, timings = timed_response(lambda: encode_model(result, media_format, exclude), media_format, timings)
+        if not result.degraded_stages and scorer.result_cache is not None:
+            # Degraded results aren't cached, and must not claim the full result's ETag
+            result_id = scorer.result_id(request.transcript, request.rubric_id)
+            if pool.pool_type == 'process':
+                # Scored and cached in a worker; copied here so /api/results can serve it
+                await run_in_threadpool(scorer.remember_result, result_id, result)
+            response.headers['ETag'] = result_etag(result_id, media_format, view)
+            response.headers['Content-Location'] = f"/api/results/{result_id}"
+        observe_evaluation([request.transcript], timings, result.degraded_stages)
         
         logger.info(f"Evaluation complete. Overall score: {result.overall_score}")
         
-        return result
+        return response
+    
+    except PoolSaturatedError as e:
+        logger.warning("Evaluation rejected: worker pool saturated")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Evaluation queue is full, please retry later",
+            headers={"Retry-After": str(e.retry_after)}
+        )
     
     except Exception as e:
         logger.error(f"Evaluation error: {str(e)}", exc_info=True)
@@ -40,3 +230,345 @@ async def evaluate_transcript(request: TranscriptRequest):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error evaluating transcript: {str(e)}"
         )
+
+
+@router.get(
+    "/results/{result_id}",
+    response_model=EvaluationResponse,
+    responses={
+        200: {"content": {MEDIA_TYPES[name]: {} for name in RECORD_FORMATS}},
+        304: {"description": "The client's copy (If-None-Match) is current"},
+        404: {"description": "Not in the result cache"}
+    }
+)
+async def get_result(
+    http_request: Request,
+    result_id: str = Path(..., pattern='^[0-9a-f]{16}-[0-9a-f]{64}$'),
+    view: str = Query('full', pattern=VIEW_PATTERN)
+):
+    """
+    A result computed earlier, from the result cache
+
+    /api/evaluate names it in its Content-Location header. Send the ETag back
+    in If-None-Match to get an empty 304 while the result is unchanged; the
+    ETag follows the transcript, the rubric and its scoring config, so this
+    needs no cache lookup at all. Formats and views are as for /evaluate.
+    """
+    media_format = negotiate_format(http_request)
+    etag = result_etag(result_id, media_format, view)
+    headers = {'ETag': etag, 'Vary': 'Accept', 'Cache-Control': 'no-cache'}
+    # An id from before a rubric or config change never matches: its result would be scored differently now
+    if scorer.is_current(result_id) and etag_matches(http_request.headers.get('if-none-match'), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    cached = await run_in_threadpool(scorer.cached_result, result_id)
+    if cached is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Result {result_id} not found")
+    body = encode_record(scores_only(cached) if view == 'scores' else cached, media_format)
+    return Response(content=body, media_type=MEDIA_TYPES[media_format], headers=headers)
+
+
+@router.post(
+    "/evaluate/stream",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}, "text/event-stream": {}}}}
+)
+async def evaluate_transcript_stream(request: TranscriptRequest, http_request: Request):
+    """
+    Stream each criterion as soon as it is scored, then the full result
+
+    Sends newline-delimited JSON, or server-sent events when the client accepts
+    text/event-stream. Each message is a `criterion` event carrying a
+    CriterionScore, then one `result` event carrying the same EvaluationResponse
+    /evaluate returns. A failure after streaming has started ends the stream
+    with an `error` event.
+    """
+    sse = 'text/event-stream' in http_request.headers.get('accept', '')
+    require_rubric(request.rubric_id)
+    
+    try:
+        logger.info(f"Streaming evaluation of transcript with {len(request.transcript)} characters")
+        events = pool.stream("evaluate_timed", request.transcript, request.rubric_id)
+    
+    except PoolSaturatedError as e:
+        logger.warning("Streaming evaluation rejected: worker pool saturated")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Evaluation queue is full, please retry later",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    
+    async def body():
+        try:
+            async for event, payload in events:
+                if event == 'result':
+                    result, timings = payload
+                    timer = StageTimer()
+                    with timer.span('serialize'):
+                        data = result.model_dump_json()
+                    observe_evaluation([request.transcript], {**timings, **timer.durations}, result.degraded_stages)
+                    logger.info(f"Streaming evaluation complete. Overall score: {result.overall_score}")
+                else:
+                    data = payload.model_dump_json()
+                yield format_stream_event(event, data, sse)
+        
+        except Exception as e:
+            logger.error(f"Streaming evaluation error: {str(e)}", exc_info=True)
+            detail = json.dumps({'detail': f"Error evaluating transcript: {str(e)}"})
+            yield format_stream_event('error', detail, sse)
+    
+    media_type = "text/event-stream" if sse else "application/x-ndjson"
+    # Proxies such as nginx buffer responses unless told not to
+    return StreamingResponse(body(), media_type=media_type, headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@router.post("/evaluate/incremental", response_model=IncrementalEvaluationResponse, responses={200: {"content": {MEDIA_TYPES[name]: {} for name in RECORD_FORMATS}}})
+async def evaluate_transcript_incremental(
+    request: IncrementalEvaluationRequest,
+    http_request: Request,
+    view: str = Query('full', pattern=VIEW_PATTERN)
+):
+    """
+    Re-evaluate an edited transcript, re-analyzing only its changed sentences
+
+    Send the session_id from the previous response with each revision; omit it
+    (or send a new one) to start a session. Sessions live in the worker that
+    served them, so with a process pool a revision landing on another worker
+    is simply analyzed in full. Formats and views are as for /evaluate.
+    """
+    media_format = negotiate_format(http_request)
+    exclude = SCORES_ONLY_EXCLUDE if view == 'scores' else None
+    require_rubric(request.rubric_id)
+    
+    try:
+        logger.info(f"Incremental evaluation of transcript with {len(request.transcript)} characters")
+        
+        result, timings = await pool.submit(
+            "evaluate_incremental_timed", request.transcript, request.session_id, request.rubric_id
+        )
+        response, timings = timed_response(lambda: encode_model(result, media_format, exclude), media_format, timings)
+        observe_evaluation([request.transcript], timings, result.degraded_stages)
+        
+        logger.info(
+            f"Incremental evaluation complete. Overall score: {result.overall_score}, "
+            f"{result.sentences_analyzed} of {result.sentence_count} sentences analyzed"
+        )
+        
+        return response
+    
+    except PoolSaturatedError as e:
+        logger.warning("Incremental evaluation rejected: worker pool saturated")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Evaluation queue is full, please retry later",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    
+    except Exception as e:
+        logger.error(f"Incremental evaluation error: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error evaluating transcript: {str(e)}"
+        )
+
+
+@router.post(
+    "/evaluate/batch",
+    response_model=BatchEvaluationResponse,
+    responses={200: {"content": {MEDIA_TYPES[name]: {} for name in RECORD_FORMATS + TABLE_FORMATS}}}
+)
+async def evaluate_batch(
+    request: BatchEvaluationRequest,
+    http_request: Request,
+    view: str = Query('full', pattern=VIEW_PATTERN)
+):
+    """
+    Score several transcripts with shared model passes
+
+    Besides the record formats of /evaluate, the Accept header can ask for an
+    Arrow IPC stream or a Parquet file with one row per transcript.
+    """
+    media_format = negotiate_format(http_request, RECORD_FORMATS + TABLE_FORMATS)
+    require_rubric(request.rubric_id)
+
+    # Validate items individually so one bad transcript doesn't fail the batch
+    results = [None] * len(request.transcripts)
+    valid_indices = []
+    valid_transcripts = []
+    for index, transcript in enumerate(request.transcripts):
+        try:
+            valid_transcripts.append(TranscriptRequest(transcript=transcript).transcript)
+            valid_indices.append(index)
+        except ValidationError as e:
+            results[index] = BatchItemResult(index=index, error=e.errors()[0]['msg'])
+
+    try:
+        logger.info(f"Evaluating batch of {len(valid_transcripts)} transcripts")
+        
+        timings = {}
+        if valid_transcripts:
+            scored, timings = await pool.submit("evaluate_many_timed", valid_transcripts, request.rubric_id)
+            for index, item in zip(valid_indices, scored):
+                results[index] = BatchItemResult(index=index, result=item.result, error=item.error)
+        
+        succeeded = sum(1 for item in results if item.result is not None)
+        logger.info(f"Batch evaluation complete. {succeeded}/{len(results)} succeeded")
+        
+        batch = BatchEvaluationResponse(results=results, succeeded=succeeded, failed=len(results) - succeeded)
+        if media_format in TABLE_FORMATS:
+            encode = lambda: encode_table(
+                ((item.index, item.result.model_dump() if item.result else None, item.error) for item in results),
+                media_format
+            )
+        else:
+            exclude = {'results': {'__all__': {'result': SCORES_ONLY_EXCLUDE}}} if view == 'scores' else None
+            encode = lambda: encode_model(batch, media_format, exclude)
+        response, timings = timed_response(encode, media_format, timings)
+        degraded = {stage for item in results if item.result for stage in item.result.degraded_stages}
+        observe_evaluation(valid_transcripts, timings, sorted(degraded), mode='batch')
+        return response
+    
+    except PoolSaturatedError as e:
+        logger.warning("Batch evaluation rejected: worker pool saturated")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Evaluation queue is full, please retry later",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    
+    except Exception as e:
+        logger.error(f"Batch evaluation error: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error evaluating batch: {str(e)}"
+        )
+
+
+@router.post(
+    "/jobs",
+    response_model=JobStatus,
+    status_code=status.HTTP_202_ACCEPTED,
+    openapi_extra={"requestBody": {"required": True, "content": {
+        "application/json": {"schema": JobRequest.model_json_schema()},
+        "application/x-ndjson": {"schema": {"type": "string"}}
+    }}}
+)
+async def create_job(
+    http_request: Request,
+    priority: int = 0,
+    max_concurrency: int = Query(1, ge=1),
+    rubric_id: Optional[str] = Query(None, max_length=128)
+):
+    """
+    Queue transcripts for background scoring and return the job id
+
+    Send {"transcripts": [...], "rubric_id": null, "priority": 0, "max_concurrency": 1}
+    as JSON, or upload a JSONL file (application/x-ndjson) with one transcript
+    per line and rubric_id/priority/max_concurrency as query parameters.
+    """
+    store = require_job_store()
+    body = await http_request.body()
+    content_type = http_request.headers.get('content-type', '')
+    
+    try:
+        if content_type.startswith(NDJSON_TYPES):
+            job = JobRequest(
+                transcripts=parse_job_upload(body),
+                rubric_id=rubric_id,
+                priority=priority,
+                max_concurrency=max_concurrency
+            )
+        else:
+            job = JobRequest.model_validate_json(body)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    require_rubric(job.rubric_id)
+    
+    # Invalid transcripts fail on their own instead of failing the job
+    items = []
+    for transcript in job.transcripts:
+        try:
+            items.append((TranscriptRequest(transcript=transcript).transcript, None))
+        except ValidationError as e:
+            items.append((None, e.errors()[0]['msg']))
+    
+    job_id = await run_in_threadpool(store.create, items, job.priority, job.max_concurrency, job.rubric_id)
+    logger.info(f"Queued job {job_id} with {len(items)} transcripts at priority {job.priority}")
+    return await read_job(job_id)
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str):
+    return await read_job(job_id)
+
+
+@router.get(
+    "/jobs/{job_id}/results",
+    response_model=JobResultsPage,
+    responses={200: {"content": {
+        "application/x-ndjson": {},
+        **{MEDIA_TYPES[name]: {} for name in RECORD_FORMATS + TABLE_FORMATS}
+    }}}
+)
+async def get_job_results(
+    job_id: str,
+    http_request: Request,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    view: str = Query('full', pattern=VIEW_PATTERN)
+):
+    """
+    Finished items in input order, a page at a time
+
+    With Accept: application/x-ndjson every finished item is streamed instead,
+    one BatchItemResult per line, ignoring offset and limit. An Arrow or Parquet
+    Accept type likewise exports every finished item, as one row each.
+    """
+    if 'application/x-ndjson' in http_request.headers.get('accept', ''):
+        await read_job(job_id)
+        
+        def lines():
+            # Stored results are already JSON, so they are written out without re-parsing
+            for index, result, error in job_store.iter_results(job_id):
+                if view == 'scores' and result is not None:
+                    result = json.dumps(stored_result(result, view))
+                yield f'{{"index": {index}, "result": {result or "null"}, "error": {json.dumps(error)}}}\n'
+        
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+    
+    media_format = negotiate_format(http_request, RECORD_FORMATS + TABLE_FORMATS)
+    if media_format in TABLE_FORMATS:
+        await read_job(job_id)
+        body = await run_in_threadpool(lambda: encode_table(
+            ((index, stored_result(result, 'full'), error) for index, result, error in job_store.iter_results(job_id)),
+            media_format
+        ))
+        return Response(content=body, media_type=MEDIA_TYPES[media_format], headers={'Vary': 'Accept'})
+    
+    rows = await read_job(job_id, 'results', offset, limit)
+    if media_format == 'json' and view == 'full':
+        # Spliced like the NDJSON stream: parsing and re-validating each stored result costs more than the lookup
+        results = ', '.join(
+            f'{{"index": {index}, "result": {result or "null"}, "error": {json.dumps(error)}}}'
+            for index, result, error in rows
+        )
+        body = f'{{"job_id": {json.dumps(job_id)}, "offset": {offset}, "limit": {limit}, "results": [{results}]}}'
+    else:
+        body = encode_record({
+            'job_id': job_id,
+            'offset': offset,
+            'limit': limit,
+            'results': [
+                {'index': index, 'result': stored_result(result, view), 'error': error}
+                for index, result, error in rows
+            ]
+        }, media_format)
+    return Response(content=body, media_type=MEDIA_TYPES[media_format], headers={'Vary': 'Accept'})
+
+
+@router.delete("/jobs/{job_id}", response_model=JobStatus)
+async def cancel_job(job_id: str):
+    """Cancel the job's queued items; chunks already being scored still finish"""
+    return await read_job(job_id, 'cancel')
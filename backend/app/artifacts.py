@@ -0,0 +1,150 @@
+"""
+Locations of the model artifacts the pipeline needs, under Settings.model_cache_dir,
+and the manifest `python -m app.prefetch` writes to verify them at startup
+"""
+
+import glob
+import hashlib
+import json
+import os
+import time
+from typing import Dict, List
+from app.config import settings
+
+MANIFEST_FILE = 'manifest.json'
+VERIFICATION_MODES = ('off', 'size', 'checksum')
+
+
+def nltk_data_dir() -> str:
+    return os.path.abspath(os.path.join(settings.model_cache_dir, 'nltk_data'))
+
+
+def sentence_transformer_dir(model_name: str = None) -> str:
+    model_name = model_name or settings.sentence_transformer_model
+    return os.path.abspath(os.path.join(settings.model_cache_dir, 'sentence-transformers', model_name.replace('/', '_')))
+
+
+def onnx_model_dir(model_name: str = None) -> str:
+    model_name = model_name or settings.sentence_transformer_model
+    return os.path.abspath(os.path.join(settings.model_cache_dir, 'onnx', model_name.replace('/', '_')))
+
+
+def languagetool_dir() -> str:
+    return os.path.abspath(os.path.join(settings.model_cache_dir, 'languagetool'))
+
+
+def languagetool_downloaded() -> bool:
+    return bool(glob.glob(os.path.join(os.environ.get('LTP_PATH', languagetool_dir()), 'LanguageTool-*')))
+
+
+def use_languagetool_dir():
+    # language_tool_python reads LTP_PATH whenever it looks for (or downloads) LanguageTool
+    os.environ.setdefault('LTP_PATH', languagetool_dir())
+
+
+def manifest_path() -> str:
+    return os.path.abspath(os.path.join(settings.model_cache_dir, MANIFEST_FILE))
+
+
+def artifact_roots() -> Dict[str, str]:
+    return {
+        'nltk': nltk_data_dir(),
+        'embedding': sentence_transformer_dir(),
+        'onnx': settings.embedding_onnx_dir or onnx_model_dir(),
+        'languagetool': os.environ.get('LTP_PATH', languagetool_dir())
+    }
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_manifest() -> Dict:
+    """Size and SHA-256 of every file under each artifact directory that exists"""
+    base = os.path.abspath(settings.model_cache_dir)
+    files = {}
+    components = []
+    for component, root in artifact_roots().items():
+        if not os.path.isdir(root):
+            continue
+        components.append(component)
+        for directory, _, names in os.walk(root):
+            for name in sorted(names):
+                path = os.path.join(directory, name)
+                files[os.path.relpath(path, base)] = {
+                    'size': os.path.getsize(path),
+                    'sha256': file_sha256(path)
+                }
+    return {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'model': settings.sentence_transformer_model,
+        'components': components,
+        'files': files
+    }
+
+
+def write_manifest(manifest: Dict) -> str:
+    path = manifest_path()
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+    return path
+
+
+def verify_manifest(mode: str = 'size') -> List[str]:
+    """
+    Compare the files on disk with the manifest
+
+    Args:
+        mode: 'size' checks presence and size (cheap enough for every start),
+              'checksum' also re-hashes every file
+
+    Returns:
+        One line per problem; empty when everything matches
+    """
+    try:
+        with open(manifest_path()) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return [f"{manifest_path()} not found; run 'python -m app.prefetch' first"]
+
+    base = os.path.abspath(settings.model_cache_dir)
+    problems = []
+    if manifest.get('model') != settings.sentence_transformer_model:
+        problems.append(f"manifest is for {manifest.get('model')}, not {settings.sentence_transformer_model}")
+    for relative_path, expected in manifest['files'].items():
+        path = os.path.join(base, relative_path)
+        if not os.path.exists(path):
+            problems.append(f"missing: {relative_path}")
+        elif os.path.getsize(path) != expected['size']:
+            problems.append(f"size mismatch: {relative_path}")
+        elif mode == 'checksum' and file_sha256(path) != expected['sha256']:
+            problems.append(f"checksum mismatch: {relative_path}")
+    return problems
+
+
+class ArtifactVerifier:
+    """Startup check against the prefetch manifest, reported as a readiness component"""
+
+    def __init__(self, mode: str = None):
+        self.mode = mode or settings.artifact_verification
+        if self.mode not in VERIFICATION_MODES:
+            raise ValueError(f"Unknown artifact verification mode: {self.mode}")
+        self.problems: List[str] = []
+        self.load_error = None
+
+    def load(self) -> bool:
+        if self.mode == 'off':
+            return True
+        self.problems = verify_manifest(self.mode)
+        if self.problems:
+            shown = '; '.join(self.problems[:5])
+            more = f" (+{len(self.problems) - 5} more)" if len(self.problems) > 5 else ''
+            self.load_error = f"{shown}{more}"
+            print(f"Warning: Model artifacts do not match the manifest: {self.load_error}")
+        return not self.problems
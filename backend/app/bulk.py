@@ -0,0 +1,367 @@
+"""
+Offline bulk scoring from JSONL or CSV files
+
+For regrading archives without going through HTTP. Records are read and
+written a chunk at a time, so memory stays flat whatever the input size.
+Chunks fan out to a process pool whose workers each load the models once, and
+results are written in input order. A checkpoint next to the output records
+how far the run got, so an interrupted run picks up where it stopped:
+
+    python -m app.bulk transcripts.jsonl results.jsonl --workers 4
+    python -m app.bulk archive.csv results.csv --text-column text --id-column student
+    python -m app.bulk archive.csv results.parquet --resume
+
+Input lines are JSON strings or objects with a "transcript" (and optional
+"id"); CSV files need a transcript column. The output format follows the
+extension: .jsonl keeps the full result, .csv and .parquet (needs pyarrow)
+flatten it to one column per criterion and per DetailedAnalysis field.
+"""
+
+import argparse
+import csv
+import io
+import itertools
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+from pydantic import ValidationError
+from app.formats import arrow_schema, flatten_result, rubric_criteria
+from app.scoring.registry import get_rubric_registry
+from app.models import TranscriptRequest
+
+FORMATS = ('jsonl', 'csv', 'parquet')
+
+# Scorer owned by a bulk worker process
+_worker_scorer = None
+
+
+def _init_worker():
+    global _worker_scorer
+    from app.scoring.scorer import SpeechScorer
+    _worker_scorer = SpeechScorer()
+    _worker_scorer.warm_up()
+
+
+def _score_chunk(transcripts: List[str], rubric_id: Optional[str] = None) -> List[Tuple[Optional[Dict], Optional[str]]]:
+    # Plain dicts pickle faster than the response models on the way back
+    return [
+        (item.result.model_dump() if item.result else None, item.error)
+        for item in _worker_scorer.evaluate_many(transcripts, rubric_id=rubric_id)
+    ]
+
+
+def read_records(path: str, text_column: str = 'transcript', id_column: str = 'id') -> Iterator[Tuple[Optional[str], object]]:
+    """
+    Yield (id, transcript) per input record, reading lazily
+
+    A record that can't be read yields its problem as an exception in place of
+    the transcript, so it fails on its own and keeps its position.
+    """
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.lower().endswith('.csv'):
+            reader = csv.DictReader(f)
+            if text_column not in (reader.fieldnames or []):
+                raise ValueError(f"{path} has no '{text_column}' column")
+            for row in reader:
+                yield row.get(id_column), row[text_column]
+            return
+
+        for number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                yield None, ValueError(f"Line {number} is not valid JSON")
+                continue
+            if isinstance(record, dict):
+                yield record.get(id_column), record.get(text_column)
+            else:
+                yield None, record
+
+
+class JsonlWriter:
+    """Full results, one JSON object per line; resumes by truncating to the checkpointed size"""
+
+    def __init__(self, path: str, position: Optional[Dict] = None):
+        self.file = open(path, 'r+b' if position else 'wb')
+        if position:
+            self.file.truncate(position['bytes'])
+            self.file.seek(position['bytes'])
+
+    def write(self, rows: List[Dict]):
+        for row in rows:
+            self.file.write(json.dumps(row).encode('utf-8') + b'\n')
+
+    def position(self) -> Dict:
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return {'bytes': self.file.tell()}
+
+    def close(self):
+        self.file.close()
+
+
+class CsvWriter(JsonlWriter):
+    """Flattened results; the header is written once, before the first row"""
+
+    def __init__(self, path: str, position: Optional[Dict] = None, criteria: Dict[str, str] = None):
+        super().__init__(path, position)
+        self.criteria = criteria
+        self.columns = ['record', 'id', 'error', *flatten_result(None, criteria)]
+        if not position:
+            self.file.write(self._encode(self.columns))
+
+    def _encode(self, values: List) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(values)
+        return buffer.getvalue().encode('utf-8')
+
+    def write(self, rows: List[Dict]):
+        for row in rows:
+            flat = {'record': row['record'], 'id': row['id'], 'error': row['error'], **flatten_result(row['result'], self.criteria)}
+            self.file.write(self._encode([flat[column] for column in self.columns]))
+
+
+class ParquetWriter:
+    """
+    Flattened results as a directory of Parquet part files
+
+    Rows are buffered up to rows_per_file and then written as the next part,
+    so a resumed run only drops parts written after its checkpoint.
+    """
+
+    def __init__(self, path: str, position: Optional[Dict] = None, criteria: Dict[str, str] = None, rows_per_file: int = 10000):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise RuntimeError("Parquet output needs pyarrow: pip install pyarrow")
+        self.path = path
+        self.criteria = criteria
+        self.rows_per_file = rows_per_file
+        self.parts = position['parts'] if position else 0
+        self.rows: List[Dict] = []
+        self.schema = self._schema()
+
+        os.makedirs(path, exist_ok=True)
+        for name in os.listdir(path):
+            if name.startswith('part-') and int(name[5:10]) >= self.parts:
+                os.remove(os.path.join(path, name))
+
+    def write(self, rows: List[Dict]):
+        for row in rows:
+            record_id = str(row['id']) if row['id'] is not None else None
+            self.rows.append({'record': row['record'], 'id': record_id, 'error': row['error'], **flatten_result(row['result'], self.criteria)})
+
+    def _schema(self):
+        import pyarrow as pa
+
+        return arrow_schema([('record', pa.int64()), ('id', pa.string()), ('error', pa.string())], self.criteria)
+
+    @property
+    def ready(self) -> bool:
+        return len(self.rows) >= self.rows_per_file
+
+    def position(self) -> Dict:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self.rows:
+            table = pa.Table.from_pylist(self.rows, schema=self.schema)
+            pq.write_table(table, os.path.join(self.path, f'part-{self.parts:05d}.parquet'))
+            self.parts += 1
+            self.rows = []
+        return {'parts': self.parts}
+
+    def close(self):
+        pass
+
+
+class Checkpoint:
+    """Records done and the output position they end at, replaced atomically"""
+
+    def __init__(self, output: str):
+        self.path = output.rstrip('/') + '.checkpoint.json'
+
+    def load(self, source: str) -> Optional[Dict]:
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path) as f:
+            state = json.load(f)
+        if state['input'] != os.path.abspath(source):
+            raise ValueError(f"Checkpoint {self.path} belongs to {state['input']}")
+        return state
+
+    def save(self, source: str, records: int, position: Dict, complete: bool = False):
+        state = {'input': os.path.abspath(source), 'records': records, 'position': position, 'complete': complete}
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(temp_path, self.path)
+
+
+def chunked(records: Iterator, size: int) -> Iterator[List]:
+    while True:
+        chunk = list(itertools.islice(records, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run(
+    source: str,
+    output: str,
+    output_format: Optional[str] = None,
+    workers: int = 2,
+    chunk_size: int = 32,
+    resume: bool = False,
+    text_column: str = 'transcript',
+    id_column: str = 'id',
+    progress_seconds: float = 5.0,
+    rubric_id: Optional[str] = None
+) -> Dict:
+    """
+    Score every record of `source` into `output`
+
+    Returns:
+        Counts and throughput for the run
+    """
+    output_format = output_format or os.path.splitext(output)[1].lstrip('.').lower()
+    if output_format not in FORMATS:
+        raise ValueError(f"Unknown output format '{output_format}', expected one of: {', '.join(FORMATS)}")
+
+    checkpoint = Checkpoint(output)
+    state = checkpoint.load(source) if resume else None
+    if state and state['complete']:
+        print(f"{output} is already complete ({state['records']} records)", file=sys.stderr)
+        return {'records': 0, 'failed': 0, 'seconds': 0.0, 'records_per_second': 0.0}
+    skip = state['records'] if state else 0
+    position = state['position'] if state else None
+
+    # Fails on an unknown rubric before any worker starts
+    get_rubric_registry().get(rubric_id)
+    criteria = rubric_criteria()
+    if output_format == 'jsonl':
+        writer = JsonlWriter(output, position)
+    elif output_format == 'csv':
+        writer = CsvWriter(output, position, criteria)
+    else:
+        writer = ParquetWriter(output, position, criteria)
+
+    records = enumerate(read_records(source, text_column, id_column))
+    records = itertools.islice(records, skip, None)
+    if skip:
+        print(f"Resuming after {skip} records", file=sys.stderr)
+
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) if workers > 0 else None
+    if executor is None:
+        _init_worker()
+
+    done = skip
+    failed = 0
+    started = time.perf_counter()
+    last_report = started
+    # At most two chunks per worker in flight, so reading never runs ahead of scoring
+    in_flight = deque()
+    chunks = chunked(records, chunk_size)
+
+    def submit(chunk) -> Tuple[List, object]:
+        # Invalid records fail here on their own; only valid transcripts reach a worker
+        rows = []
+        transcripts = []
+        for number, (record_id, transcript) in chunk:
+            row = {'record': number, 'id': record_id, 'result': None, 'error': None}
+            try:
+                if isinstance(transcript, Exception):
+                    raise transcript
+                if not isinstance(transcript, str):
+                    raise ValueError("Record has no transcript")
+                transcripts.append(TranscriptRequest(transcript=transcript).transcript)
+            except ValidationError as e:
+                row['error'] = e.errors()[0]['msg']
+            except ValueError as e:
+                row['error'] = str(e)
+            rows.append(row)
+        if executor is None:
+            return rows, _score_chunk(transcripts, rubric_id)
+        return rows, executor.submit(_score_chunk, transcripts, rubric_id)
+
+    try:
+        for chunk in itertools.islice(chunks, max(1, workers) * 2):
+            in_flight.append(submit(chunk))
+
+        while in_flight:
+            rows, future = in_flight.popleft()
+            outcomes = iter(future if executor is None else future.result())
+            for row in rows:
+                if row['error'] is None:
+                    row['result'], row['error'] = next(outcomes)
+                failed += row['error'] is not None
+            writer.write(rows)
+            done += len(rows)
+
+            next_chunk = next(chunks, None)
+            if next_chunk is not None:
+                in_flight.append(submit(next_chunk))
+
+            if not isinstance(writer, ParquetWriter) or writer.ready:
+                checkpoint.save(source, done, writer.position())
+
+            now = time.perf_counter()
+            if now - last_report >= progress_seconds:
+                rate = (done - skip) / (now - started)
+                print(f"{done} records ({failed} failed), {rate:.1f} records/s", file=sys.stderr)
+                last_report = now
+
+        checkpoint.save(source, done, writer.position(), complete=True)
+    finally:
+        writer.close()
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    seconds = time.perf_counter() - started
+    scored = done - skip
+    summary = {
+        'records': scored,
+        'failed': failed,
+        'seconds': round(seconds, 2),
+        'records_per_second': round(scored / seconds, 2) if seconds else 0.0
+    }
+    print(f"Done: {scored} records ({failed} failed) in {seconds:.1f}s, {summary['records_per_second']} records/s", file=sys.stderr)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a JSONL or CSV file of transcripts offline")
+    parser.add_argument('input', help="JSONL or CSV file of transcripts")
+    parser.add_argument('output', help="Results file: .jsonl, .csv or a .parquet directory")
+    parser.add_argument('--format', choices=FORMATS, default=None, help="Override the format implied by the output name")
+    parser.add_argument('--workers', type=int, default=2, help="Scoring processes, each with its own models; 0 scores in this process")
+    parser.add_argument('--chunk-size', type=int, default=32, help="Transcripts per evaluate_many call")
+    parser.add_argument('--resume', action='store_true', help="Continue from the output's checkpoint")
+    parser.add_argument('--text-column', default='transcript')
+    parser.add_argument('--id-column', default='id')
+    parser.add_argument('--progress-seconds', type=float, default=5.0, help="Seconds between throughput reports")
+    parser.add_argument('--rubric', default=None, help="Rubric id from RUBRIC_DIR; the built-in rubric by default")
+    args = parser.parse_args()
+
+    run(
+        args.input,
+        args.output,
+        output_format=args.format,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        resume=args.resume,
+        text_column=args.text_column,
+        id_column=args.id_column,
+        progress_seconds=args.progress_seconds,
+        rubric_id=args.rubric
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import field_validator
-from typing import List, Union
+from typing import List, Optional, Union
 import os
 
 
@@ -29,7 +29,21 @@ class Settings(BaseSettings):
         return v
     
     model_cache_dir: str = "./models"
+    allow_model_downloads: bool = False
+    artifact_verification: str = "size"
+    warm_up_on_startup: bool = True
+    ready_requires_all_loaded: bool = True
     sentence_transformer_model: str = "all-MiniLM-L6-v2"
+    embedding_backend: str = "torch"
+    embedding_onnx_dir: Optional[str] = None
+    embedding_threads: int = 0
+    embedding_batch_size: int = 64
+    coherence_full_matrix: bool = False
+    embedding_cache_size: int = 10000
+    embedding_cache_path: Optional[str] = None
+    embedding_cache_disk_capacity: int = 200000
+    
+    sentence_splitter: str = "punkt"
     
     optimal_wpm_min: int = 120
     optimal_wpm_max: int = 150
@@ -38,6 +52,53 @@ class Settings(BaseSettings):
     
     max_grammar_errors_per_100_words: float = 5.0
     
+    rubric_dir: Optional[str] = None
+    rubric_reload_seconds: float = 5.0
+    grammar_mode: str = "hybrid"
+    grammar_escalation_min_confidence: float = 0.7
+    grammar_escalation_sample_rate: float = 0.05
+    grammar_batch_max_chars: int = 20000
+    grammar_server_url: Optional[str] = None
+    grammar_timeout_seconds: float = 10.0
+    grammar_max_concurrency: int = 4
+    grammar_sidecar_port: int = 8081
+    
+    serve_workers: int = 2
+    
+    worker_pool_type: str = "thread"
+    worker_pool_size: int = 2
+    worker_queue_size: int = 16
+    worker_retry_after_seconds: int = 5
+    
+    max_batch_size: int = 200
+    
+    job_store_path: Optional[str] = None
+    max_job_size: int = 10000
+    job_pool_slots: int = 1
+    job_chunk_size: int = 16
+    job_lease_seconds: float = 120.0
+    job_poll_seconds: float = 0.5
+    
+    stage_workers: int = 4
+    stage_timeout_seconds: float = 15.0
+    stage_timeouts: dict = {}
+    allow_partial_results: bool = True
+    
+    result_cache_enabled: bool = True
+    result_cache_max_entries: int = 1024
+    result_cache_ttl_seconds: int = 3600
+    result_cache_path: Optional[str] = None
+    
+    incremental_max_sessions: int = 1000
+    incremental_session_ttl_seconds: int = 1800
+    
+    server_timing_header: bool = False
+    
+    compression_enabled: bool = True
+    compression_minimum_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+    
     filler_words: List[str] = [
         "um", "uh", "like", "you know", "basically", "actually",
         "literally", "sort of", "kind of", "i mean", "well"
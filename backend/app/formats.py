@@ -0,0 +1,215 @@
+"""
+Response encodings for API consumers that pull results in volume
+
+Evaluation results can be sent as JSON, MessagePack or CBOR, chosen from the
+Accept header, and batch and job outputs also as columnar Arrow IPC streams or
+Parquet files: one row per transcript, one column per criterion score and per
+DetailedAnalysis field. The "scores" view drops the feedback text, which is
+most of a response's size.
+
+msgpack, cbor2 and pyarrow are optional; a format whose library is missing is
+simply never negotiated.
+"""
+
+import importlib.util
+import io
+import json
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from app.models import DetailedAnalysis
+from app.scoring.registry import get_rubric_registry
+from app.scoring.rubric import DEFAULT_RUBRIC_ID
+
+MEDIA_TYPES = {
+    'json': 'application/json',
+    'msgpack': 'application/msgpack',
+    'cbor': 'application/cbor',
+    'arrow': 'application/vnd.apache.arrow.stream',
+    'parquet': 'application/vnd.apache.parquet'
+}
+
+# Other names clients send for the same formats
+MEDIA_TYPE_ALIASES = {
+    'application/x-msgpack': 'msgpack',
+    'application/vnd.msgpack': 'msgpack',
+    'application/x-parquet': 'parquet'
+}
+
+FORMAT_MODULES = {'msgpack': 'msgpack', 'cbor': 'cbor2', 'arrow': 'pyarrow', 'parquet': 'pyarrow'}
+
+RECORD_FORMATS = ('json', 'msgpack', 'cbor')
+TABLE_FORMATS = ('arrow', 'parquet')
+
+VIEWS = ('full', 'scores')
+
+# model_dump exclude for the scores view of an EvaluationResponse
+SCORES_ONLY_EXCLUDE = {'summary': True, 'criteria_scores': {'__all__': {'feedback'}}}
+
+
+class NotAcceptableError(Exception):
+    pass
+
+
+@lru_cache(maxsize=None)
+def format_available(name: str) -> bool:
+    module = FORMAT_MODULES.get(name)
+    return module is None or importlib.util.find_spec(module) is not None
+
+
+def negotiate(accept: Optional[str], offered: Sequence[str] = RECORD_FORMATS) -> str:
+    """
+    Format for an Accept header, by the client's q-values then the order offered
+
+    A missing header or a wildcard gets JSON. Raises NotAcceptableError when
+    nothing the client accepts is offered (or installed).
+    """
+    if not accept:
+        return 'json'
+
+    ranges = []
+    for position, part in enumerate(accept.split(',')):
+        media_type, *params = [piece.strip() for piece in part.split(';')]
+        quality = 1.0
+        for param in params:
+            if param.startswith('q='):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if media_type and quality > 0:
+            ranges.append((-quality, position, media_type.lower()))
+
+    available = [name for name in offered if format_available(name)]
+    for _, _, media_type in sorted(ranges):
+        if media_type in ('*/*', 'application/*'):
+            return 'json' if 'json' in available else available[0]
+        name = MEDIA_TYPE_ALIASES.get(media_type)
+        if name is None:
+            name = next((key for key, value in MEDIA_TYPES.items() if value == media_type), None)
+        if name in available:
+            return name
+    raise NotAcceptableError(
+        "Acceptable formats: " + ', '.join(MEDIA_TYPES[name] for name in available)
+    )
+
+
+def scores_only(result: Optional[Dict]) -> Optional[Dict]:
+    """SCORES_ONLY_EXCLUDE applied to an already dumped EvaluationResponse"""
+    if result is None:
+        return None
+    projected = {key: value for key, value in result.items() if key != 'summary'}
+    projected['criteria_scores'] = [
+        {key: value for key, value in criterion.items() if key != 'feedback'}
+        for criterion in result['criteria_scores']
+    ]
+    return projected
+
+
+def encode_record(value, media_format: str) -> bytes:
+    """JSON-compatible value (dicts, lists, scalars) as JSON, MessagePack or CBOR"""
+    if media_format == 'msgpack':
+        import msgpack
+        return msgpack.packb(value)
+    if media_format == 'cbor':
+        import cbor2
+        return cbor2.dumps(value)
+    return json.dumps(value, separators=(',', ':')).encode('utf-8')
+
+
+def encode_model(model, media_format: str, exclude: Optional[Dict] = None) -> bytes:
+    """A response model in one of RECORD_FORMATS; JSON goes straight through pydantic-core"""
+    if media_format == 'json':
+        return model.model_dump_json(exclude=exclude).encode('utf-8')
+    return encode_record(model.model_dump(mode='json', exclude=exclude), media_format)
+
+
+def rubric_criteria() -> Dict[str, str]:
+    """
+    Criterion display name mapped to its rubric key, which names its score column
+
+    Covers every loaded rubric, so a table mixing rubrics still puts each
+    criterion in its key's column; the default rubric's names come first.
+    """
+    criteria = {}
+    for compiled in get_rubric_registry().all():
+        for key, criterion in compiled.rubric.get_all_criteria().items():
+            criteria.setdefault(criterion.name, key)
+    return criteria
+
+
+def flatten_result(result: Optional[Dict], criteria: Dict[str, str]) -> Dict:
+    """One flat row: a score column per criterion and a column per analysis field"""
+    row = {
+        'overall_score': None, 'grade': None, 'rubric_id': None,
+        'word_count': None, 'sentence_count': None, 'degraded_stages': None
+    }
+    row.update({f'{key}_score': None for key in dict.fromkeys(criteria.values())})
+    row.update({field: None for field in DetailedAnalysis.model_fields})
+    if result is None:
+        return row
+
+    for field in ('overall_score', 'grade', 'word_count', 'sentence_count'):
+        row[field] = result[field]
+    # Results stored before rubrics were selectable were all scored with the default
+    row['rubric_id'] = result.get('rubric_id', DEFAULT_RUBRIC_ID)
+    row['degraded_stages'] = ';'.join(result['degraded_stages'])
+    for criterion in result['criteria_scores']:
+        key = criteria.get(criterion['criterion'])
+        if key is not None and criterion['available']:
+            row[f'{key}_score'] = criterion['score']
+    for field, value in result['detailed_analysis'].items():
+        if isinstance(value, list):
+            value = ';'.join(value)
+        elif isinstance(value, dict):
+            value = json.dumps(value, sort_keys=True)
+        row[field] = value
+    return row
+
+
+def arrow_schema(leading: List[Tuple[str, object]], criteria: Dict[str, str]):
+    """
+    Schema for flattened results after the given leading (name, pyarrow type) columns
+
+    Fixed up front, so a batch whose rows are all null in some column still
+    gets that column's real type.
+    """
+    import pyarrow as pa
+
+    types = {int: pa.int64(), float: pa.float64(), bool: pa.bool_()}
+    fields = list(leading)
+    for column in flatten_result(None, criteria):
+        if column in DetailedAnalysis.model_fields:
+            fields.append((column, types.get(DetailedAnalysis.model_fields[column].annotation, pa.string())))
+        elif column in ('word_count', 'sentence_count'):
+            fields.append((column, pa.int64()))
+        elif column in ('grade', 'rubric_id', 'degraded_stages'):
+            fields.append((column, pa.string()))
+        else:
+            fields.append((column, pa.float64()))
+    return pa.schema(fields)
+
+
+def encode_table(items: Iterable[Tuple[int, Optional[Dict], Optional[str]]], media_format: str) -> bytes:
+    """
+    (index, result dict or None, error) items as one Arrow IPC stream or Parquet file
+
+    Columns are index and error, then flatten_result's columns.
+    """
+    import pyarrow as pa
+
+    criteria = rubric_criteria()
+    schema = arrow_schema([('index', pa.int64()), ('error', pa.string())], criteria)
+    rows = [
+        {'index': index, 'error': error, **flatten_result(result, criteria)}
+        for index, result, error in items
+    ]
+    table = pa.Table.from_pylist(rows, schema=schema)
+
+    sink = io.BytesIO()
+    if media_format == 'parquet':
+        import pyarrow.parquet as pq
+        pq.write_table(table, sink)
+    else:
+        with pa.ipc.new_stream(sink, schema) as writer:
+            writer.write_table(table)
+    return sink.getvalue()
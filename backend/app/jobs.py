@@ -0,0 +1,393 @@
+"""
+Durable job queue for bulk evaluations
+
+Jobs and their transcripts live in SQLite, so no external broker is needed and
+queued work survives a restart. Every server process runs a JobRunner that
+claims chunks of items under a lease and scores them through the shared
+EvaluationPool; an item whose lease runs out (its process died) is claimed again.
+"""
+
+import asyncio
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+from app.api.pool import EvaluationPool, PoolSaturatedError
+from app.config import settings
+from app.metrics import observe_evaluation
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+COMPLETED = 'completed'
+
+
+class JobNotFoundError(Exception):
+    """Raised for an unknown job id"""
+
+
+def _timestamp(value: Optional[float]) -> Optional[datetime]:
+    return datetime.fromtimestamp(value, timezone.utc) if value is not None else None
+
+
+class JobStore:
+    """SQLite-backed jobs and items, safe to share between worker processes"""
+
+    def __init__(self, path: str, lease_seconds: float = 120.0):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self._local = threading.local()
+
+        conn = self._connect()
+        conn.executescript(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, priority INTEGER NOT NULL, max_concurrency INTEGER NOT NULL, "
+            "cancelled INTEGER NOT NULL DEFAULT 0, created_at REAL NOT NULL, "
+            "started_at REAL, finished_at REAL, rubric TEXT);"
+            "CREATE TABLE IF NOT EXISTS job_items ("
+            "job_id TEXT NOT NULL, idx INTEGER NOT NULL, transcript TEXT, state TEXT NOT NULL, "
+            "claim TEXT, lease_expires REAL, result TEXT, error TEXT, "
+            "PRIMARY KEY (job_id, idx));"
+            "CREATE INDEX IF NOT EXISTS job_items_state ON job_items (state, job_id);"
+        )
+        # Stores from before per-job rubrics; their jobs score against the default rubric
+        if 'rubric' not in {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}:
+            conn.execute("ALTER TABLE jobs ADD COLUMN rubric TEXT")
+        conn.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Autocommit mode, so claims can take the write lock with BEGIN IMMEDIATE
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def create(
+        self,
+        items: List[Tuple[Optional[str], Optional[str]]],
+        priority: int = 0,
+        max_concurrency: int = 1,
+        rubric_id: Optional[str] = None
+    ) -> str:
+        """
+        Queue a job
+
+        Args:
+            items: (transcript, error) per input; items with an error are stored
+                as already failed and never reach a worker
+            priority: Higher priorities are drained first
+            max_concurrency: Chunks of this job that may be scored at once
+            rubric_id: Rubric every item is scored against, the default when None
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        # A job with nothing valid to score is finished as soon as it exists
+        finished_at = None if any(error is None for _, error in items) else now
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT INTO jobs (id, priority, max_concurrency, created_at, finished_at, rubric) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, priority, max_concurrency, now, finished_at, rubric_id)
+            )
+            conn.executemany(
+                "INSERT INTO job_items (job_id, idx, transcript, state, error) VALUES (?, ?, ?, ?, ?)",
+                (
+                    (job_id, index, transcript, QUEUED if error is None else FAILED, error)
+                    for index, (transcript, error) in enumerate(items)
+                )
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return job_id
+
+    def get(self, job_id: str) -> Dict:
+        conn = self._connect()
+        job = conn.execute(
+            "SELECT priority, max_concurrency, cancelled, created_at, started_at, finished_at, rubric FROM jobs WHERE id = ?",
+            (job_id,)
+        ).fetchone()
+        if job is None:
+            raise JobNotFoundError(job_id)
+        priority, max_concurrency, cancelled, created_at, started_at, finished_at, rubric_id = job
+
+        counts = {QUEUED: 0, RUNNING: 0, SUCCEEDED: 0, FAILED: 0, CANCELLED: 0}
+        for state, count in conn.execute(
+            "SELECT state, COUNT(*) FROM job_items WHERE job_id = ? GROUP BY state", (job_id,)
+        ):
+            counts[state] = count
+
+        if cancelled:
+            status = CANCELLED
+        elif counts[QUEUED] + counts[RUNNING] == 0:
+            status = COMPLETED
+        elif started_at is not None:
+            status = RUNNING
+        else:
+            status = QUEUED
+
+        return {
+            'job_id': job_id,
+            'status': status,
+            'rubric_id': rubric_id,
+            'priority': priority,
+            'max_concurrency': max_concurrency,
+            'total': sum(counts.values()),
+            **counts,
+            'created_at': _timestamp(created_at),
+            'started_at': _timestamp(started_at),
+            'finished_at': _timestamp(finished_at)
+        }
+
+    def results(self, job_id: str, offset: int = 0, limit: Optional[int] = None) -> List[Tuple[int, Optional[str], Optional[str]]]:
+        """(index, result JSON, error) for finished items, in input order"""
+        self.get(job_id)
+        return self._connect().execute(
+            "SELECT idx, result, error FROM job_items WHERE job_id = ? AND state IN (?, ?) "
+            "ORDER BY idx LIMIT ? OFFSET ?",
+            (job_id, SUCCEEDED, FAILED, -1 if limit is None else limit, offset)
+        ).fetchall()
+
+    def iter_results(self, job_id: str, chunk_size: int = 500) -> Iterator[Tuple[int, Optional[str], Optional[str]]]:
+        """Every finished item, read a chunk at a time so large jobs stream in constant memory"""
+        offset = 0
+        while True:
+            rows = self.results(job_id, offset, chunk_size)
+            yield from rows
+            if len(rows) < chunk_size:
+                return
+            offset += len(rows)
+
+    def cancel(self, job_id: str) -> Dict:
+        """Drop the job's queued items; chunks already being scored still finish"""
+        self.get(job_id)
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("UPDATE jobs SET cancelled = 1 WHERE id = ?", (job_id,))
+            conn.execute(
+                "UPDATE job_items SET state = ? WHERE job_id = ? AND state = ?", (CANCELLED, job_id, QUEUED)
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return self.get(job_id)
+
+    def claim(self, chunk_size: int) -> Optional[Tuple[str, str, Optional[str], List[Tuple[int, str]]]]:
+        """
+        Lease the next chunk of queued items
+
+        Picks the highest-priority, oldest job with queued items that is below
+        its max_concurrency, counting each leased chunk once.
+
+        Returns:
+            (job_id, claim id, rubric id, [(index, transcript)]), or None when
+            nothing is claimable
+        """
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Items leased by a process that stopped without finishing go back on the queue
+            conn.execute(
+                "UPDATE job_items SET state = ?, claim = NULL, lease_expires = NULL "
+                "WHERE state = ? AND lease_expires < ?",
+                (QUEUED, RUNNING, now)
+            )
+            row = conn.execute(
+                "SELECT id, rubric FROM jobs WHERE cancelled = 0 "
+                "AND EXISTS (SELECT 1 FROM job_items WHERE job_id = jobs.id AND state = ?) "
+                "AND (SELECT COUNT(DISTINCT claim) FROM job_items WHERE job_id = jobs.id AND state = ?) < max_concurrency "
+                "ORDER BY priority DESC, created_at LIMIT 1",
+                (QUEUED, RUNNING)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+
+            job_id, rubric_id = row
+            claim_id = uuid.uuid4().hex
+            items = conn.execute(
+                "SELECT idx, transcript FROM job_items WHERE job_id = ? AND state = ? ORDER BY idx LIMIT ?",
+                (job_id, QUEUED, chunk_size)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE job_items SET state = ?, claim = ?, lease_expires = ? WHERE job_id = ? AND idx = ?",
+                ((RUNNING, claim_id, now + self.lease_seconds, job_id, index) for index, _ in items)
+            )
+            conn.execute("UPDATE jobs SET started_at = COALESCE(started_at, ?) WHERE id = ?", (now, job_id))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return job_id, claim_id, rubric_id, items
+
+    def complete(self, job_id: str, claim_id: str, outcomes: List[Tuple[int, Optional[str], Optional[str]]]):
+        """
+        Store (index, result JSON, error) for a claimed chunk
+
+        Items whose lease was lost to another worker are left to that worker.
+        """
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "UPDATE job_items SET state = ?, result = ?, error = ?, claim = NULL, lease_expires = NULL "
+                "WHERE job_id = ? AND idx = ? AND claim = ?",
+                (
+                    (SUCCEEDED if error is None else FAILED, result, error, job_id, index, claim_id)
+                    for index, result, error in outcomes
+                )
+            )
+            conn.execute(
+                "UPDATE jobs SET finished_at = ? WHERE id = ? AND finished_at IS NULL "
+                "AND NOT EXISTS (SELECT 1 FROM job_items WHERE job_id = ? AND state IN (?, ?))",
+                (time.time(), job_id, job_id, QUEUED, RUNNING)
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def renew(self, job_id: str, claim_id: str):
+        """Extend the lease on a chunk that is still being scored"""
+        self._connect().execute(
+            "UPDATE job_items SET lease_expires = ? WHERE job_id = ? AND claim = ? AND state = ?",
+            (time.time() + self.lease_seconds, job_id, claim_id, RUNNING)
+        )
+
+    def release(self, job_id: str, claim_id: str):
+        """Return a claimed chunk to the queue without scoring it"""
+        self._connect().execute(
+            "UPDATE job_items SET state = CASE WHEN (SELECT cancelled FROM jobs WHERE id = ?) THEN ? ELSE ? END, "
+            "claim = NULL, lease_expires = NULL WHERE job_id = ? AND claim = ?",
+            (job_id, CANCELLED, QUEUED, job_id, claim_id)
+        )
+
+    def stats(self) -> Dict:
+        counts = dict(self._connect().execute(
+            "SELECT state, COUNT(*) FROM job_items WHERE state IN (?, ?) GROUP BY state", (QUEUED, RUNNING)
+        ).fetchall())
+        return {'queued': counts.get(QUEUED, 0), 'running': counts.get(RUNNING, 0)}
+
+
+class JobRunner:
+    """
+    Drains the JobStore through the evaluation pool
+
+    Job chunks only start on an idle worker and at most `slots` run at once, so
+    interactive /api/evaluate requests never wait behind more than `slots`
+    chunks and the job queue can't saturate the pool. A chunk's lease is
+    renewed while it is being scored, so only a chunk whose process died is
+    claimed again.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        pool: EvaluationPool,
+        slots: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        poll_seconds: Optional[float] = None
+    ):
+        self.store = store
+        self.pool = pool
+        self.slots = slots or settings.job_pool_slots
+        self.chunk_size = chunk_size or settings.job_chunk_size
+        self.poll_seconds = poll_seconds or settings.job_poll_seconds
+        self._task: Optional[asyncio.Task] = None
+        self._chunks = set()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        tasks = [task for task in (self._task, *self._chunks) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+
+    def _has_free_worker(self) -> bool:
+        stats = self.pool.stats()
+        return len(self._chunks) < self.slots and stats['active'] + stats['queued'] < self.pool.workers
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            claimed = None
+            if self._has_free_worker():
+                try:
+                    claimed = await loop.run_in_executor(None, self.store.claim, self.chunk_size)
+                except Exception as e:
+                    print(f"Job queue error: {e}")
+            if claimed is None:
+                await asyncio.sleep(self.poll_seconds)
+                continue
+
+            chunk = loop.create_task(self._score_chunk(*claimed))
+            self._chunks.add(chunk)
+            chunk.add_done_callback(self._chunks.discard)
+
+    async def _score_chunk(self, job_id: str, claim_id: str, rubric_id: Optional[str], items: List[Tuple[int, str]]):
+        loop = asyncio.get_running_loop()
+        indices = [index for index, _ in items]
+        transcripts = [transcript for _, transcript in items]
+        heartbeat = loop.create_task(self._renew_lease(job_id, claim_id))
+        try:
+            scored, timings = await self.pool.submit("evaluate_many_timed", transcripts, rubric_id, limit=self.pool.workers)
+        except PoolSaturatedError:
+            # A request took the free worker first; the chunk waits for the next one
+            await loop.run_in_executor(None, self.store.release, job_id, claim_id)
+            return
+        except asyncio.CancelledError:
+            # Shielded so shutdown can't abandon the write half-way; if it still fails the lease runs out
+            try:
+                await asyncio.shield(loop.run_in_executor(None, self.store.release, job_id, claim_id))
+            except Exception as e:
+                print(f"Job {job_id} chunk could not be released: {e}")
+            raise
+        except Exception as e:
+            print(f"Job {job_id} chunk failed: {e}")
+            outcomes = [(index, None, str(e)) for index in indices]
+        else:
+            degraded = {stage for item in scored if item.result for stage in item.result.degraded_stages}
+            observe_evaluation(transcripts, timings, sorted(degraded), mode='job')
+            outcomes = [
+                (index, item.result.model_dump_json() if item.result else None, item.error)
+                for index, item in zip(indices, scored)
+            ]
+        finally:
+            heartbeat.cancel()
+        await loop.run_in_executor(None, self.store.complete, job_id, claim_id, outcomes)
+
+    async def _renew_lease(self, job_id: str, claim_id: str):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.store.lease_seconds / 3)
+            try:
+                await loop.run_in_executor(None, self.store.renew, job_id, claim_id)
+            except Exception as e:
+                print(f"Job {job_id} lease renewal failed: {e}")
+
+
+def create_job_store() -> Optional[JobStore]:
+    """Open the store described by Settings, or None when the job API is disabled"""
+    if not settings.job_store_path:
+        return None
+    try:
+        return JobStore(settings.job_store_path, settings.job_lease_seconds)
+    except Exception as e:
+        print(f"Warning: Could not open job store at {settings.job_store_path}: {e}")
+        return None
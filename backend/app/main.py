@@ -1,7 +1,13 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+import time
+from fastapi import FastAPI, Request
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.routes import router
+from app.api.compression import CompressionMiddleware
+from app.api.routes import router, pool, job_runner
 from app.config import settings
+from app import metrics
 from app import __version__
 
 app = FastAPI(
@@ -20,19 +26,84 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_minimum_size,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality
+    )
+
 app.include_router(router, prefix="/api", tags=["evaluation"])
 
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        # Label by endpoint function, not URL, so path parameters can't explode cardinality
+        endpoint = request.scope.get('endpoint')
+        name = endpoint.__name__ if endpoint is not None else 'unmatched'
+        metrics.requests_total.inc(endpoint=name, status=status_code)
+        metrics.request_duration.observe(time.perf_counter() - start, endpoint=name)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return Response(content=metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+
+logger = logging.getLogger(__name__)
+
+
+@app.on_event("startup")
+async def start_warm_up():
+    # Warm up in the background so the server accepts connections (and answers
+    # /api/health) immediately; /api/ready turns 200 once every model is loaded
+    if settings.warm_up_on_startup:
+        loop = asyncio.get_running_loop()
+        app.state.warm_up = loop.run_in_executor(None, warm_up_models)
+
+
+@app.on_event("startup")
+async def start_job_runner():
+    # Picks up jobs left queued or half-done by a previous run
+    if job_runner is not None:
+        job_runner.start()
+
+
+def warm_up_models():
+    try:
+        pool.warm_up()
+        logger.info("Warm-up complete: %s", pool.scorer.readiness.components())
+    except Exception as e:
+        logger.error(f"Warm-up failed: {str(e)}", exc_info=True)
+
+
+@app.on_event("shutdown")
+async def shutdown_pool():
+    if job_runner is not None:
+        await job_runner.stop()
+    pool.shutdown()
+
+
 @app.get("/")
 async def root():
     return {
         "message": "AI Speech Evaluation System API",
         "version": __version__,
         "docs": "/docs",
-        "health": "/api/health"
+        "health": "/api/health",
+        "ready": "/api/ready"
     }
 
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Multi-worker launcher that shares model weights between workers
+    from app.serve import main
+    main()
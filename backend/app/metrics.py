@@ -0,0 +1,260 @@
+"""
+Stage timing and Prometheus-compatible metrics
+
+Kept dependency-free: counters, gauges and histograms rendered in the
+Prometheus text exposition format (version 0.0.4).
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+TRANSCRIPT_CHAR_BUCKETS = (50, 100, 250, 500, 1000, 2000, 3000, 5000, 10000)
+
+
+class StageTimer:
+    """Collects per-stage durations (seconds) for one evaluation"""
+
+    def __init__(self):
+        self.durations: Dict[str, float] = {}
+
+    @contextmanager
+    def span(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, seconds: float):
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+
+def server_timing_header(durations: Dict[str, float]) -> str:
+    """Server-Timing header value, durations in milliseconds"""
+    return ', '.join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in durations.items())
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+
+    type_name = 'counter'
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = labels
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(str(labels[name]) for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        return [
+            f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class CallbackMetric:
+    """
+    Value read from a callback at scrape time, e.g. the current queue depth
+
+    Also used for counters kept elsewhere (cache hit counts), exposed with
+    type_name='counter'.
+    """
+
+    def __init__(self, name: str, documentation: str, callback: Callable[[], float], type_name: str = 'gauge'):
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+        self.type_name = type_name
+
+    def samples(self) -> List[str]:
+        try:
+            value = self.callback()
+        except Exception:
+            return []
+        return [] if value is None else [f"{self.name} {_format_value(value)}"]
+
+
+class Histogram:
+
+    type_name = 'histogram'
+
+    def __init__(self, name: str, documentation: str, buckets: Tuple[float, ...], labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self.label_names = labels
+        # Per label set: [count per bucket (+Inf last), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels[name]) for name in self.label_names)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            snapshot = {key: (list(counts), total) for key, (counts, total) in self._series.items()}
+
+        lines = []
+        for key, (counts, total) in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labels: Tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labels))
+
+    def histogram(self, name: str, documentation: str, buckets: Tuple[float, ...], labels: Tuple[str, ...] = ()) -> Histogram:
+        return self.register(Histogram(name, documentation, buckets, labels))
+
+    def callback(self, name: str, documentation: str, callback: Callable[[], float], type_name: str = 'gauge') -> CallbackMetric:
+        return self.register(CallbackMetric(name, documentation, callback, type_name))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+requests_total = registry.counter(
+    'speech_eval_requests_total', 'HTTP requests by endpoint and status code', ('endpoint', 'status')
+)
+request_duration = registry.histogram(
+    'speech_eval_request_duration_seconds', 'HTTP request latency', LATENCY_BUCKETS, ('endpoint',)
+)
+stage_duration = registry.histogram(
+    'speech_eval_stage_duration_seconds',
+    'Time spent in each evaluation stage (batch mode: summed over the batch)',
+    LATENCY_BUCKETS,
+    ('stage', 'mode')
+)
+transcript_chars = registry.histogram(
+    'speech_eval_transcript_chars', 'Length of evaluated transcripts in characters', TRANSCRIPT_CHAR_BUCKETS
+)
+degraded_stages_total = registry.counter(
+    'speech_eval_degraded_stages_total', 'Stages left out of a result after failing or timing out', ('stage',)
+)
+
+
+def observe_evaluation(
+    transcripts: List[str],
+    durations: Dict[str, float],
+    degraded_stages: Optional[List[str]] = None,
+    mode: str = 'single'
+):
+    for transcript in transcripts:
+        transcript_chars.observe(len(transcript))
+    for stage, seconds in durations.items():
+        stage_duration.observe(seconds, stage=stage, mode=mode)
+    for stage in degraded_stages or ():
+        degraded_stages_total.inc(stage=stage)
+
+
+def register_stats_gauges(pool):
+    """Queue depth and cache effectiveness, read from the live objects at scrape time"""
+    def stat(source: Callable[[], Dict], key: str) -> Callable[[], float]:
+        return lambda: source().get(key)
+
+    # From the pool, so process mode reports the workers' caches rather than this process's
+    def worker_section(section: str) -> Callable[[], Dict]:
+        return lambda: pool.worker_stats()[section]
+
+    result_cache_stats = worker_section('result_cache')
+    embedding_cache_stats = worker_section('embedding_cache')
+
+    registry.callback('speech_eval_pool_active', 'Evaluations running in the worker pool', stat(pool.stats, 'active'))
+    registry.callback('speech_eval_pool_queued', 'Evaluations waiting for a worker', stat(pool.stats, 'queued'))
+    registry.callback('speech_eval_pool_saturation', 'Fraction of pool capacity (workers + queue) in use', stat(pool.stats, 'saturation'))
+    registry.callback(
+        'speech_eval_pool_rejected_total', 'Evaluations rejected because the pool was saturated',
+        stat(pool.stats, 'rejected'), 'counter'
+    )
+
+    for prefix, source in (('result_cache', result_cache_stats), ('embedding_cache', embedding_cache_stats)):
+        label = prefix.replace('_', ' ')
+        registry.callback(f'speech_eval_{prefix}_memory_hits_total', f'{label.capitalize()} hits served from memory', stat(source, 'memory_hits'), 'counter')
+        registry.callback(f'speech_eval_{prefix}_disk_hits_total', f'{label.capitalize()} hits served from disk', stat(source, 'disk_hits'), 'counter')
+        registry.callback(f'speech_eval_{prefix}_misses_total', f'{label.capitalize()} misses', stat(source, 'misses'), 'counter')
+        registry.callback(f'speech_eval_{prefix}_hit_ratio', f'{label.capitalize()} hit ratio since start', stat(source, 'hit_rate'))
+        registry.callback(f'speech_eval_{prefix}_entries', f'Entries in the {label}', stat(source, 'size'))
+
+    registry.callback(
+        'speech_eval_embedding_cache_disk_evictions_total', 'Embedding store rows recycled for newer sentences',
+        stat(embedding_cache_stats, 'disk_evictions'), 'counter'
+    )
+
+    shadow_stats = worker_section('grammar_shadow')
+    registry.callback(
+        'speech_eval_grammar_shadow_agreed_total', 'Sampled fast-path grammar results that matched LanguageTool',
+        stat(shadow_stats, 'agreed'), 'counter'
+    )
+    registry.callback(
+        'speech_eval_grammar_shadow_disagreed_total', 'Sampled fast-path grammar results that differed from LanguageTool',
+        stat(shadow_stats, 'disagreed'), 'counter'
+    )
+
+
+def register_job_gauges(job_store):
+    """Job items waiting and in progress, across every process sharing the store"""
+    def stat(key: str) -> Callable[[], float]:
+        return lambda: job_store.stats().get(key)
+
+    registry.callback('speech_eval_job_items_queued', 'Job transcripts waiting to be scored', stat('queued'))
+    registry.callback('speech_eval_job_items_running', 'Job transcripts being scored', stat('running'))
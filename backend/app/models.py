@@ -1,9 +1,13 @@
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, computed_field, validator
+from datetime import datetime
 from typing import List, Dict, Optional
+from app.config import settings
 
 
 class TranscriptRequest(BaseModel):
     transcript: str = Field(..., min_length=10, max_length=5000)
+    # Scored against the default rubric when not given
+    rubric_id: Optional[str] = Field(default=None, max_length=128)
     
     @validator('transcript')
     def validate_transcript(cls, v):
@@ -18,18 +22,21 @@ class CriterionScore(BaseModel):
     max_score: float
     feedback: str
     weight: float
-    percentage: float = Field(default=0.0)
+    available: bool = True
     
-    def __init__(self, **data):
-        super().__init__(**data)
+    @computed_field
+    @property
+    def percentage(self) -> float:
         if self.max_score > 0:
-            self.percentage = (self.score / self.max_score) * 100
+            return (self.score / self.max_score) * 100
+        return 0.0
 
 
 class DetailedAnalysis(BaseModel):
     keywords_found: List[str]
     keywords_missing: List[str]
     grammar_errors: int
+    grammar_available: bool = True
     grammar_error_rate: float
     filler_words_count: int
     filler_word_rate: float
@@ -37,42 +44,159 @@ class DetailedAnalysis(BaseModel):
     vocabulary_richness: float
     speech_rate_wpm: float
     salutation_detected: Optional[str] = None
+    coherence_metrics: Optional[Dict[str, float]] = None
 
 
 class EvaluationResponse(BaseModel):
     overall_score: float
+    # Set by the scorer from overall_score, by the rubric's 'grade' scoring table
     grade: str
+    rubric_id: str = 'default'
     word_count: int
     sentence_count: int
     criteria_scores: List[CriterionScore]
     detailed_analysis: DetailedAnalysis
     summary: str
+    degraded_stages: List[str] = []
+
+
+class IncrementalEvaluationRequest(TranscriptRequest):
+    session_id: Optional[str] = Field(default=None, max_length=128)
+
+
+class IncrementalEvaluationResponse(EvaluationResponse):
+    session_id: str
+    sentences_reused: int
+    sentences_analyzed: int
+
+
+class BatchEvaluationRequest(BaseModel):
+    transcripts: List[str] = Field(..., min_length=1)
+    rubric_id: Optional[str] = Field(default=None, max_length=128)
+    
+    @validator('transcripts')
+    def validate_batch_size(cls, v):
+        if len(v) > settings.max_batch_size:
+            raise ValueError(f'Batch cannot contain more than {settings.max_batch_size} transcripts')
+        return v
+
+
+class BatchItemResult(BaseModel):
+    index: int
+    result: Optional[EvaluationResponse] = None
+    error: Optional[str] = None
+
+
+class BatchEvaluationResponse(BaseModel):
+    results: List[BatchItemResult]
+    succeeded: int
+    failed: int
+
+
+class JobRequest(BaseModel):
+    transcripts: List[str] = Field(..., min_length=1)
+    rubric_id: Optional[str] = Field(default=None, max_length=128)
+    priority: int = 0
+    max_concurrency: int = Field(default=1, ge=1)
     
-    @validator('grade', always=True)
-    def calculate_grade(cls, v, values):
-        if 'overall_score' not in values:
-            return 'N/A'
-        
-        score = values['overall_score']
-        if score >= 90:
-            return 'A+'
-        elif score >= 85:
-            return 'A'
-        elif score >= 80:
-            return 'B+'
-        elif score >= 75:
-            return 'B'
-        elif score >= 70:
-            return 'C+'
-        elif score >= 65:
-            return 'C'
-        elif score >= 60:
-            return 'D'
-        else:
-            return 'F'
+    @validator('transcripts')
+    def validate_job_size(cls, v):
+        if len(v) > settings.max_job_size:
+            raise ValueError(f'Job cannot contain more than {settings.max_job_size} transcripts')
+        return v
+
+
+class JobStatus(BaseModel):
+    job_id: str
+    status: str
+    rubric_id: Optional[str] = None
+    priority: int
+    max_concurrency: int
+    total: int
+    queued: int
+    running: int
+    succeeded: int
+    failed: int
+    cancelled: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class JobResultsPage(BaseModel):
+    job_id: str
+    offset: int
+    limit: int
+    results: List[BatchItemResult]
+
+
+class RubricCriterion(BaseModel):
+    name: str
+    weight: float
+    max_score: float
+
+
+class RubricInfo(BaseModel):
+    id: str
+    name: str
+    fingerprint: str
+    criteria: Dict[str, RubricCriterion]
+    source: Optional[str] = None
+
+
+class RubricList(BaseModel):
+    rubrics: List[RubricInfo]
+    # Rubric files that failed to load, by path; their last good version stays in service
+    errors: Dict[str, str] = {}
+
+
+class ComponentStatus(BaseModel):
+    name: str
+    state: str
+    load_seconds: Optional[float] = None
+    warmup_seconds: Optional[float] = None
+    error: Optional[str] = None
 
 
 class HealthResponse(BaseModel):
     status: str
     version: str
     models_loaded: bool
+    components: List[ComponentStatus] = []
+
+
+class ReadinessResponse(BaseModel):
+    ready: bool
+    degraded: bool = False
+    components: List[ComponentStatus]
+
+
+class PoolStats(BaseModel):
+    pool_type: str
+    workers: int
+    queue_size: int
+    active: int
+    queued: int
+    saturation: float
+    completed: int
+    failed: int
+    rejected: int
+
+
+class CacheStats(BaseModel):
+    enabled: bool
+    fingerprint: Optional[str] = None
+    size: int = 0
+    max_entries: int = 0
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    hit_rate: float = 0.0
+    disk_tier: bool = False
+    disk_evictions: int = 0
+
+
+class StatsResponse(BaseModel):
+    pool: PoolStats
+    result_cache: CacheStats
+    embedding_cache: CacheStats
@@ -0,0 +1,195 @@
+"""
+Sentence embedding backends: PyTorch, exported ONNX and int8-quantized ONNX
+
+Every backend returns L2-normalized float32 embeddings. The ONNX backends
+agree with the PyTorch reference on avg_similarity within
+EMBEDDING_BACKEND_TOLERANCE (checked by benchmarks/embedding_backends.py).
+"""
+
+import json
+import os
+from typing import List
+import numpy as np
+from app.config import settings
+from app.artifacts import sentence_transformer_dir, onnx_model_dir
+
+BACKENDS = ('torch', 'onnx', 'onnx-int8')
+
+# Weight precision of each backend's model; part of the result cache fingerprint
+BACKEND_QUANTIZATION = {'torch': 'float32', 'onnx': 'float32', 'onnx-int8': 'int8'}
+
+# Maximum absolute avg_similarity difference accepted between backends
+EMBEDDING_BACKEND_TOLERANCE = 0.02
+
+ONNX_MODEL_FILE = "model.onnx"
+QUANTIZED_MODEL_FILE = "model-int8.onnx"
+BACKEND_CONFIG_FILE = "embedding_backend.json"
+
+
+class TorchEmbeddingBackend:
+    """SentenceTransformer running on PyTorch"""
+
+    name = 'torch'
+
+    def __init__(self, model_name: str, threads: int = 0):
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        if threads > 0:
+            torch.set_num_threads(threads)
+        self.model = SentenceTransformer(model_name)
+
+    def encode(self, sentences: List[str]) -> np.ndarray:
+        return self.model.encode(
+            sentences,
+            batch_size=settings.embedding_batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True
+        )
+
+
+class OnnxEmbeddingBackend:
+    """Exported transformer on ONNX Runtime with mean pooling done in NumPy"""
+
+    name = 'onnx'
+    model_file = ONNX_MODEL_FILE
+
+    def __init__(self, model_dir: str, threads: int = 0):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        model_path = os.path.join(model_dir, self.model_file)
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(
+                f"{model_path} not found; run 'python -m app.nlp.embedding_backends export' first"
+            )
+
+        options = ort.SessionOptions()
+        if threads > 0:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(model_path, options, providers=['CPUExecutionProvider'])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+
+        with open(os.path.join(model_dir, BACKEND_CONFIG_FILE)) as f:
+            self.max_seq_length = json.load(f)['max_seq_length']
+
+    def encode(self, sentences: List[str]) -> np.ndarray:
+        batches = []
+        for start in range(0, len(sentences), settings.embedding_batch_size):
+            batches.append(self._encode_batch(sentences[start:start + settings.embedding_batch_size]))
+        return np.concatenate(batches)
+
+    def _encode_batch(self, sentences: List[str]) -> np.ndarray:
+        tokens = self.tokenizer(
+            sentences,
+            padding=True,
+            truncation=True,
+            max_length=self.max_seq_length,
+            return_tensors='np'
+        )
+        inputs = {name: value.astype(np.int64) for name, value in tokens.items() if name in self.input_names}
+        token_embeddings = self.session.run(None, inputs)[0]
+
+        mask = tokens['attention_mask'][..., None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return (pooled / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+
+class QuantizedOnnxEmbeddingBackend(OnnxEmbeddingBackend):
+    """Dynamically int8-quantized ONNX model"""
+
+    name = 'onnx-int8'
+    model_file = QUANTIZED_MODEL_FILE
+
+
+def resolve_model_path(model_name: str) -> str:
+    """
+    Local copy of the model written by `python -m app.prefetch`
+
+    Loading from a directory never touches the network; falling back to the
+    hub name (which downloads on a cache miss) needs allow_model_downloads.
+    """
+    local_dir = sentence_transformer_dir(model_name)
+    if os.path.isdir(local_dir):
+        return local_dir
+    if settings.allow_model_downloads:
+        return model_name
+    raise FileNotFoundError(
+        f"{model_name} not found in {local_dir}; run 'python -m app.prefetch' first"
+    )
+
+
+def create_embedding_backend(backend: str = None):
+    backend = backend or settings.embedding_backend
+    threads = settings.embedding_threads
+    if backend == 'torch':
+        return TorchEmbeddingBackend(resolve_model_path(settings.sentence_transformer_model), threads)
+
+    model_dir = settings.embedding_onnx_dir or onnx_model_dir(settings.sentence_transformer_model)
+    if backend == 'onnx':
+        return OnnxEmbeddingBackend(model_dir, threads)
+    if backend == 'onnx-int8':
+        return QuantizedOnnxEmbeddingBackend(model_dir, threads)
+    raise ValueError(f"Unknown embedding backend: {backend} (expected one of {', '.join(BACKENDS)})")
+
+
+def export_onnx_model(model_name: str, output_dir: str, quantize: bool = True) -> List[str]:
+    """
+    Export a SentenceTransformer to ONNX, optionally with an int8 copy
+
+    Returns:
+        Paths of the files written
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    os.makedirs(output_dir, exist_ok=True)
+    model = SentenceTransformer(model_name, device='cpu')
+    transformer = model[0].auto_model
+    transformer.config.return_dict = False
+    transformer.eval()
+
+    sample = model.tokenizer(["Hello, my name is Sam."], return_tensors='pt')
+    input_names = [name for name in ('input_ids', 'attention_mask', 'token_type_ids') if name in sample]
+    onnx_path = os.path.join(output_dir, ONNX_MODEL_FILE)
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer,
+            tuple(sample[name] for name in input_names),
+            onnx_path,
+            input_names=input_names,
+            output_names=['last_hidden_state'],
+            dynamic_axes={name: {0: 'batch', 1: 'sequence'} for name in input_names + ['last_hidden_state']},
+            opset_version=14
+        )
+
+    model.tokenizer.save_pretrained(output_dir)
+    with open(os.path.join(output_dir, BACKEND_CONFIG_FILE), 'w') as f:
+        json.dump({'model': model_name, 'max_seq_length': model.max_seq_length}, f)
+
+    written = [onnx_path]
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantized_path = os.path.join(output_dir, QUANTIZED_MODEL_FILE)
+        quantize_dynamic(onnx_path, quantized_path, weight_type=QuantType.QInt8)
+        written.append(quantized_path)
+    return written
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export the sentence embedding model to ONNX")
+    parser.add_argument('command', choices=['export'])
+    parser.add_argument('--model', default=settings.sentence_transformer_model)
+    parser.add_argument('--output', default=None)
+    parser.add_argument('--no-quantize', action='store_true')
+    args = parser.parse_args()
+
+    output_dir = args.output or settings.embedding_onnx_dir or onnx_model_dir(args.model)
+    for path in export_onnx_model(args.model, output_dir, quantize=not args.no_quantize):
+        print(f"Wrote {path}")
@@ -0,0 +1,222 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import numpy as np
+
+
+def normalize_sentence(sentence: str) -> str:
+    return ' '.join(sentence.split())
+
+
+class DiskEmbeddingStore:
+    """
+    Memory-mapped float16 embedding store that survives restarts
+
+    Vectors live in a fixed-capacity memmap file; a SQLite index maps sentence
+    digests to rows so several worker processes can share one store. The file
+    is a ring buffer: once every row is used, new vectors overwrite the oldest
+    rows and those rows' index entries are dropped (counted as evictions).
+    """
+
+    def __init__(self, directory: str, model_name: str, capacity: int):
+        os.makedirs(directory, exist_ok=True)
+        slug = model_name.replace('/', '_')
+        self.vectors_path = os.path.join(directory, f"{slug}.f16")
+        self.capacity = capacity
+        self._vectors = None
+        self._dim = None
+        self._local = threading.local()
+        self._evictions = 0
+
+        self._index_path = os.path.join(directory, f"{slug}.index.sqlite")
+        conn = self._connect()
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS rows (digest TEXT PRIMARY KEY, row INTEGER NOT NULL)")
+        conn.execute("CREATE INDEX IF NOT EXISTS rows_row ON rows (row)")
+        conn.commit()
+
+        row = conn.execute("SELECT value FROM meta WHERE key = 'dim'").fetchone()
+        if row:
+            self._open(int(row[0]))
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self._index_path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _open(self, dim: int):
+        mode = 'r+' if os.path.exists(self.vectors_path) else 'w+'
+        self._vectors = np.memmap(self.vectors_path, dtype=np.float16, mode=mode, shape=(self.capacity, dim))
+        self._dim = dim
+
+    def _rows(self, digests: List[str]) -> Dict[str, int]:
+        placeholders = ','.join('?' * len(digests))
+        return dict(self._connect().execute(
+            f"SELECT digest, row FROM rows WHERE digest IN ({placeholders})", digests
+        ).fetchall())
+
+    def get_many(self, digests: List[str]) -> Dict[str, np.ndarray]:
+        if self._vectors is None or not digests:
+            return {}
+        rows = self._rows(digests)
+        found = {digest: np.array(self._vectors[row], dtype=np.float32) for digest, row in rows.items()}
+        if found:
+            # A row recycled by another worker while it was copied has lost its index entry by now
+            current = self._rows(list(found))
+            found = {digest: vector for digest, vector in found.items() if current.get(digest) == rows[digest]}
+        return found
+
+    def put_many(self, digests: List[str], vectors: np.ndarray):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if self._vectors is None:
+                dim = vectors.shape[1]
+                conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('dim', ?)", (str(dim),))
+                self._open(int(conn.execute("SELECT value FROM meta WHERE key = 'dim'").fetchone()[0]))
+
+            known = set(self._rows(list(digests))) if digests else set()
+            new = list({digest: vector for digest, vector in zip(digests, vectors) if digest not in known}.items())
+            new = new[-self.capacity:]
+            if not new:
+                conn.execute("COMMIT")
+                return
+
+            # Stores written before the ring buffer have no cursor; they were filled from row 0
+            cursor = conn.execute("SELECT value FROM meta WHERE key = 'next_row'").fetchone()
+            cursor = int(cursor[0]) if cursor else conn.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM rows").fetchone()[0]
+            rows = [(cursor + i) % self.capacity for i in range(len(new))]
+            evicted = conn.execute(
+                f"DELETE FROM rows WHERE row IN ({','.join('?' * len(rows))})", rows
+            ).rowcount
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('next_row', ?)",
+                (str((cursor + len(new)) % self.capacity),)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._evictions += evicted
+
+        # Recycled rows leave the index before they are overwritten, and new rows
+        # join it only once their vectors are on disk, so readers never see a
+        # row's index entry next to another sentence's vector
+        for row, (_, vector) in zip(rows, new):
+            self._vectors[row] = vector
+        self._vectors.flush()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT OR IGNORE INTO rows (digest, row) VALUES (?, ?)",
+                ((digest, row) for row, (digest, _) in zip(rows, new))
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    @property
+    def evictions(self) -> int:
+        """Rows this process recycled for newer vectors since start"""
+        return self._evictions
+
+    def __len__(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM rows").fetchone()[0]
+
+
+class EmbeddingCache:
+    """Bounded LRU cache of sentence embeddings, with an optional on-disk tier"""
+
+    def __init__(self, model_name: str, max_entries: int, disk_store: Optional[DiskEmbeddingStore] = None):
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.disk_store = disk_store
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+
+    def _digest(self, key: str) -> str:
+        return hashlib.sha1(f"{self.model_name}\0{key}".encode('utf-8')).hexdigest()
+
+    def encode(self, sentences: List[str], encode_fn) -> np.ndarray:
+        """
+        Return embeddings for sentences, calling encode_fn only for cache misses
+
+        Repeated sentences within the call are encoded once; results come back in input order.
+        """
+        keys = [normalize_sentence(sentence) for sentence in sentences]
+        found = {}
+
+        with self._lock:
+            for key in keys:
+                if key in found:
+                    continue
+                vector = self._entries.get(key)
+                if vector is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = vector
+            self._hits += sum(1 for key in keys if key in found)
+
+        missing = [key for key in dict.fromkeys(keys) if key not in found]
+
+        if missing and self.disk_store is not None:
+            try:
+                digests = {self._digest(key): key for key in missing}
+                from_disk = self.disk_store.get_many(list(digests))
+            except Exception as e:
+                print(f"Embedding cache read error: {e}")
+                from_disk = {}
+            if from_disk:
+                with self._lock:
+                    for digest, vector in from_disk.items():
+                        key = digests[digest]
+                        found[key] = vector
+                        self._store(key, vector)
+                    self._disk_hits += sum(1 for key in keys if key in missing and key in found)
+                missing = [key for key in missing if key not in found]
+
+        if missing:
+            encoded = np.asarray(encode_fn(missing), dtype=np.float32)
+            with self._lock:
+                self._misses += sum(1 for key in keys if key not in found)
+                for key, vector in zip(missing, encoded):
+                    found[key] = vector
+                    self._store(key, vector)
+            if self.disk_store is not None:
+                try:
+                    self.disk_store.put_many([self._digest(key) for key in missing], encoded)
+                except Exception as e:
+                    print(f"Embedding cache write error: {e}")
+
+        return np.stack([found[key] for key in keys])
+
+    def _store(self, key: str, vector: np.ndarray):
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            hits = self._hits + self._disk_hits
+            lookups = hits + self._misses
+            return {
+                'enabled': True,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'memory_hits': self._hits,
+                'disk_hits': self._disk_hits,
+                'misses': self._misses,
+                'hit_rate': round(hits / lookups, 3) if lookups else 0.0,
+                'disk_tier': self.disk_store is not None,
+                'disk_evictions': self.disk_store.evictions if self.disk_store is not None else 0
+            }
@@ -1,80 +1,445 @@
+import random
+import threading
 import language_tool_python
-from typing import Dict, List
+import requests
+from requests.adapters import HTTPAdapter
+from bisect import bisect_right
+from typing import Dict, List, Optional
 from app.config import settings
+from app.artifacts import languagetool_downloaded, use_languagetool_dir
+from app.nlp.rule_grammar import RuleBasedGrammarChecker
+from app.nlp.tokens import TokenizedText
+from app.scoring.tables import ScoringTables, get_scoring_tables
+
+
+SIGNIFICANT_ISSUE_TYPES = ('grammar', 'misspelling', 'typographical')
+
+GRAMMAR_MODES = ('languagetool', 'rules', 'hybrid')
+
+
+class GrammarUnavailableError(Exception):
+    pass
+
+
+class LanguageToolHTTPClient:
+    """Client for a LanguageTool HTTP server that reuses keep-alive connections"""
+    
+    def __init__(self, url: str, language: str, max_connections: int, timeout: float):
+        url = url.rstrip('/')
+        self.url = url if url.endswith('/v2') else f"{url}/v2"
+        self.language = language
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_connections)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+    
+    def check(self, text: str) -> List[Dict]:
+        response = self.session.post(
+            f"{self.url}/check",
+            data={'text': text, 'language': self.language},
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        
+        matches = []
+        for match in response.json().get('matches', []):
+            matches.append({
+                'offset': match['offset'],
+                'length': match['length'],
+                'message': match['message'],
+                'context': match.get('context', {}).get('text', ''),
+                'replacements': [r['value'] for r in match.get('replacements', [])],
+                'issue_type': match.get('rule', {}).get('issueType', '')
+            })
+        return matches
+    
+    def close(self):
+        self.session.close()
+
+
+class LocalToolClient:
+    """Fallback that calls a language_tool_python instance directly"""
+    
+    def __init__(self, tool):
+        self.tool = tool
+    
+    def check(self, text: str) -> List[Dict]:
+        return [
+            {
+                'offset': m.offset,
+                'length': m.errorLength,
+                'message': m.message,
+                'context': m.context,
+                'replacements': list(m.replacements or []),
+                'issue_type': m.ruleIssueType
+            }
+            for m in self.tool.check(text)
+        ]
+    
+    def close(self):
+        pass
+
+
+class EscalationPolicy:
+    """
+    Decides when a fast-path result is re-checked by LanguageTool
+    
+    Escalated texts are scored with LanguageTool's result. Sampled texts are
+    only shadow-checked: LanguageTool runs to measure agreement, but the score
+    stays on the fast path, so the same transcript always scores the same.
+    """
+    
+    def __init__(self, min_confidence: float, sample_rate: float):
+        self.min_confidence = min_confidence
+        self.sample_rate = sample_rate
+        self._random = random.Random()
+    
+    def should_escalate(self, confidence: float, force: bool = False) -> bool:
+        return force or confidence < self.min_confidence
+    
+    def should_sample(self) -> bool:
+        # A small random sample keeps measuring fast-path agreement in production
+        return self._random.random() < self.sample_rate
 
 
 class GrammarChecker:
     
+    # Paragraph break keeps batched transcripts from being read as one sentence
+    BATCH_SEPARATOR = "\n\n"
+    
     def __init__(self):
+        if settings.grammar_mode not in GRAMMAR_MODES:
+            raise ValueError(f"Unknown grammar mode: {settings.grammar_mode}")
+        self.mode = settings.grammar_mode
+        self.rules = RuleBasedGrammarChecker()
+        self.policy = EscalationPolicy(
+            settings.grammar_escalation_min_confidence,
+            settings.grammar_escalation_sample_rate
+        )
+        
+        self.tool = None
+        self.client = None
+        self.load_error = None
+        # LanguageTool (a JVM) starts in load(), on first use or during warm-up
+        self._loaded = False
+        self._load_lock = threading.Lock()
+        # Caps concurrent checks so bursts queue here instead of piling onto the server
+        self._slots = threading.BoundedSemaphore(settings.grammar_max_concurrency)
+        self._shadow_lock = threading.Lock()
+        self._shadow_agreed = 0
+        self._shadow_disagreed = 0
+    
+    def load(self) -> bool:
+        """Connect to LanguageTool once; rules-only mode never needs it"""
+        with self._load_lock:
+            if not self._loaded:
+                if self.mode != 'rules':
+                    self.client = self._create_client()
+                self._loaded = True
+        return self.mode == 'rules' or self.client is not None
+    
+    def _create_client(self):
+        if settings.grammar_server_url:
+            return LanguageToolHTTPClient(
+                settings.grammar_server_url,
+                'en-US',
+                settings.grammar_max_concurrency,
+                settings.grammar_timeout_seconds
+            )
+        
+        use_languagetool_dir()
+        if not settings.allow_model_downloads and not languagetool_downloaded():
+            self.load_error = "LanguageTool not found; run 'python -m app.prefetch' first"
+            print(f"Warning: Could not initialize LanguageTool: {self.load_error}")
+            return None
+        
         try:
             self.tool = language_tool_python.LanguageTool('en-US')
         except Exception as e:
+            self.load_error = str(e)
             print(f"Warning: Could not initialize LanguageTool: {e}")
-            self.tool = None
+            return None
+        
+        # Talk to the JVM server language_tool_python started, with pooled connections and timeouts
+        local_url = getattr(self.tool, '_url', None)
+        if local_url:
+            return LanguageToolHTTPClient(
+                local_url,
+                'en-US',
+                settings.grammar_max_concurrency,
+                settings.grammar_timeout_seconds
+            )
+        return LocalToolClient(self.tool)
+    
+    @property
+    def available(self) -> bool:
+        if not self._loaded:
+            self.load()
+        return self.client is not None
     
-    def check_grammar(self, text: str) -> Dict:
+    def check_grammar(
+        self,
+        text: str,
+        sentences: Optional[List[str]] = None,
+        escalate: bool = False,
+        tokens: Optional[TokenizedText] = None
+    ) -> Dict:
+        """
+        Check grammar according to the configured mode
+        
+        Args:
+            text: Cleaned transcript text
+            sentences: Sentences from TextPreprocessor, reused by the fast path
+            escalate: Always confirm with LanguageTool in hybrid mode (e.g. premium requests)
+            tokens: TokenizedText from TextPreprocessor; the fast path then reads
+                its offsets and sentence bounds instead of re-tokenizing
+        """
+        if self.mode == 'languagetool':
+            return self._check_languagetool(text)
+        
+        fast_result = self._check_rules(text, sentences, tokens)
+        if self.mode == 'hybrid':
+            if self.policy.should_escalate(fast_result['confidence'], escalate):
+                result = self._check_languagetool(text)
+                if result['available']:
+                    return result
+            elif self.policy.should_sample():
+                self._shadow_check([text], [fast_result['error_count']])
+        return fast_result
+    
+    def check_grammar_many(
+        self,
+        texts: List[str],
+        sentence_lists: Optional[List[List[str]]] = None,
+        token_lists: Optional[List[TokenizedText]] = None
+    ) -> List[Dict]:
 
-        if not self.tool:
-            return {
-                'error_count': 0,
-                'errors': [],
-                'error_rate': 0.0,
-                'score': 100.0
-            }
+        if self.mode == 'languagetool':
+            return self._check_languagetool_many(texts)
         
+        if sentence_lists is None:
+            sentence_lists = [None] * len(texts)
+        if token_lists is None:
+            token_lists = [None] * len(texts)
+        results = [
+            self._check_rules(text, sentences, tokens)
+            for text, sentences, tokens in zip(texts, sentence_lists, token_lists)
+        ]
+        
+        if self.mode == 'hybrid':
+            escalated = []
+            sampled = []
+            for i, result in enumerate(results):
+                if self.policy.should_escalate(result['confidence']):
+                    escalated.append(i)
+                elif self.policy.should_sample():
+                    sampled.append(i)
+            if escalated:
+                checked = self._check_languagetool_many([texts[i] for i in escalated])
+                for i, result in zip(escalated, checked):
+                    if result['available']:
+                        results[i] = result
+            if sampled:
+                self._shadow_check([texts[i] for i in sampled], [results[i]['error_count'] for i in sampled])
+        return results
+    
+    def _shadow_check(self, texts: List[str], fast_error_counts: List[int]):
+        """Compare fast-path error counts with LanguageTool's without touching the scores"""
+        for fast_count, result in zip(fast_error_counts, self._check_languagetool_many(texts)):
+            if not result['available']:
+                continue
+            with self._shadow_lock:
+                if result['error_count'] == fast_count:
+                    self._shadow_agreed += 1
+                else:
+                    self._shadow_disagreed += 1
+    
+    def shadow_stats(self) -> Dict:
+        """Agreement of sampled fast-path results with LanguageTool since start"""
+        with self._shadow_lock:
+            agreed, disagreed = self._shadow_agreed, self._shadow_disagreed
+        total = agreed + disagreed
+        return {
+            'agreed': agreed,
+            'disagreed': disagreed,
+            'agreement_rate': round(agreed / total, 4) if total else 0.0
+        }
+    
+    def _check_rules(self, text: str, sentences: Optional[List[str]], tokens: Optional[TokenizedText] = None) -> Dict:
+        if tokens is None:
+            tokens = self.rules.tokenize(text, sentences)
+        matches = self.rules.check(text, tokens=tokens)
+        result = self._summarize_matches(matches, source='rules')
+        result['confidence'] = self.rules.confidence(matches, tokens)
+        return result
+    
+    def _check_languagetool(self, text: str) -> Dict:
         try:
-            matches = self.tool.check(text)
-            
-            significant_errors = [
-                m for m in matches 
-                if m.ruleIssueType in ['grammar', 'misspelling', 'typographical']
-            ]
-            
-            error_count = len(significant_errors)
-            
-            errors = []
-            for match in significant_errors[:10]:  
-                errors.append({
-                    'message': match.message,
-                    'context': match.context,
-                    'suggestions': match.replacements[:3] if match.replacements else []
-                })
-            
-            return {
-                'error_count': error_count,
-                'errors': errors,
-                'error_rate': 0.0,  
-                'score': 0.0 
-            }
+            return self._summarize_matches(self._check(text))
+        except GrammarUnavailableError as e:
+            print(f"Grammar check unavailable: {e}")
+            return self.unavailable_result(str(e))
+    
+    def _check_languagetool_many(self, texts: List[str]) -> List[Dict]:
+        results = []
+        for start, end in self._chunk_texts(texts):
+            results.extend(self._check_chunk(texts[start:end]))
+        return results
+    
+    def _check(self, text: str) -> List[Dict]:
+        if not self._loaded:
+            self.load()
+        if self.client is None:
+            raise GrammarUnavailableError("LanguageTool is not initialized")
         
+        if not self._slots.acquire(timeout=settings.grammar_timeout_seconds):
+            raise GrammarUnavailableError("timed out waiting for a free grammar slot")
+        try:
+            return self.client.check(text)
+        except requests.Timeout:
+            raise GrammarUnavailableError("timed out")
         except Exception as e:
-            print(f"Grammar check error: {e}")
-            return {
-                'error_count': 0,
-                'errors': [],
-                'error_rate': 0.0,
-                'score': 100.0
-            }
+            raise GrammarUnavailableError(str(e))
+        finally:
+            self._slots.release()
+    
+    def _chunk_texts(self, texts: List[str]) -> List[tuple]:
+        # Group consecutive texts so each LanguageTool request stays under the size budget
+        chunks = []
+        start = 0
+        size = 0
+        for i, text in enumerate(texts):
+            if i > start and size + len(text) > settings.grammar_batch_max_chars:
+                chunks.append((start, i))
+                start = i
+                size = 0
+            size += len(text) + len(self.BATCH_SEPARATOR)
+        if texts:
+            chunks.append((start, len(texts)))
+        return chunks
+    
+    def _check_chunk(self, texts: List[str]) -> List[Dict]:
+        try:
+            per_text = self._match_chunk(texts)
+        except GrammarUnavailableError as e:
+            print(f"Grammar check unavailable: {e}")
+            return [self.unavailable_result(str(e)) for _ in texts]
+        
+        return [self._summarize_matches(text_matches) for text_matches in per_text]
+    
+    def _match_chunk(self, texts: List[str]) -> List[List[Dict]]:
+        if len(texts) == 1:
+            return [self._check(texts[0])]
+        
+        # Check the whole chunk in one round-trip, then route matches back by offset
+        offsets = []
+        position = 0
+        for text in texts:
+            offsets.append(position)
+            position += len(text) + len(self.BATCH_SEPARATOR)
+        
+        matches = self._check(self.BATCH_SEPARATOR.join(texts))
+        
+        per_text = [[] for _ in texts]
+        for match in matches:
+            per_text[bisect_right(offsets, match['offset']) - 1].append(match)
+        return per_text
+    
+    def check_sentences(self, sentences: List[str]) -> List[Optional[Dict]]:
+        """
+        Matches for each sentence checked on its own, for incremental re-checks
+        
+        Each entry is {'matches': [...], 'source': 'rules' or 'languagetool'}, to
+        be combined with summarize_sentences(). In hybrid mode only sentences the
+        policy escalates go to LanguageTool, in one batched round-trip; sentences
+        are not shadow-sampled. An entry is None when LanguageTool was required
+        but unavailable.
+        """
+        results: List[Optional[Dict]] = [None] * len(sentences)
+        if self.mode == 'languagetool':
+            escalated = list(range(len(sentences)))
+        else:
+            escalated = []
+            for i, sentence in enumerate(sentences):
+                tokens = self.rules.tokenize(sentence, [sentence])
+                matches = self.rules.check(sentence, tokens=tokens)
+                results[i] = {'matches': matches, 'source': 'rules'}
+                if self.mode == 'hybrid' and self.policy.should_escalate(self.rules.confidence(matches, tokens)):
+                    escalated.append(i)
+        
+        texts = [sentences[i] for i in escalated]
+        for start, end in self._chunk_texts(texts):
+            try:
+                checked = self._match_chunk(texts[start:end])
+            except GrammarUnavailableError as e:
+                print(f"Grammar check unavailable: {e}")
+                continue
+            for i, matches in zip(escalated[start:end], checked):
+                results[i] = {'matches': matches, 'source': 'languagetool'}
+        return results
+    
+    def summarize_sentences(self, partials: List[Optional[Dict]]) -> Dict:
+        """Grammar result for a transcript from its sentences' check_sentences() entries"""
+        if any(partial is None for partial in partials):
+            return self.unavailable_result("LanguageTool is not available")
+        sources = {partial['source'] for partial in partials}
+        return self._summarize_matches(
+            [match for partial in partials for match in partial['matches']],
+            source=sources.pop() if len(sources) == 1 else 'hybrid'
+        )
+    
+    def _summarize_matches(self, matches: List[Dict], source: str = 'languagetool') -> Dict:
+        significant_errors = [
+            m for m in matches 
+            if m['issue_type'] in SIGNIFICANT_ISSUE_TYPES
+        ]
+        
+        error_count = len(significant_errors)
+        
+        errors = []
+        for match in significant_errors[:10]:  
+            errors.append({
+                'message': match['message'],
+                'context': match['context'],
+                'suggestions': match['replacements'][:3]
+            })
+        
+        return {
+            'available': True,
+            'source': source,
+            'error_count': error_count,
+            'errors': errors,
+            'error_rate': 0.0,  
+            'score': 0.0 
+        }
+    
+    def unavailable_result(self, reason: str) -> Dict:
+        # Flagged explicitly so the scorer can leave grammar out instead of assuming a perfect score
+        return {
+            'available': False,
+            'unavailable_reason': reason,
+            'error_count': 0,
+            'errors': [],
+            'error_rate': 0.0,
+            'score': None
+        }
     
     def calculate_error_rate(self, error_count: int, word_count: int) -> float:
         if word_count == 0:
             return 0.0
         return (error_count / word_count) * 100
     
-    def calculate_grammar_score(self, error_rate: float) -> float:
-
-        max_error_rate = settings.max_grammar_errors_per_100_words
-        
-        if error_rate == 0:
-            return 100.0
-        elif error_rate <= 2:
-            return 100 - (error_rate * 5)
-        elif error_rate <= max_error_rate:
-            return 90 - ((error_rate - 2) * 6.67)
-        else:
-            return max(0, 70 - ((error_rate - max_error_rate) * 10))
+    def calculate_grammar_score(self, error_rate: float, tables: Optional[ScoringTables] = None) -> float:
+        """Grammar score (0-100) from errors per 100 words, by a rubric's 'grammar_score' table"""
+        return (tables or get_scoring_tables())['grammar_score'](error_rate)
     
     def __del__(self):
+        if self.client:
+            try:
+                self.client.close()
+            except:
+                pass
         if self.tool:
             try:
                 self.tool.close()
@@ -1,55 +1,53 @@
-import re
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Set
 from app.config import settings
+from app.nlp.keyword_matcher import KeywordMatcher, get_keyword_matcher
+from app.nlp.tokens import WORD_PATTERN
 
 
 class KeywordDetector:
     
-    def __init__(self):
-        self.salutation_keywords = settings.salutation_keywords
-        self.personal_info_keywords = settings.personal_info_keywords
-        self.hobbies_keywords = settings.hobbies_keywords
+    def __init__(self, matcher: Optional[KeywordMatcher] = None, keywords: Optional[Dict] = None):
+        # keywords: a rubric's keyword lists, matching the matcher's categories; Settings by default
+        self.salutation_keywords = keywords['salutation'] if keywords else settings.salutation_keywords
+        self.personal_info_keywords = keywords['personal_info'] if keywords else settings.personal_info_keywords
+        self.hobbies_keywords = keywords['hobbies'] if keywords else settings.hobbies_keywords
+        self.matcher = matcher or get_keyword_matcher()
     
-    def detect_salutation(self, text: str) -> tuple[bool, str]:
+    def _scan(self, text: str, matches: Optional[Dict]) -> Dict:
+        if matches is not None:
+            return matches
+        return self.matcher.scan(WORD_PATTERN.findall(text.lower()))
+    
+    def detect_salutation(self, text: str, matches: Optional[Dict] = None) -> tuple[bool, str]:
   
-        text_lower = text.lower()
-        
-        for keyword in self.salutation_keywords:
-            if keyword in text_lower:
-                return True, keyword.title()
+        hits = self._scan(text, matches)['salutation']
+        if hits:
+            return True, hits[0][0].title()
         
         return False, ""
     
-    def detect_personal_info(self, text: str, words: List[str]) -> Dict[str, bool]:
+    def detect_personal_info(self, text: str, words: List[str], matches: Optional[Dict] = None) -> Dict[str, bool]:
 
-        text_lower = text.lower()
-        results = {}
+        if matches is None:
+            matches = self.matcher.scan(words)
         
-        for category, keywords in self.personal_info_keywords.items():
-            found = False
-            for keyword in keywords:
-                if keyword in text_lower:
-                    found = True
-                    break
-            results[category] = found
-        
-        return results
+        return {
+            category: bool(matches[f'personal_info.{category}'])
+            for category in self.personal_info_keywords
+        }
     
-    def detect_hobbies(self, text: str) -> bool:
+    def detect_hobbies(self, text: str, matches: Optional[Dict] = None) -> bool:
 
-        text_lower = text.lower()
-        
-        for keyword in self.hobbies_keywords:
-            if keyword in text_lower:
-                return True
-        
-        return False
+        return bool(self._scan(text, matches)['hobbies'])
     
-    def get_keywords_summary(self, text: str, words: List[str]) -> Dict:
+    def get_keywords_summary(self, text: str, words: List[str], matches: Optional[Dict] = None) -> Dict:
 
-        salutation_found, salutation_text = self.detect_salutation(text)
-        personal_info = self.detect_personal_info(text, words)
-        hobbies_found = self.detect_hobbies(text)
+        if matches is None:
+            matches = self.matcher.scan(words)
+        
+        salutation_found, salutation_text = self.detect_salutation(text, matches)
+        personal_info = self.detect_personal_info(text, words, matches)
+        hobbies_found = self.detect_hobbies(text, matches)
         
         found_keywords = []
         missing_keywords = []
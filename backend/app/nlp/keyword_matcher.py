@@ -0,0 +1,103 @@
+from collections import deque
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from app.config import settings
+from app.nlp.tokens import WORD_PATTERN
+
+
+def tokenize_phrase(phrase: str) -> Tuple[str, ...]:
+    # Same tokenization as TokenizedText.words, so "i'm" becomes ("i", "m")
+    return tuple(WORD_PATTERN.findall(phrase.lower()))
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over word tokens
+
+    Patterns are token sequences, so matches always fall on word boundaries
+    ("like" never matches inside "likely"). One pass over the token stream
+    returns every category's hits as (phrase, start token index) pairs.
+    """
+
+    def __init__(self, categories: Dict[str, List[str]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[List[Tuple[str, str, int]]] = [[]]
+        self.categories = list(categories)
+
+        for category, phrases in categories.items():
+            for phrase in phrases:
+                tokens = tokenize_phrase(phrase)
+                if tokens:
+                    self._add(tokens, category, phrase)
+        self._build_failure_links()
+
+    def _add(self, tokens: Tuple[str, ...], category: str, phrase: str):
+        node = 0
+        for token in tokens:
+            next_node = self._goto[node].get(token)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+                self._goto[node][token] = next_node
+            node = next_node
+        self._outputs[node].append((category, phrase, len(tokens)))
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[child] = target if target != child else 0
+                # Inherit shorter patterns that end at the same token
+                self._outputs[child] = self._outputs[child] + self._outputs[self._fail[child]]
+
+    def scan(self, words: List[str]) -> Dict[str, List[Tuple[str, int]]]:
+        """
+        Find every pattern occurrence in a lowercased token stream
+
+        Returns:
+            Category mapped to (phrase, start token index) hits in text order
+        """
+        hits = {category: [] for category in self.categories}
+        goto = self._goto
+        fail = self._fail
+        outputs = self._outputs
+        node = 0
+
+        for position, word in enumerate(words):
+            while node and word not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(word, 0)
+            for category, phrase, length in outputs[node]:
+                hits[category].append((phrase, position - length + 1))
+
+        for category_hits in hits.values():
+            category_hits.sort(key=lambda hit: hit[1])
+        return hits
+
+
+def build_keyword_matcher(categories: Optional[Dict[str, List[str]]] = None) -> KeywordMatcher:
+    """Matcher over the given categories (see SpeechRubric.keyword_categories), by default from Settings"""
+    if categories is None:
+        categories = {
+            'salutation': settings.salutation_keywords,
+            'hobbies': settings.hobbies_keywords,
+            'filler': settings.filler_words
+        }
+        for category, keywords in settings.personal_info_keywords.items():
+            categories[f'personal_info.{category}'] = keywords
+    return KeywordMatcher(categories)
+
+
+@lru_cache(maxsize=1)
+def get_keyword_matcher() -> KeywordMatcher:
+    """Matcher compiled once per process from Settings"""
+    return build_keyword_matcher()
@@ -1,41 +1,75 @@
 import re
 import nltk
-from typing import Dict, List
+from typing import Dict, List, Tuple
 from app.config import settings
+from app.artifacts import nltk_data_dir
+from app.nlp.tokens import TokenizedText, locate_sentences, regex_sentence_spans
 
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt', quiet=True)
+SENTENCE_SPLITTERS = ('punkt', 'regex')
 
-try:
-    nltk.data.find('tokenizers/punkt_tab')
-except LookupError:
-    nltk.download('punkt_tab', quiet=True)
+WHITESPACE_PATTERN = re.compile(r'\s+')
+DISALLOWED_PATTERN = re.compile(r'[^\w\s.,!?\'-]')
+
+# Punkt data is fetched by `python -m app.prefetch`, never at import time
+if nltk_data_dir() not in nltk.data.path:
+    nltk.data.path.insert(0, nltk_data_dir())
 
 
 class TextPreprocessor:
     
     def __init__(self):
+        if settings.sentence_splitter not in SENTENCE_SPLITTERS:
+            raise ValueError(f"Unknown sentence splitter: {settings.sentence_splitter}")
         self.min_word_count = settings.min_word_count
         self.max_word_count = settings.max_word_count
+        self.sentence_splitter = settings.sentence_splitter
+        self.punkt_available = None
+        self.load_error = None
+    
+    def load(self) -> bool:
+        """Look for Punkt data; without it sentences are split with a regex"""
+        if self.sentence_splitter == 'regex':
+            # Nothing to load; Punkt is never consulted
+            self.punkt_available = False
+            return True
+        
+        for resource in ('tokenizers/punkt_tab', 'tokenizers/punkt'):
+            try:
+                nltk.data.find(resource)
+                # NLTK keeps the loaded Punkt model in its resource cache for later calls
+                nltk.sent_tokenize("Punkt is loaded.")
+            except LookupError:
+                continue
+            self.punkt_available = True
+            return True
+        
+        self.punkt_available = False
+        self.load_error = "NLTK Punkt data not found, using the regex sentence splitter"
+        print(f"Warning: {self.load_error}")
+        return False
     
     def clean_text(self, text: str) -> str:
-        text = re.sub(r'\s+', ' ', text)
-        text = re.sub(r'[^\w\s.,!?\'-]', '', text)
+        text = WHITESPACE_PATTERN.sub(' ', text)
+        text = DISALLOWED_PATTERN.sub('', text)
         return text.strip()
     
     def tokenize_words(self, text: str) -> List[str]:
-        words = re.findall(r'\b\w+\b', text.lower())
-        return words
+        return TokenizedText(text, []).words
+    
+    def split_sentences(self, text: str) -> List[Tuple[int, int]]:
+        """Sentence (start, end) offsets in text, from Punkt or the regex splitter"""
+        if self.punkt_available is None:
+            self.load()
+        if self.punkt_available:
+            try:
+                sentences = [s.strip() for s in nltk.sent_tokenize(text)]
+                return locate_sentences(text, [s for s in sentences if s])
+            except Exception:
+                pass
+        return regex_sentence_spans(text)
     
     def tokenize_sentences(self, text: str) -> List[str]:
-        try:
-            sentences = nltk.sent_tokenize(text)
-            return [s.strip() for s in sentences if s.strip()]
-        except Exception:
-            sentences = re.split(r'[.!?]+', text)
-            return [s.strip() for s in sentences if s.strip()]
+        return [text[start:end] for start, end in self.split_sentences(text)]
     
     def calculate_word_count(self, text: str) -> int:
         words = self.tokenize_words(text)
@@ -57,18 +91,24 @@ class TextPreprocessor:
     
     def process(self, text: str) -> Dict:
  
-        cleaned_text = self.clean_text(text)
-        words = self.tokenize_words(cleaned_text)
-        sentences = self.tokenize_sentences(cleaned_text)
-        word_count = len(words)
-        sentence_count = len(sentences)
-        wpm = self.estimate_speech_rate(word_count)
+        return self.process_cleaned(self.clean_text(text))
+    
+    def process_cleaned(self, cleaned_text: str) -> Dict:
+        """
+        Tokenize text already passed through clean_text
+        
+        The returned 'tokens' is the TokenizedText the analyzers read; 'words'
+        and 'sentences' are views of it.
+        """
+        tokens = TokenizedText(cleaned_text, self.split_sentences(cleaned_text))
+        word_count = tokens.word_count
         
         return {
             'cleaned_text': cleaned_text,
-            'words': words,
-            'sentences': sentences,
+            'tokens': tokens,
+            'words': tokens.words,
+            'sentences': tokens.sentences,
             'word_count': word_count,
-            'sentence_count': sentence_count,
-            'wpm': wpm
+            'sentence_count': tokens.sentence_count,
+            'wpm': self.estimate_speech_rate(word_count)
         }
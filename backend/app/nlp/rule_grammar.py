@@ -0,0 +1,193 @@
+import re
+from typing import Dict, List, Optional
+from app.nlp.tokens import ABBREVIATIONS, TokenizedText
+
+# Frequent misspellings in student transcripts, mapped to their correction. Only
+# non-words belong here: real words such as 'cant' or 'wont' are left to LanguageTool.
+COMMON_MISSPELLINGS = {
+    'teh': 'the', 'hte': 'the', 'adn': 'and', 'nad': 'and', 'taht': 'that',
+    'thier': 'their', 'recieve': 'receive', 'beleive': 'believe', 'freind': 'friend',
+    'freinds': 'friends', 'becuase': 'because', 'becasue': 'because', 'beacuse': 'because',
+    'alot': 'a lot', 'definately': 'definitely', 'untill': 'until', 'wich': 'which',
+    'whith': 'with', 'realy': 'really', 'studing': 'studying', 'intrested': 'interested',
+    'intresting': 'interesting', 'favourit': 'favourite', 'favorit': 'favorite',
+    'hobbys': 'hobbies', 'famly': 'family', 'familly': 'family', 'brotehr': 'brother',
+    'sistr': 'sister', 'techer': 'teacher', 'scool': 'school', 'shcool': 'school',
+    'libary': 'library', 'begining': 'beginning', 'tommorow': 'tomorrow',
+    'tomorow': 'tomorrow', 'wierd': 'weird', 'occured': 'occurred', 'seperate': 'separate',
+    'goverment': 'government', 'enviroment': 'environment', 'excercise': 'exercise',
+    'grammer': 'grammar', 'dont': "don't", 'doesnt': "doesn't", 'didnt': "didn't",
+    'im': "I'm", 'ive': "I've", 'isnt': "isn't",
+    'wasnt': "wasn't", 'thats': "that's", 'whats': "what's"
+}
+
+# Words whose spelling misleads a/an: pronounced with a consonant or vowel sound respectively.
+# Stems are matched as prefixes, so each must not also start a vowel-sound word
+# (bare 'uni' would catch "unimportant", bare 'one' would catch "onerous").
+CONSONANT_SOUND_STEMS = (
+    'unique', 'unit', 'union', 'univers', 'uniform', 'unicorn', 'unicycl', 'unison',
+    'unilateral', 'use', 'usag', 'usual', 'usur', 'utensil', 'utili', 'utopia',
+    'uranium', 'urin', 'eu', 'ewe', 'uku'
+)
+CONSONANT_SOUND_WORDS = frozenset({'one', 'once'})
+VOWEL_SOUND_CONSONANTS = ('hour', 'honest', 'honor', 'honour', 'heir', 'herb')
+
+# Repeats that are usually intentional
+ALLOWED_REPEATS = {'that', 'had', 'very', 'bye', 'ha', 'no', 'so', 'really', 'many', 'much'}
+
+
+def _needs_an(word: str) -> bool:
+    if word.startswith(VOWEL_SOUND_CONSONANTS):
+        return True
+    if word in CONSONANT_SOUND_WORDS or word.startswith(CONSONANT_SOUND_STEMS):
+        return False
+    return word[0] in 'aeiou'
+
+
+def _is_abbreviation_part(text: str, start: int, end: int) -> bool:
+    # A letter of a dotted abbreviation such as "i.e." or "A.I."
+    return ((end + 1 < len(text) and text[end] == '.' and text[end + 1].isalpha())
+            or (start >= 2 and text[start - 1] == '.' and text[start - 2].isalpha()))
+
+
+def _follows_abbreviation(text: str, sentence_start: int) -> bool:
+    # A sentence split after "i.e." or "Mr." continues the previous one
+    before = text[:sentence_start].rstrip()
+    if not before.endswith('.'):
+        return False
+    word = before[before.rfind(' ') + 1:-1].lower().lstrip('"\'(')
+    return '.' in word or word in ABBREVIATIONS
+
+
+class RuleBasedGrammarChecker:
+    """
+    Pure-Python grammar fast path
+
+    Produces matches in the same shape as the LanguageTool clients so the
+    error-count semantics of GrammarChecker are unchanged. Issue types follow
+    LanguageTool: repeated words are 'duplication' and therefore reported but
+    not counted, just like LanguageTool's own repeat rule.
+    """
+
+    def check(self, text: str, sentences: Optional[List[str]] = None, tokens: Optional[TokenizedText] = None) -> List[Dict]:
+        """
+        Args:
+            text: Cleaned transcript text
+            sentences: Sentences to check, when tokens aren't given
+            tokens: The preprocessor's TokenizedText for text, reused as is
+        """
+        if tokens is None:
+            tokens = self.tokenize(text, sentences)
+
+        matches = []
+        for index in range(tokens.sentence_count):
+            matches.extend(self._check_sentence(tokens, index))
+        return matches
+
+    def tokenize(self, text: str, sentences: Optional[List[str]] = None) -> TokenizedText:
+        """Tokens for text checked without the preprocessor's TokenizedText"""
+        if sentences is None:
+            sentences = [s.strip() for s in re.split(r'(?<=[.!?])\s+', text) if s.strip()]
+        return TokenizedText.from_sentences(text, sentences)
+
+    def _check_sentence(self, tokens: TokenizedText, index: int) -> List[Dict]:
+        matches = []
+        text = tokens.text
+        starts = tokens.starts
+        ends = tokens.ends
+        words = tokens.words
+        sentence_start, sentence_end = tokens.sentence_spans[index]
+        sentence = text[sentence_start:sentence_end]
+        positions = tokens.sentence_tokens(index)
+
+        first_alpha = next((i for i in positions if text[starts[i]].isalpha()), None)
+        lowercase_start = None
+        if (first_alpha is not None and starts[first_alpha] == sentence_start and text[sentence_start].islower()
+                and not _follows_abbreviation(text, sentence_start)
+                and not _is_abbreviation_part(text, starts[first_alpha], ends[first_alpha])):
+            lowercase_start = first_alpha
+            word = text[starts[first_alpha]:ends[first_alpha]]
+            matches.append(self._match(
+                tokens, first_alpha, 'typographical',
+                "This sentence does not start with an uppercase letter.",
+                sentence, [word[0].upper() + word[1:]]
+            ))
+
+        previous = None
+        for i in positions:
+            start = starts[i]
+            end = ends[i]
+            word = text[start:end]
+            lower = words[i]
+
+            if _is_abbreviation_part(text, start, end):
+                previous = None
+                continue
+
+            # Covers contractions too: "i'm" tokenizes to "i" + "m"
+            if word == 'i' and i != lowercase_start:
+                matches.append(self._match(
+                    tokens, i, 'misspelling',
+                    'The personal pronoun "I" should be uppercase.', sentence, ['I']
+                ))
+            elif lower in COMMON_MISSPELLINGS and not self._is_contraction_part(text, start, end, sentence_start, sentence_end):
+                matches.append(self._match(
+                    tokens, i, 'misspelling',
+                    'Possible spelling mistake found.', sentence, [COMMON_MISSPELLINGS[lower]]
+                ))
+
+            if previous is not None:
+                previous_lower = words[previous]
+                if (previous_lower == lower and lower not in ALLOWED_REPEATS
+                        and not lower.isdigit() and text[previous_end:start].strip() == ''):
+                    matches.append(self._match(
+                        tokens, i, 'duplication',
+                        'Possible typo: you repeated a word.', sentence, []
+                    ))
+                elif previous_lower in ('a', 'an') and lower[0].isalpha() and not (word.isupper() and len(word) > 1):
+                    wants_an = _needs_an(lower)
+                    if previous_lower == 'a' and wants_an:
+                        matches.append(self._match(
+                            tokens, previous, 'misspelling',
+                            f'Use "an" instead of "a" if the following word starts with a vowel sound, e.g. "an {word}".',
+                            sentence, ['an']
+                        ))
+                    elif previous_lower == 'an' and not wants_an:
+                        matches.append(self._match(
+                            tokens, previous, 'misspelling',
+                            f'Use "a" instead of "an" if the following word doesn\'t start with a vowel sound, e.g. "a {word}".',
+                            sentence, ['a']
+                        ))
+            previous = i
+            previous_end = end
+
+        return matches
+
+    def _is_contraction_part(self, text: str, start: int, end: int, sentence_start: int, sentence_end: int) -> bool:
+        # "don't" tokenizes to "don" + "t"; only flag words written without the apostrophe
+        return (end < sentence_end and text[end] == "'") or (start > sentence_start and text[start - 1] == "'")
+
+    def _match(self, tokens: TokenizedText, index: int, issue_type: str, message: str, sentence: str, replacements: List[str]) -> Dict:
+        return {
+            'offset': tokens.starts[index],
+            'length': tokens.ends[index] - tokens.starts[index],
+            'message': message,
+            'context': sentence,
+            'replacements': replacements,
+            'issue_type': issue_type
+        }
+
+    def confidence(self, matches: List[Dict], tokens: TokenizedText) -> float:
+        """
+        How likely the fast path agrees with LanguageTool on this text
+
+        Rules only see surface errors, so confidence drops when errors are already
+        present (a weaker writer tends to have deeper errors too) and when
+        sentences are long enough for agreement and tense problems to hide.
+        """
+        counted = sum(1 for m in matches if m['issue_type'] != 'duplication')
+        word_counts = [len(tokens.sentence_tokens(i)) for i in range(tokens.sentence_count)] or [tokens.word_count]
+        avg_sentence_words = sum(word_counts) / len(word_counts)
+
+        confidence = 1.0 - 0.35 * counted - 0.02 * max(0.0, avg_sentence_words - 15)
+        return round(max(0.0, min(1.0, confidence)), 3)
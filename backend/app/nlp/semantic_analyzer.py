@@ -1,13 +1,47 @@
-from sentence_transformers import SentenceTransformer
-from typing import Dict, List
+import threading
+from typing import Dict, List, Optional
 import numpy as np
 from app.config import settings
+from app.nlp.embedding_cache import EmbeddingCache, DiskEmbeddingStore
+from app.nlp.embedding_backends import create_embedding_backend
+from app.scoring.tables import ScoringTables, get_scoring_tables
+
+
+def adjacent_similarities(embeddings: np.ndarray) -> np.ndarray:
+    """Cosine similarity of each consecutive sentence pair, for L2-normalized rows"""
+    return np.einsum('ij,ij->i', embeddings[:-1], embeddings[1:])
+
+
+def coherence_matrix_metrics(embeddings: np.ndarray, similarities: np.ndarray) -> Dict:
+    """Whole-transcript coherence metrics from the full similarity matrix"""
+    count = len(embeddings)
+    matrix = embeddings @ embeddings.T
+    global_similarity = (matrix.sum() - np.trace(matrix)) / (count * (count - 1))
+    
+    # Drift compares the opening and closing halves of the transcript
+    half = count // 2
+    opening = embeddings[:half].mean(axis=0)
+    closing = embeddings[half:].mean(axis=0)
+    norms = np.linalg.norm(opening) * np.linalg.norm(closing)
+    topic_drift = 1.0 - (float(opening @ closing) / norms if norms else 0.0)
+    
+    gap_index = int(np.argmin(similarities))
+    return {
+        'global_similarity': round(float(global_similarity), 3),
+        'topic_drift': round(float(topic_drift), 3),
+        'max_gap_sentence': gap_index + 1,
+        'max_gap': round(float(1.0 - similarities[gap_index]), 3)
+    }
 
 
 class SemanticAnalyzer:
     
     _instance = None
-    _model = None
+    _backend = None
+    _embedding_cache = None
+    _loaded = False
+    _load_lock = threading.Lock()
+    load_error = None
     
     def __new__(cls):
         if cls._instance is None:
@@ -15,80 +49,170 @@ class SemanticAnalyzer:
         return cls._instance
     
     def __init__(self):
-        if self._model is None:
+        # The model is loaded by load(), on first use or during warm-up
+        if self._embedding_cache is None and settings.embedding_cache_size > 0:
+            self._embedding_cache = self._create_embedding_cache()
+    
+    def load(self) -> bool:
+        """Load the embedding backend once; later calls return the outcome of the first"""
+        with self._load_lock:
+            if not self._loaded:
+                try:
+                    print(f"Loading sentence transformer model: {settings.sentence_transformer_model} ({settings.embedding_backend})")
+                    self._backend = create_embedding_backend()
+                    print("Model loaded successfully")
+                except Exception as e:
+                    print(f"Error loading sentence transformer: {e}")
+                    self._backend = None
+                    self.load_error = str(e)
+                self._loaded = True
+        return self._backend is not None
+    
+    def _create_embedding_cache(self) -> EmbeddingCache:
+        # Backends differ slightly numerically, so each gets its own cache namespace
+        model_id = f"{settings.sentence_transformer_model}-{settings.embedding_backend}"
+        disk_store = None
+        if settings.embedding_cache_path:
             try:
-                print(f"Loading sentence transformer model: {settings.sentence_transformer_model}")
-                self._model = SentenceTransformer(settings.sentence_transformer_model)
-                print("Model loaded successfully")
+                disk_store = DiskEmbeddingStore(
+                    settings.embedding_cache_path,
+                    model_id,
+                    settings.embedding_cache_disk_capacity
+                )
             except Exception as e:
-                print(f"Error loading sentence transformer: {e}")
-                self._model = None
+                print(f"Warning: Could not open embedding store at {settings.embedding_cache_path}: {e}")
+        return EmbeddingCache(
+            model_id,
+            settings.embedding_cache_size,
+            disk_store
+        )
+    
+    def embedding_cache_stats(self) -> Dict:
+        if self._embedding_cache is None:
+            return {'enabled': False}
+        return self._embedding_cache.stats()
     
-    def analyze_coherence(self, sentences: List[str]) -> Dict:
+    def analyze_coherence(self, sentences: List[str], tables: Optional[ScoringTables] = None) -> Dict:
 
-        if not self._model or len(sentences) < 2:
-            return {
-                'coherence_score': 75.0,  
-                'avg_similarity': 0.0,
-                'flow_quality': 'Good'
-            }
+        if len(sentences) < 2:
+            return self._default_result()
+        if not self._loaded:
+            self.load()
+        if not self._backend:
+            # No model (e.g. not prefetched): coherence wasn't measured, so don't make one up
+            return self.unavailable_result()
         
         try:
-            embeddings = self._model.encode(sentences)
-            
-            similarities = []
-            for i in range(len(embeddings) - 1):
-                sim = self._cosine_similarity(embeddings[i], embeddings[i + 1])
-                similarities.append(sim)
-            
-            avg_similarity = np.mean(similarities) if similarities else 0.0
-            
+            embeddings = self._encode(sentences)
+            return self._coherence_from_embeddings(embeddings, tables)
+        
+        except Exception as e:
+            print(f"Semantic analysis error: {e}")
+            return self.unavailable_result()
+    
+    def analyze_coherence_many(self, sentence_lists: List[List[str]], tables: Optional[ScoringTables] = None) -> List[Dict]:
 
-            coherence_score = self._calculate_coherence_score(avg_similarity)
-            
-            flow_quality = self._get_flow_quality(coherence_score)
-            
-            return {
-                'coherence_score': round(coherence_score, 2),
-                'avg_similarity': round(float(avg_similarity), 3),
-                'flow_quality': flow_quality
-            }
+        results = [self._default_result() for _ in sentence_lists]
+        if all(len(sentences) < 2 for sentences in sentence_lists):
+            return results
+        if not self._loaded:
+            self.load()
+        if not self._backend:
+            return [
+                self._default_result() if len(sentences) < 2 else self.unavailable_result()
+                for sentences in sentence_lists
+            ]
+        
+        # Encode every sentence of every transcript in a single batched pass
+        flat_sentences = []
+        spans = []
+        for index, sentences in enumerate(sentence_lists):
+            if len(sentences) >= 2:
+                spans.append((index, len(flat_sentences), len(flat_sentences) + len(sentences)))
+                flat_sentences.extend(sentences)
+        
+        if not flat_sentences:
+            return results
+        
+        try:
+            embeddings = self._encode(flat_sentences)
+        except Exception as e:
+            print(f"Semantic analysis error: {e}")
+            for index, _, _ in spans:
+                results[index] = self.unavailable_result()
+            return results
         
+        for index, start, end in spans:
+            try:
+                results[index] = self._coherence_from_embeddings(embeddings[start:end], tables)
+            except Exception as e:
+                print(f"Semantic analysis error: {e}")
+                results[index] = self.unavailable_result()
+        
+        return results
+    
+    def encode_sentences(self, sentences: List[str]) -> Optional[np.ndarray]:
+        """Normalized embeddings (through the embedding cache), or None without a backend"""
+        if not self._loaded:
+            self.load()
+        if not self._backend or not sentences:
+            return None
+        return self._encode(sentences)
+    
+    def coherence_from_embeddings(self, embeddings: Optional[np.ndarray], tables: Optional[ScoringTables] = None) -> Dict:
+        """analyze_coherence() for sentences already encoded by encode_sentences()"""
+        if embeddings is None or len(embeddings) < 2:
+            return self._default_result()
+        try:
+            return self._coherence_from_embeddings(embeddings, tables)
         except Exception as e:
             print(f"Semantic analysis error: {e}")
-            return {
-                'coherence_score': 75.0,
-                'avg_similarity': 0.0,
-                'flow_quality': 'Good'
-            }
-    
-    def _cosine_similarity(self, vec1, vec2):
-        dot_product = np.dot(vec1, vec2)
-        norm1 = np.linalg.norm(vec1)
-        norm2 = np.linalg.norm(vec2)
+            return self.unavailable_result()
+    
+    def _encode(self, sentences: List[str]) -> np.ndarray:
+        if self._embedding_cache is not None:
+            return self._embedding_cache.encode(sentences, self._encode_uncached)
+        return self._encode_uncached(sentences)
+    
+    def _encode_uncached(self, sentences: List[str]) -> np.ndarray:
+        # Backends return L2-normalized rows, so cosine similarity is a plain dot product
+        return self._backend.encode(sentences)
+    
+    def _coherence_from_embeddings(self, embeddings: np.ndarray, tables: Optional[ScoringTables] = None) -> Dict:
+        similarities = adjacent_similarities(embeddings)
+        
+        avg_similarity = float(similarities.mean())
+        
+        coherence_score = self._calculate_coherence_score(avg_similarity, tables)
+        
+        flow_quality = self._get_flow_quality(coherence_score, tables)
+        
+        result = {
+            'coherence_score': round(coherence_score, 2),
+            'avg_similarity': round(avg_similarity, 3),
+            'flow_quality': flow_quality
+        }
         
-        if norm1 == 0 or norm2 == 0:
-            return 0.0
+        if settings.coherence_full_matrix:
+            result['metrics'] = coherence_matrix_metrics(embeddings, similarities)
         
-        return dot_product / (norm1 * norm2)
+        return result
     
-    def _calculate_coherence_score(self, avg_similarity: float) -> float:
-
-        if avg_similarity >= 0.6:
-            return 85 + ((avg_similarity - 0.6) / 0.4) * 15
-        elif avg_similarity >= 0.4:
-            return 70 + ((avg_similarity - 0.4) / 0.2) * 15
-        elif avg_similarity >= 0.2:
-            return 50 + ((avg_similarity - 0.2) / 0.2) * 20
-        else:
-            return (avg_similarity / 0.2) * 50
-    
-    def _get_flow_quality(self, coherence_score: float) -> str:
-        if coherence_score >= 85:
-            return "Excellent"
-        elif coherence_score >= 70:
-            return "Good"
-        elif coherence_score >= 50:
-            return "Fair"
-        else:
-            return "Needs Improvement"
+    def _default_result(self) -> Dict:
+        # Fewer than two sentences have no transitions to judge
+        return {
+            'coherence_score': 75.0,  
+            'avg_similarity': 0.0,
+            'flow_quality': 'Good'
+        }
+    
+    def unavailable_result(self) -> Dict:
+        result = self._default_result()
+        result['available'] = False
+        return result
+    
+    def _calculate_coherence_score(self, avg_similarity: float, tables: Optional[ScoringTables] = None) -> float:
+        return (tables or get_scoring_tables())['coherence_score'](avg_similarity)
+    
+    def _get_flow_quality(self, coherence_score: float, tables: Optional[ScoringTables] = None) -> str:
+        return (tables or get_scoring_tables())['flow_quality'](coherence_score)
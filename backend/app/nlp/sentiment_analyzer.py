@@ -1,3 +1,4 @@
+import threading
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 from typing import Dict
 
@@ -5,10 +6,21 @@ from typing import Dict
 class SentimentAnalyzer:
     
     def __init__(self):
-        self.analyzer = SentimentIntensityAnalyzer()
+        # The VADER lexicon is read on first use (or during warm-up), not at construction
+        self.analyzer = None
+        self.load_error = None
+        self._load_lock = threading.Lock()
+    
+    def load(self) -> bool:
+        with self._load_lock:
+            if self.analyzer is None:
+                self.analyzer = SentimentIntensityAnalyzer()
+        return True
     
     def analyze_sentiment(self, text: str) -> Dict:
 
+        if self.analyzer is None:
+            self.load()
         scores = self.analyzer.polarity_scores(text)
         
         compound = scores['compound']
@@ -0,0 +1,146 @@
+"""
+Token structure shared by the preprocessor and the analyzers
+
+TextPreprocessor scans the cleaned text once into a TokenizedText; keyword,
+filler, vocabulary and grammar analysis all read from it instead of
+lowercasing and re-tokenizing the text themselves.
+"""
+
+import re
+from bisect import bisect_left
+from typing import List, Optional, Sequence, Tuple
+
+WORD_PATTERN = re.compile(r'\b\w+\b')
+
+# Terminal punctuation that ends a sentence when whitespace (or the end) follows
+SENTENCE_END = re.compile(r'[.!?]+(?=\s|$)')
+
+# Words whose trailing period doesn't end a sentence
+ABBREVIATIONS = frozenset({
+    'mr', 'mrs', 'ms', 'dr', 'prof', 'st', 'sr', 'jr', 'vs', 'etc', 'e.g', 'i.e', 'a.m', 'p.m'
+})
+
+
+def regex_sentence_spans(text: str) -> List[Tuple[int, int]]:
+    """
+    Sentence (start, end) offsets from a regex splitter
+
+    Keeps each sentence's punctuation like Punkt does, and skips periods after
+    common abbreviations, at a fraction of Punkt's cost.
+    """
+    spans = []
+    start = 0
+    for match in SENTENCE_END.finditer(text):
+        if match.group() == '.':
+            word_start = max(start, text.rfind(' ', start, match.start()) + 1)
+            if text[word_start:match.start()].lower().lstrip('"\'(') in ABBREVIATIONS:
+                continue
+        spans.append((start, match.end()))
+        start = match.end()
+    spans.append((start, len(text)))
+    return _strip_spans(text, spans)
+
+
+def locate_sentences(text: str, sentences: Sequence[str]) -> List[Tuple[int, int]]:
+    """(start, end) of each sentence string, searched for in order"""
+    spans = []
+    cursor = 0
+    for sentence in sentences:
+        start = text.find(sentence, cursor)
+        if start < 0:
+            start = cursor
+        cursor = start + len(sentence)
+        spans.append((start, cursor))
+    return spans
+
+
+def _strip_spans(text: str, spans: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    stripped = []
+    for start, end in spans:
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if start < end:
+            stripped.append((start, end))
+    return stripped
+
+
+class TokenizedText:
+    """
+    Lowercased word tokens, their character offsets and sentence boundaries
+
+    Words come from one regex scan. Offsets and per-sentence token ranges are
+    flat tuples of ints, built once when an analyzer first needs them (the
+    grammar fast path), so the light analyses pay for the words alone.
+    """
+
+    __slots__ = ('text', 'words', 'sentence_spans', '_case_safe', '_starts', '_ends', '_bounds', '_sentences')
+
+    def __init__(self, text: str, sentence_spans: List[Tuple[int, int]]):
+        self.text = text
+        self.sentence_spans = sentence_spans
+        lowered = text.lower()
+        # Lowercasing can change the length of a few characters; offsets then come from the original
+        self._case_safe = len(lowered) == len(text)
+        if self._case_safe:
+            self.words: List[str] = WORD_PATTERN.findall(lowered)
+        else:
+            self.words = [word.lower() for word in WORD_PATTERN.findall(text)]
+        self._starts: Optional[Tuple[int, ...]] = None
+        self._ends: Optional[Tuple[int, ...]] = None
+        self._bounds: Optional[List[int]] = None
+        self._sentences: Optional[List[str]] = None
+
+    @classmethod
+    def from_sentences(cls, text: str, sentences: Optional[Sequence[str]] = None) -> 'TokenizedText':
+        """Tokenize text whose sentences were split elsewhere (or with the regex splitter)"""
+        spans = locate_sentences(text, sentences) if sentences is not None else regex_sentence_spans(text)
+        return cls(text, spans)
+
+    @property
+    def sentences(self) -> List[str]:
+        if self._sentences is None:
+            self._sentences = [self.text[start:end] for start, end in self.sentence_spans]
+        return self._sentences
+
+    @property
+    def word_count(self) -> int:
+        return len(self.words)
+
+    @property
+    def sentence_count(self) -> int:
+        return len(self.sentence_spans)
+
+    def _build_offsets(self):
+        spans = [match.span() for match in WORD_PATTERN.finditer(self.text.lower() if self._case_safe else self.text)]
+        starts, ends = zip(*spans) if spans else ((), ())
+        self._ends = ends
+        self._starts = starts
+
+    @property
+    def starts(self) -> Tuple[int, ...]:
+        if self._starts is None:
+            self._build_offsets()
+        return self._starts
+
+    @property
+    def ends(self) -> Tuple[int, ...]:
+        if self._ends is None:
+            self._build_offsets()
+        return self._ends
+
+    def token(self, index: int) -> str:
+        """The token as written, with its original case"""
+        return self.text[self.starts[index]:self.ends[index]]
+
+    def sentence_tokens(self, index: int) -> range:
+        """Indices of the tokens that start inside sentence `index`"""
+        if self._bounds is None:
+            starts = self.starts
+            bounds = []
+            for start, end in self.sentence_spans:
+                bounds.append(bisect_left(starts, start))
+                bounds.append(bisect_left(starts, end))
+            self._bounds = bounds
+        return range(self._bounds[2 * index], self._bounds[2 * index + 1])
@@ -1,34 +1,43 @@
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Set
 from app.config import settings
+from app.nlp.keyword_matcher import KeywordMatcher, get_keyword_matcher
+from app.scoring.tables import ScoringTables, get_scoring_tables
 
 
 class VocabularyAnalyzer:
     
-    def __init__(self):
-        self.filler_words = settings.filler_words
+    def __init__(
+        self,
+        matcher: Optional[KeywordMatcher] = None,
+        filler_words: Optional[List[str]] = None,
+        tables: Optional[ScoringTables] = None
+    ):
+        self.filler_words = filler_words if filler_words is not None else settings.filler_words
+        self.matcher = matcher or get_keyword_matcher()
+        self.tables = tables or get_scoring_tables()
     
     def calculate_ttr(self, words: List[str]) -> float:
 
-        if not words:
+        return self._ttr(len(set(words)), len(words))
+    
+    def _ttr(self, unique_count: int, word_count: int) -> float:
+        if not word_count:
             return 0.0
-        
-        unique_words = set(words)
-        ttr = (len(unique_words) / len(words)) * 100
-        return round(ttr, 2)
+        return round((unique_count / word_count) * 100, 2)
     
-    def detect_filler_words(self, text: str, words: List[str]) -> Dict:
+    def detect_filler_words(self, text: str, words: List[str], matches: Optional[Dict] = None) -> Dict:
   
-        text_lower = text.lower()
-        filler_count = 0
+        if matches is None:
+            matches = self.matcher.scan(words)
+        return self._filler_analysis(matches, len(words))
+    
+    def _filler_analysis(self, matches: Dict, word_count: int) -> Dict:
         filler_details = {}
+        for filler, _ in matches['filler']:
+            filler_details[filler] = filler_details.get(filler, 0) + 1
+        filler_count = sum(filler_details.values())
         
-        for filler in self.filler_words:
-            count = text_lower.count(filler)
-            if count > 0:
-                filler_count += count
-                filler_details[filler] = count
-        
-        filler_rate = (filler_count / len(words)) * 100 if words else 0.0
+        filler_rate = (filler_count / word_count) * 100 if word_count else 0.0
         
         return {
             'filler_count': filler_count,
@@ -37,32 +46,24 @@ class VocabularyAnalyzer:
         }
     
     def calculate_vocabulary_score(self, ttr: float) -> float:
-
-        if ttr >= 70:
-            return 90 + ((ttr - 70) / 30) * 10
-        elif ttr >= 50:
-            return 70 + ((ttr - 50) / 20) * 20
-        elif ttr >= 30:
-            return 50 + ((ttr - 30) / 20) * 20
-        else:
-            return (ttr / 30) * 50
+        """Vocabulary score (0-100) from the type-token ratio, by the 'vocabulary_score' table"""
+        return self.tables['vocabulary_score'](ttr)
     
     def calculate_clarity_score(self, filler_rate: float) -> float:
-
-        if filler_rate == 0:
-            return 100.0
-        elif filler_rate <= 2:
-            return 100 - (filler_rate * 5)
-        elif filler_rate <= 5:
-            return 90 - ((filler_rate - 2) * 6.67)
-        else:
-            return max(0, 70 - ((filler_rate - 5) * 10))
+        """Clarity score (0-100) from fillers per 100 words, by the 'clarity_score' table"""
+        return self.tables['clarity_score'](filler_rate)
     
-    def analyze(self, text: str, words: List[str]) -> Dict:
+    def analyze(self, text: str, words: List[str], matches: Optional[Dict] = None) -> Dict:
 
-        ttr = self.calculate_ttr(words)
+        if matches is None:
+            matches = self.matcher.scan(words)
+        return self.analyze_counts(len(words), len(set(words)), matches)
+    
+    def analyze_counts(self, word_count: int, unique_count: int, matches: Dict) -> Dict:
+        """analyze() from word totals, for callers that keep running counts (incremental re-evaluation)"""
+        ttr = self._ttr(unique_count, word_count)
         vocabulary_score = self.calculate_vocabulary_score(ttr)
-        filler_analysis = self.detect_filler_words(text, words)
+        filler_analysis = self._filler_analysis(matches, word_count)
         clarity_score = self.calculate_clarity_score(filler_analysis['filler_rate'])
         
         return {
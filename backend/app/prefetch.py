@@ -0,0 +1,131 @@
+"""
+Download every model artifact into Settings.model_cache_dir
+
+The server never downloads at startup; run this once per deployment (or bake
+it into the image, or run it on a connected machine and copy the directory to
+air-gapped nodes) before starting it:
+
+    python -m app.prefetch                  # NLTK data, embedding model, LanguageTool
+    python -m app.prefetch --onnx           # also export ONNX and int8 ONNX models
+    python -m app.prefetch --verify         # check the directory against its manifest
+
+A manifest of file sizes and SHA-256 checksums is written alongside the
+artifacts and checked at startup (see ARTIFACT_VERIFICATION).
+"""
+
+import argparse
+import os
+import sys
+from app.config import settings
+from app.artifacts import (
+    nltk_data_dir, sentence_transformer_dir, onnx_model_dir, languagetool_downloaded,
+    use_languagetool_dir, build_manifest, write_manifest, verify_manifest
+)
+
+COMPONENTS = ('nltk', 'embedding', 'languagetool')
+
+
+def prefetch_nltk() -> str:
+    import nltk
+
+    directory = nltk_data_dir()
+    os.makedirs(directory, exist_ok=True)
+    for package in ('punkt', 'punkt_tab'):
+        nltk.download(package, download_dir=directory, quiet=True)
+    return directory
+
+
+def prefetch_embedding_model(model_name: str = None) -> str:
+    from sentence_transformers import SentenceTransformer
+
+    model_name = model_name or settings.sentence_transformer_model
+    directory = sentence_transformer_dir(model_name)
+    if not os.path.isdir(directory):
+        SentenceTransformer(model_name, device='cpu').save(directory)
+    convert_to_safetensors(directory)
+    return directory
+
+
+def convert_to_safetensors(directory: str):
+    """
+    Store the weights as safetensors
+
+    transformers memory-maps safetensors files instead of unpickling them, so
+    workers forked after loading share the weight pages.
+    """
+    bin_path = os.path.join(directory, 'pytorch_model.bin')
+    safetensors_path = os.path.join(directory, 'model.safetensors')
+    if not os.path.exists(bin_path) or os.path.exists(safetensors_path):
+        return
+
+    import torch
+    from safetensors.torch import save_file
+
+    state_dict = torch.load(bin_path, map_location='cpu')
+    save_file(
+        {name: tensor.contiguous() for name, tensor in state_dict.items()},
+        safetensors_path,
+        metadata={'format': 'pt'}
+    )
+    os.remove(bin_path)
+
+
+def prefetch_onnx(quantize: bool = True) -> str:
+    from app.nlp.embedding_backends import export_onnx_model
+
+    # Exported from the local copy, so this step needs no network either
+    directory = settings.embedding_onnx_dir or onnx_model_dir()
+    export_onnx_model(prefetch_embedding_model(), directory, quantize=quantize)
+    return directory
+
+
+def prefetch_languagetool() -> str:
+    from language_tool_python.download_lt import download_lt
+
+    use_languagetool_dir()
+    if not languagetool_downloaded():
+        download_lt()
+    return os.environ['LTP_PATH']
+
+
+def prefetch(components=COMPONENTS, onnx: bool = False, quantize: bool = True) -> str:
+    steps = {
+        'nltk': prefetch_nltk,
+        'embedding': prefetch_embedding_model,
+        'languagetool': prefetch_languagetool
+    }
+    for component in components:
+        print(f"Fetching {component}...")
+        print(f"  -> {steps[component]()}")
+
+    if onnx:
+        print("Exporting ONNX embedding model...")
+        print(f"  -> {prefetch_onnx(quantize)}")
+
+    return write_manifest(build_manifest())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Download model artifacts into the model cache")
+    parser.add_argument(
+        '--only', default=','.join(COMPONENTS),
+        help=f"Comma-separated subset of: {', '.join(COMPONENTS)}"
+    )
+    parser.add_argument('--onnx', action='store_true', help="Also export ONNX and int8 ONNX embedding models")
+    parser.add_argument('--no-quantize', action='store_true', help="Skip the int8 ONNX model")
+    parser.add_argument('--verify', action='store_true', help="Only verify the artifacts against the manifest")
+    args = parser.parse_args()
+
+    if args.verify:
+        problems = verify_manifest('checksum')
+        for problem in problems:
+            print(problem)
+        print("Artifacts OK" if not problems else f"{len(problems)} problem(s) found")
+        sys.exit(1 if problems else 0)
+
+    manifest = prefetch(
+        [c for c in args.only.split(',') if c],
+        onnx=args.onnx,
+        quantize=not args.no_quantize
+    )
+    print(f"Wrote {manifest}")
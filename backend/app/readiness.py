@@ -0,0 +1,105 @@
+"""
+Per-component load state for health and readiness reporting
+"""
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+PENDING = 'pending'
+LOADING = 'loading'
+READY = 'ready'
+DEGRADED = 'degraded'
+
+# Text used for the one warm-up inference per model
+WARMUP_TEXT = "Hello everyone, my name is Sam. I am fifteen years old and I love reading books."
+
+
+class ReadinessRegistry:
+    """
+    Tracks each model-backed component through pending -> loading -> ready
+
+    A component that fails to load ends up 'degraded': the pipeline still runs
+    without it (see allow_partial_results), so warm-up counts as finished.
+    """
+
+    def __init__(self, components: List[str]):
+        self._lock = threading.Lock()
+        self._components = {
+            name: {'name': name, 'state': PENDING, 'load_seconds': None, 'warmup_seconds': None, 'error': None}
+            for name in components
+        }
+        self.started_at = None
+        self.finished_at = None
+
+    def run(self, name: str, component, warm_up: Optional[Callable[[], object]] = None):
+        """
+        Load one component, then run a single inference so first requests don't pay for it
+
+        Components expose load() -> bool and a load_error describing a failed load.
+        """
+        self._update(name, state=LOADING)
+        start = time.perf_counter()
+        try:
+            loaded = component.load()
+            error = None if loaded else (component.load_error or 'not available')
+        except Exception as e:
+            loaded = False
+            error = str(e)
+        load_seconds = round(time.perf_counter() - start, 3)
+
+        warmup_seconds = None
+        if loaded and warm_up is not None:
+            start = time.perf_counter()
+            try:
+                warm_up()
+            except Exception as e:
+                loaded = False
+                error = f"warm-up failed: {e}"
+            warmup_seconds = round(time.perf_counter() - start, 3)
+
+        self._update(
+            name,
+            state=READY if loaded else DEGRADED,
+            load_seconds=load_seconds,
+            warmup_seconds=warmup_seconds,
+            error=error
+        )
+
+    def run_all(self, steps: List[tuple]):
+        self.started_at = time.time()
+        for step in steps:
+            self.run(*step)
+        self.finished_at = time.time()
+
+    def _update(self, name: str, **fields):
+        with self._lock:
+            self._components[name].update(fields)
+
+    def restore(self, components: List[Dict]):
+        """Adopt component states reported by another process"""
+        with self._lock:
+            for component in components:
+                self._components[component['name']] = dict(component)
+        self.finished_at = time.time()
+
+    def components(self) -> List[Dict]:
+        with self._lock:
+            return [dict(component) for component in self._components.values()]
+
+    @property
+    def ready(self) -> bool:
+        """Every component has finished loading, successfully or not"""
+        with self._lock:
+            return all(c['state'] in (READY, DEGRADED) for c in self._components.values())
+
+    @property
+    def degraded(self) -> bool:
+        """Some component failed to load, so its stage is left out of every result"""
+        with self._lock:
+            return any(c['state'] == DEGRADED for c in self._components.values())
+
+    @property
+    def all_loaded(self) -> bool:
+        with self._lock:
+            return all(c['state'] == READY for c in self._components.values())
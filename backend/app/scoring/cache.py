@@ -0,0 +1,214 @@
+"""
+Content-addressed cache for evaluation results
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from app.config import settings
+from app.nlp.embedding_backends import BACKEND_QUANTIZATION
+from app import __version__
+
+
+def config_fingerprint(rubric) -> str:
+    """Hash every setting that can change a score, so cached results follow config changes"""
+    payload = {
+        'version': __version__,
+        'model': settings.sentence_transformer_model,
+        # Backends agree only within a tolerance, so their coherence scores differ slightly
+        'embedding_backend': [settings.embedding_backend, BACKEND_QUANTIZATION.get(settings.embedding_backend)],
+        # Adds coherence_metrics to every result
+        'coherence_full_matrix': settings.coherence_full_matrix,
+        'criteria': {key: [c.name, c.weight, c.max_score] for key, c in rubric.get_all_criteria().items()},
+        'keywords': rubric.keywords,
+        'feedback': rubric.feedback,
+        'wpm': [settings.optimal_wpm_min, settings.optimal_wpm_max],
+        'word_count': [settings.min_word_count, settings.max_word_count],
+        'sentence_splitter': settings.sentence_splitter,
+        'max_grammar_errors': settings.max_grammar_errors_per_100_words,
+        'scoring_tables': rubric.thresholds,
+        'grammar_mode': settings.grammar_mode,
+        # Low-confidence texts are scored by LanguageTool in hybrid mode
+        'grammar_escalation': [settings.grammar_escalation_min_confidence, settings.grammar_escalation_sample_rate]
+    }
+    encoded = json.dumps(payload, sort_keys=True).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def transcript_digest(cleaned_text: str) -> str:
+    return hashlib.sha256(cleaned_text.encode('utf-8')).hexdigest()
+
+
+class SQLiteCacheStore:
+    """On-disk cache tier that can be shared by several worker processes"""
+
+    def __init__(self, path: str, fingerprints: List[str]):
+        self.path = path
+        self._local = threading.local()
+
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, value TEXT NOT NULL)"
+        )
+        # Entries written under a config no rubric has any more can never be hit again
+        placeholders = ', '.join('?' * len(fingerprints))
+        conn.execute(f"DELETE FROM results WHERE fingerprint NOT IN ({placeholders})", list(fingerprints))
+        conn.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Dict]:
+        row = self._connect().execute(
+            "SELECT value FROM results WHERE key = ? AND expires_at > ?",
+            (key, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Dict, ttl_seconds: float):
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO results (key, fingerprint, expires_at, value) VALUES (?, ?, ?, ?)",
+            (key, key.partition(':')[0], time.time() + ttl_seconds, json.dumps(value))
+        )
+        conn.commit()
+
+    def clear(self):
+        conn = self._connect()
+        conn.execute("DELETE FROM results")
+        conn.commit()
+
+
+class ResultCache:
+    """Two-tier LRU/TTL cache: in-process memory first, then an optional disk store"""
+
+    def __init__(
+        self,
+        fingerprint: str,
+        max_entries: int = 1024,
+        ttl_seconds: float = 3600,
+        disk_store=None
+    ):
+        self.fingerprint = fingerprint
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_store = disk_store
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+
+    def make_key(self, cleaned_text: str, fingerprint: Optional[str] = None) -> str:
+        """Key of a cleaned transcript under a rubric's fingerprint, the default rubric's if not given"""
+        return f"{fingerprint or self.fingerprint}:{transcript_digest(cleaned_text)}"
+
+    def get(self, key: str) -> Optional[Dict]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._memory_hits += 1
+                    return value
+                del self._entries[key]
+
+        if self.disk_store is not None:
+            try:
+                value = self.disk_store.get(key)
+            except Exception as e:
+                print(f"Result cache read error: {e}")
+                value = None
+            if value is not None:
+                with self._lock:
+                    self._disk_hits += 1
+                    self._store(key, value, now)
+                return value
+
+        with self._lock:
+            self._misses += 1
+        return None
+
+    def set(self, key: str, value: Dict):
+        with self._lock:
+            self._store(key, value, time.time())
+
+        if self.disk_store is not None:
+            try:
+                self.disk_store.set(key, value, self.ttl_seconds)
+            except Exception as e:
+                print(f"Result cache write error: {e}")
+
+    def remember(self, key: str, value: Dict):
+        """Memory tier only, for a result whose disk row (if any) another process already wrote"""
+        with self._lock:
+            self._store(key, value, time.time())
+
+    def _store(self, key: str, value: Dict, now: float):
+        self._entries[key] = (now + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.disk_store is not None:
+            self.disk_store.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            hits = self._memory_hits + self._disk_hits
+            lookups = hits + self._misses
+            return {
+                'enabled': True,
+                'fingerprint': self.fingerprint,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'memory_hits': self._memory_hits,
+                'disk_hits': self._disk_hits,
+                'misses': self._misses,
+                'hit_rate': round(hits / lookups, 3) if lookups else 0.0,
+                'disk_tier': self.disk_store is not None
+            }
+
+
+def create_result_cache(fingerprints: List[str]) -> Optional[ResultCache]:
+    """
+    Build the cache described by Settings, or None when caching is disabled
+
+    Args:
+        fingerprints: Of every loaded rubric, the default rubric's first
+    """
+    if not settings.result_cache_enabled:
+        return None
+
+    fingerprint = fingerprints[0]
+    disk_store = None
+    if settings.result_cache_path:
+        try:
+            disk_store = SQLiteCacheStore(settings.result_cache_path, fingerprints)
+        except Exception as e:
+            print(f"Warning: Could not open result cache at {settings.result_cache_path}: {e}")
+
+    return ResultCache(
+        fingerprint,
+        max_entries=settings.result_cache_max_entries,
+        ttl_seconds=settings.result_cache_ttl_seconds,
+        disk_store=disk_store
+    )
@@ -2,114 +2,99 @@
 Feedback generation based on scores
 """
 
-from typing import Dict
+from string import Formatter
+from typing import Dict, Optional
+from app.scoring.rubric import FEEDBACK_TEMPLATES, TEMPLATE_FIELDS
+from app.scoring.tables import ScoringTable, compile_table
 
 
 class FeedbackGenerator:
     """Generate actionable feedback based on scores"""
-    
+
+    def __init__(self, templates: Optional[Dict] = None):
+        """
+        Args:
+            templates: Template specs by feedback key, as in FEEDBACK_TEMPLATES
+                (the default); compiled here once and checked against
+                TEMPLATE_FIELDS, so a bad template fails at load, not mid-request
+        """
+        self.templates: Dict[str, ScoringTable] = {}
+        for key, spec in (templates if templates is not None else FEEDBACK_TEMPLATES).items():
+            if key not in TEMPLATE_FIELDS:
+                raise ValueError(f"Unknown feedback template '{key}'")
+            if isinstance(spec, str):
+                spec = {'below': spec, 'steps': []}
+            try:
+                table = compile_table(spec)
+            except (KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"Feedback template '{key}': {e}") from e
+            for template in table.values:
+                fields = {field for _, field, _, _ in Formatter().parse(template) if field}
+                unknown = fields - TEMPLATE_FIELDS[key]
+                if unknown:
+                    raise ValueError(f"Feedback template '{key}' uses unknown fields: {', '.join(sorted(unknown))}")
+            self.templates[key] = table
+
+    def _render(self, key: str, metric: float, **fields) -> str:
+        return self.templates[key](metric).format(**fields)
+
     def generate_salutation_feedback(self, found: bool, salutation_text: str) -> str:
         """Generate feedback for salutation"""
-        if found:
-            return f"Great! Used '{salutation_text}' as a greeting. This creates a positive first impression."
-        else:
-            return "Consider starting with a greeting like 'Hello', 'Hi', or 'Good morning' to make your introduction more engaging."
-    
+        return self._render('salutation', 1 if found else 0, salutation_text=salutation_text)
+
     def generate_personal_info_feedback(self, personal_info: Dict[str, bool], count: int) -> str:
         """Generate feedback for personal information"""
         missing = [key for key, found in personal_info.items() if not found]
-        
-        if count == 5:
-            return "Excellent! You included all key personal information (name, age, school, grade, family)."
-        elif count >= 3:
-            return f"Good coverage of personal information. Consider adding: {', '.join(missing)}."
-        else:
-            return f"Include more personal details to make your introduction complete. Missing: {', '.join(missing)}."
-    
+        return self._render('personal_info', count, missing=', '.join(missing), count=count)
+
     def generate_hobbies_feedback(self, found: bool) -> str:
         """Generate feedback for hobbies"""
-        if found:
-            return "Great! You mentioned your hobbies and interests, which makes your introduction more personal."
-        else:
-            return "Consider mentioning your hobbies or interests to help others get to know you better."
-    
+        return self._render('hobbies', 1 if found else 0)
+
     def generate_flow_feedback(self, coherence_score: float, flow_quality: str) -> str:
         """Generate feedback for flow and coherence"""
-        if coherence_score >= 85:
-            return f"Excellent flow! Your ideas connect smoothly. ({flow_quality})"
-        elif coherence_score >= 70:
-            return f"Good flow between ideas. ({flow_quality})"
-        elif coherence_score >= 50:
-            return f"Fair flow. Try using transition words to connect your ideas better. ({flow_quality})"
-        else:
-            return f"Work on connecting your ideas more smoothly. Use transition words like 'also', 'moreover', 'furthermore'. ({flow_quality})"
-    
+        return self._render('flow_coherence', coherence_score, coherence_score=coherence_score, flow_quality=flow_quality)
+
+    def generate_flow_unavailable_feedback(self) -> str:
+        """Generate feedback when coherence analysis could not run"""
+        return self._render('flow_coherence_unavailable', 0)
+
     def generate_speech_rate_feedback(self, wpm: float) -> str:
         """Generate feedback for speech rate"""
-        if 120 <= wpm <= 150:
-            return f"Perfect speech rate at {wpm} WPM! This is ideal for clear communication."
-        elif 100 <= wpm < 120:
-            return f"Speech rate is {wpm} WPM. Try speaking a bit faster to sound more confident."
-        elif 150 < wpm <= 180:
-            return f"Speech rate is {wpm} WPM. Try slowing down slightly to ensure clarity."
-        elif wpm < 100:
-            return f"Speech rate is {wpm} WPM. This is quite slow. Try to speak more fluently."
-        else:
-            return f"Speech rate is {wpm} WPM. This is very fast. Slow down to ensure your audience can follow."
-    
+        return self._render('speech_rate', wpm, wpm=wpm)
+
     def generate_grammar_feedback(self, error_count: int, error_rate: float, grammar_score: float) -> str:
         """Generate feedback for grammar"""
-        if error_count == 0:
-            return "Perfect! No grammar errors detected."
-        elif error_rate <= 2:
-            return f"Very good! Only {error_count} minor grammar error(s) detected."
-        elif error_rate <= 5:
-            return f"Good effort! Found {error_count} grammar error(s). Review basic grammar rules to improve."
-        else:
-            return f"Found {error_count} grammar error(s). Focus on improving grammar through practice and review."
-    
+        return self._render(
+            'grammar',
+            error_rate if error_count else -1,
+            error_count=error_count,
+            error_rate=error_rate,
+            grammar_score=grammar_score
+        )
+
+    def generate_grammar_unavailable_feedback(self) -> str:
+        """Generate feedback when the grammar check could not run"""
+        return self._render('grammar_unavailable', 0)
+
     def generate_vocabulary_feedback(self, ttr: float, vocab_score: float) -> str:
         """Generate feedback for vocabulary"""
-        if vocab_score >= 85:
-            return f"Excellent vocabulary richness! (TTR: {ttr}%)"
-        elif vocab_score >= 70:
-            return f"Good vocabulary variety. (TTR: {ttr}%)"
-        elif vocab_score >= 55:
-            return f"Fair vocabulary. Try using more varied words to enhance your speech. (TTR: {ttr}%)"
-        else:
-            return f"Work on expanding your vocabulary. Avoid repeating the same words. (TTR: {ttr}%)"
-    
+        return self._render('vocabulary', vocab_score, ttr=ttr, vocabulary_score=vocab_score)
+
     def generate_clarity_feedback(self, filler_count: int, filler_rate: float, clarity_score: float) -> str:
         """Generate feedback for clarity"""
-        if filler_count == 0:
-            return "Excellent clarity! No filler words detected."
-        elif filler_rate <= 2:
-            return f"Very clear! Only {filler_count} filler word(s) detected."
-        elif filler_rate <= 5:
-            return f"Good clarity. Found {filler_count} filler word(s). Try to reduce 'um', 'uh', 'like', etc."
-        else:
-            return f"Found {filler_count} filler word(s). Practice speaking more deliberately to reduce fillers."
-    
+        return self._render(
+            'clarity',
+            filler_rate if filler_count else -1,
+            filler_count=filler_count,
+            filler_rate=filler_rate,
+            clarity_score=clarity_score
+        )
+
     def generate_engagement_feedback(self, engagement_score: float, sentiment_label: str) -> str:
         """Generate feedback for engagement"""
-        if engagement_score >= 80:
-            return f"Excellent enthusiasm and positivity! ({sentiment_label})"
-        elif engagement_score >= 65:
-            return f"Good positive tone. ({sentiment_label})"
-        elif engagement_score >= 50:
-            return f"Fair engagement. Try to sound more enthusiastic and positive. ({sentiment_label})"
-        else:
-            return f"Work on sounding more positive and engaged. Smile while speaking! ({sentiment_label})"
-    
+        return self._render('engagement', engagement_score, engagement_score=engagement_score, sentiment_label=sentiment_label)
+
     def generate_overall_summary(self, overall_score: float, grade: str) -> str:
         """Generate overall summary feedback"""
-        if overall_score >= 90:
-            return f"Outstanding performance! (Grade: {grade}) Your self-introduction is excellent with strong content, delivery, and engagement."
-        elif overall_score >= 80:
-            return f"Great job! (Grade: {grade}) Your introduction is well-structured with good delivery. Minor improvements will make it perfect."
-        elif overall_score >= 70:
-            return f"Good effort! (Grade: {grade}) Your introduction covers the basics well. Focus on the areas marked for improvement."
-        elif overall_score >= 60:
-            return f"Fair performance. (Grade: {grade}) Work on including more details and improving your delivery."
-        else:
-            return f"Needs improvement. (Grade: {grade}) Review the feedback carefully and practice your introduction."
+        return self._render('summary', overall_score, overall_score=overall_score, grade=grade)
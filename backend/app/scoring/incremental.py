@@ -0,0 +1,143 @@
+"""
+Per-sentence state for incremental re-evaluation
+
+A student editing a transcript resubmits it many times with most sentences
+unchanged. An EditSession keeps what the analyzers produced for each sentence
+of the last submission, keyed by the sentence text, so a resubmission only
+sends its new or edited sentences through grammar checking and embedding.
+Word totals are kept as a running Counter, so TTR and filler rates come from
+the partials without rescanning the transcript.
+"""
+
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from app.config import settings
+
+
+@dataclass
+class SentencePartial:
+    """What the analyzers found in one sentence, with token positions relative to it"""
+    word_counts: Counter
+    word_count: int
+    keyword_hits: Dict[str, List[Tuple[str, int]]]
+    grammar: Optional[Dict] = None
+    embedding: Optional[np.ndarray] = None
+
+
+class EditSession:
+    """Sentences of the last submission and their partials"""
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        # One submission at a time per session; the partials are replaced as a whole
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self, fingerprint: Optional[str] = None):
+        """Forget every partial; they were built under the rubric with this fingerprint"""
+        self.fingerprint = fingerprint
+        self.sentences: List[str] = []
+        self.partials: Dict[str, SentencePartial] = {}
+        self.word_counts: Counter = Counter()
+        self.word_count = 0
+
+    def update(self, sentences: List[str], partials: Dict[str, SentencePartial]):
+        """
+        Move the running totals from the previous submission to this one
+
+        Only sentences that were added or removed touch the totals, so the cost
+        follows the size of the edit. Partials of dropped sentences are let go.
+        """
+        previous = Counter(self.sentences)
+        current = Counter(sentences)
+        for sentence, count in (previous - current).items():
+            partial = self.partials[sentence]
+            # Per word rather than Counter -=, which rescans the whole Counter
+            for word, word_count in partial.word_counts.items():
+                remaining = self.word_counts[word] - word_count * count
+                if remaining > 0:
+                    self.word_counts[word] = remaining
+                else:
+                    del self.word_counts[word]
+            self.word_count -= partial.word_count * count
+        for sentence, count in (current - previous).items():
+            partial = partials[sentence]
+            for word, word_count in partial.word_counts.items():
+                self.word_counts[word] += word_count * count
+            self.word_count += partial.word_count * count
+
+        self.sentences = sentences
+        self.partials = {sentence: partials[sentence] for sentence in current}
+
+    def merged_keyword_hits(self, categories: Iterable[str]) -> Dict[str, List[Tuple[str, int]]]:
+        """Keyword hits of every sentence, in text order with transcript token positions"""
+        merged = {category: [] for category in categories}
+        position = 0
+        for sentence in self.sentences:
+            partial = self.partials[sentence]
+            for category, hits in partial.keyword_hits.items():
+                merged[category].extend((phrase, position + start) for phrase, start in hits)
+            position += partial.word_count
+        return merged
+
+
+class EditSessionStore:
+    """In-process LRU/TTL map of session id to EditSession"""
+
+    def __init__(self, max_sessions: int = 1000, ttl_seconds: float = 1800):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get_or_create(self, session_id: Optional[str]) -> Tuple[EditSession, bool]:
+        """
+        The session for session_id, or a new empty one
+
+        Returns:
+            (session, whether it already existed); an unknown or expired id starts
+            a fresh session under that id, so clients can choose their own ids
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._sessions.get(session_id) if session_id else None
+            if entry is not None and entry[0] > now:
+                self._sessions.move_to_end(session_id)
+                self._sessions[session_id] = (now + self.ttl_seconds, entry[1])
+                self._hits += 1
+                return entry[1], True
+
+            self._misses += 1
+            session = EditSession(session_id or uuid.uuid4().hex)
+            self._sessions[session.session_id] = (now + self.ttl_seconds, session)
+            self._sessions.move_to_end(session.session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            return session, False
+
+    def discard(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'size': len(self._sessions),
+                'max_sessions': self.max_sessions,
+                'hits': self._hits,
+                'misses': self._misses
+            }
+
+
+def create_session_store() -> EditSessionStore:
+    return EditSessionStore(
+        max_sessions=settings.incremental_max_sessions,
+        ttl_seconds=settings.incremental_session_ttl_seconds
+    )
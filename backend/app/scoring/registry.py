@@ -0,0 +1,195 @@
+"""
+Rubrics by id, loaded from YAML/JSON files and reloaded when they change
+
+Each file in RUBRIC_DIR holds one rubric (see SpeechRubric.from_dict), named
+by its 'id' or else by its file name. Everything a rubric scores with - its
+keyword automaton, scoring tables and feedback templates - is compiled once
+into a CompiledRubric, so serving many rubrics costs a lookup per request.
+
+Changed files are picked up on the next lookup after RUBRIC_RELOAD_SECONDS.
+A reload builds a new id -> CompiledRubric map and swaps it in whole; a
+request holds on to the CompiledRubric it started with, so it finishes under
+the rubric it was scored against. A file that fails to load is reported in
+errors() and its last good version stays in service.
+
+PyYAML is optional; without it only .json files are loaded.
+"""
+
+import json
+import os
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from app.config import settings
+from app.nlp.keyword_detector import KeywordDetector
+from app.nlp.keyword_matcher import build_keyword_matcher
+from app.nlp.vocabulary_analyzer import VocabularyAnalyzer
+from app.scoring.cache import config_fingerprint
+from app.scoring.feedback_generator import FeedbackGenerator
+from app.scoring.rubric import DEFAULT_RUBRIC_ID, SpeechRubric
+from app.scoring.tables import ScoringTables
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+RUBRIC_EXTENSIONS = ('.json', '.yaml', '.yml')
+
+
+class UnknownRubricError(Exception):
+    pass
+
+
+class CompiledRubric:
+    """A rubric with everything derived from it built once"""
+
+    def __init__(self, rubric: SpeechRubric, source: Optional[str] = None):
+        self.rubric = rubric
+        self.rubric_id = rubric.rubric_id
+        self.source = source
+        self.tables = ScoringTables(rubric)
+        self.keyword_matcher = build_keyword_matcher(rubric.keyword_categories())
+        self.keyword_detector = KeywordDetector(self.keyword_matcher, rubric.keywords)
+        self.vocabulary_analyzer = VocabularyAnalyzer(self.keyword_matcher, rubric.keywords['filler'], self.tables)
+        self.feedback_generator = FeedbackGenerator(rubric.feedback)
+        # Names this rubric's cached results and result ids
+        self.fingerprint = config_fingerprint(rubric)
+
+    def describe(self) -> Dict:
+        return {
+            'id': self.rubric_id,
+            'name': self.rubric.name,
+            'fingerprint': self.fingerprint,
+            'criteria': {
+                key: {'name': criterion.name, 'weight': criterion.weight, 'max_score': criterion.max_score}
+                for key, criterion in self.rubric.get_all_criteria().items()
+            },
+            'source': self.source
+        }
+
+
+def load_rubric_file(path: str) -> SpeechRubric:
+    """Parse one rubric file; its id defaults to the file name without extension"""
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith('.json'):
+            data = json.load(f)
+        elif yaml is None:
+            raise ValueError("PyYAML is not installed")
+        else:
+            data = yaml.safe_load(f)
+    return SpeechRubric.from_dict(data, os.path.splitext(os.path.basename(path))[0])
+
+
+class RubricRegistry:
+    """Compiled rubrics by id: the built-in default plus one per file in a directory"""
+
+    def __init__(self, directory: Optional[str] = None, reload_seconds: float = 5.0):
+        self.directory = directory
+        self.reload_seconds = reload_seconds
+        self._builtin = CompiledRubric(SpeechRubric())
+        self._rubrics: Dict[str, CompiledRubric] = {DEFAULT_RUBRIC_ID: self._builtin}
+        # Path -> (mtime_ns, size) and what it last loaded as
+        self._files: Dict[str, Tuple[Tuple[int, int], Optional[CompiledRubric]]] = {}
+        self._errors: Dict[str, str] = {}
+        # Serializes reloads only; lookups read whichever map is current
+        self._reload_lock = threading.Lock()
+        self._next_check = 0.0
+        if directory:
+            self.reload()
+
+    def get(self, rubric_id: Optional[str] = None) -> CompiledRubric:
+        """The rubric for an id, the default when none is given; raises UnknownRubricError"""
+        self._maybe_reload()
+        compiled = self._rubrics.get(rubric_id or DEFAULT_RUBRIC_ID)
+        if compiled is None:
+            raise UnknownRubricError(f"Unknown rubric '{rubric_id}'")
+        return compiled
+
+    def find(self, fingerprint: str) -> Optional[CompiledRubric]:
+        """The loaded rubric with this fingerprint, if any is still current"""
+        return next((c for c in self._rubrics.values() if c.fingerprint == fingerprint), None)
+
+    def all(self) -> List[CompiledRubric]:
+        self._maybe_reload()
+        return list(self._rubrics.values())
+
+    def errors(self) -> Dict[str, str]:
+        return dict(self._errors)
+
+    def _maybe_reload(self):
+        if not self.directory or time.monotonic() < self._next_check:
+            return
+        # Whoever gets here first reloads; everyone else carries on with the current map
+        if self._reload_lock.acquire(blocking=False):
+            try:
+                self._reload_locked()
+            finally:
+                self._reload_lock.release()
+
+    def reload(self) -> bool:
+        """Pick up added, changed and removed files now; returns whether anything changed"""
+        with self._reload_lock:
+            return self._reload_locked()
+
+    def _reload_locked(self) -> bool:
+        self._next_check = time.monotonic() + self.reload_seconds
+        try:
+            names = sorted(os.listdir(self.directory))
+        except OSError as e:
+            print(f"Warning: Could not list rubric directory {self.directory}: {e}")
+            return False
+
+        signatures = {}
+        for name in names:
+            path = os.path.join(self.directory, name)
+            if name.startswith('.') or not name.endswith(RUBRIC_EXTENSIONS):
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            signatures[path] = (stat.st_mtime_ns, stat.st_size)
+        if signatures == {path: signature for path, (signature, _) in self._files.items()}:
+            return False
+
+        files = {}
+        errors = {}
+        for path, signature in signatures.items():
+            previous = self._files.get(path)
+            if previous is not None and previous[0] == signature:
+                files[path] = previous
+                if path in self._errors:
+                    errors[path] = self._errors[path]
+                continue
+            try:
+                compiled = CompiledRubric(load_rubric_file(path), source=path)
+            except Exception as e:
+                print(f"Warning: Could not load rubric {path}: {e}")
+                errors[path] = str(e)
+                # The last good version of this file keeps serving
+                compiled = previous[1] if previous is not None else None
+            files[path] = (signature, compiled)
+
+        rubrics = {DEFAULT_RUBRIC_ID: self._builtin}
+        for path, (_, compiled) in files.items():
+            if compiled is None:
+                continue
+            if compiled.rubric_id in rubrics and rubrics[compiled.rubric_id].source is not None:
+                message = f"Duplicate rubric id '{compiled.rubric_id}', also in {rubrics[compiled.rubric_id].source}"
+                errors[path] = f"{errors[path]}; {message}" if path in errors else message
+                continue
+            rubrics[compiled.rubric_id] = compiled
+
+        # One assignment each: lookups see the old map or the new one, never a mix
+        self._files = files
+        self._errors = errors
+        self._rubrics = rubrics
+        return True
+
+
+@lru_cache(maxsize=1)
+def get_rubric_registry() -> RubricRegistry:
+    """Registry shared by the scorer and the response encoders, one per process"""
+    return RubricRegistry(settings.rubric_dir, settings.rubric_reload_seconds)
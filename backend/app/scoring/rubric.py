@@ -2,8 +2,9 @@
 Rubric definitions and scoring criteria
 """
 
-from typing import Dict, List
+from typing import Dict, List, Optional
 from dataclasses import dataclass
+from app.config import settings
 
 
 @dataclass
@@ -14,35 +15,130 @@ class Criterion:
     max_score: float = 5.0  # Maximum score for this criterion
 
 
+DEFAULT_RUBRIC_ID = 'default'
+
+# Criteria the scorer knows how to measure; a rubric weights some or all of them
+CRITERION_KEYS = (
+    'salutation', 'personal_info', 'hobbies', 'flow_coherence', 'speech_rate',
+    'grammar', 'vocabulary', 'clarity', 'engagement'
+)
+
+KEYWORD_LISTS = ('salutation', 'personal_info', 'hobbies', 'filler')
+
+
+def default_criteria() -> Dict[str, Criterion]:
+    return {
+        # Content & Structure (40%)
+        'salutation': Criterion('Salutation Level', 5.0),
+        'personal_info': Criterion('Personal Information', 10.0),
+        'hobbies': Criterion('Hobbies/Interests', 10.0),
+        'flow_coherence': Criterion('Flow & Coherence', 15.0),
+        
+        # Speech Rate (10%)
+        'speech_rate': Criterion('Speech Rate', 10.0),
+        
+        # Language & Grammar (20%)
+        'grammar': Criterion('Grammar Accuracy', 10.0),
+        'vocabulary': Criterion('Vocabulary Richness', 10.0),
+        
+        # Clarity (15%)
+        'clarity': Criterion('Clarity (Filler Words)', 15.0),
+        
+        # Engagement (15%)
+        'engagement': Criterion('Engagement & Positivity', 15.0),
+    }
+
+
+def default_keywords() -> Dict:
+    return {
+        'salutation': settings.salutation_keywords,
+        'personal_info': settings.personal_info_keywords,
+        'hobbies': settings.hobbies_keywords,
+        'filler': settings.filler_words
+    }
+
+
 class SpeechRubric:
-    """Speech evaluation rubric with all criteria"""
+    """
+    Speech evaluation rubric: criteria and weights, plus the keyword lists,
+    scoring tables and feedback templates it scores with
     
-    def __init__(self):
-        # Define all criteria with their weights
-        self.criteria = {
-            # Content & Structure (40%)
-            'salutation': Criterion('Salutation Level', 5.0),
-            'personal_info': Criterion('Personal Information', 10.0),
-            'hobbies': Criterion('Hobbies/Interests', 10.0),
-            'flow_coherence': Criterion('Flow & Coherence', 15.0),
-            
-            # Speech Rate (10%)
-            'speech_rate': Criterion('Speech Rate', 10.0),
-            
-            # Language & Grammar (20%)
-            'grammar': Criterion('Grammar Accuracy', 10.0),
-            'vocabulary': Criterion('Vocabulary Richness', 10.0),
-            
-            # Clarity (15%)
-            'clarity': Criterion('Clarity (Filler Words)', 15.0),
-            
-            # Engagement (15%)
-            'engagement': Criterion('Engagement & Positivity', 15.0),
-        }
+    Anything left out falls back to the built-in rubric: keyword lists from
+    Settings, SCORING_THRESHOLDS and FEEDBACK_TEMPLATES, table by table and
+    template by template.
+    """
+    
+    def __init__(
+        self,
+        criteria: Optional[Dict[str, Criterion]] = None,
+        thresholds: Optional[Dict] = None,
+        keywords: Optional[Dict] = None,
+        feedback: Optional[Dict] = None,
+        rubric_id: str = DEFAULT_RUBRIC_ID,
+        name: str = "Self-introduction"
+    ):
+        self.rubric_id = rubric_id
+        self.name = name
+        self.criteria = criteria if criteria is not None else default_criteria()
         
+        unknown = [key for key in self.criteria if key not in CRITERION_KEYS]
+        if unknown:
+            raise ValueError(f"Unknown criteria: {', '.join(unknown)}")
+        if not self.criteria:
+            raise ValueError("A rubric needs at least one criterion")
         # Verify total weight = 100%
         total_weight = sum(c.weight for c in self.criteria.values())
-        assert abs(total_weight - 100.0) < 0.01, f"Weights must sum to 100%, got {total_weight}%"
+        if abs(total_weight - 100.0) >= 0.01:
+            raise ValueError(f"Weights must sum to 100%, got {total_weight}%")
+        
+        # Piecewise functions behind each criterion score and the grade, see app.scoring.tables
+        self.thresholds = {**SCORING_THRESHOLDS, **(thresholds or {})}
+        self.keywords = {**default_keywords(), **(keywords or {})}
+        self.feedback = {**FEEDBACK_TEMPLATES, **(feedback or {})}
+        unknown = [key for key in self.keywords if key not in KEYWORD_LISTS]
+        if unknown:
+            raise ValueError(f"Unknown keyword lists: {', '.join(unknown)}")
+    
+    @classmethod
+    def from_dict(cls, data: Dict, rubric_id: str) -> 'SpeechRubric':
+        """
+        A rubric from parsed YAML/JSON
+        
+        Criteria map a key from CRITERION_KEYS to {name, weight, max_score};
+        thresholds, keywords and feedback use the layout of SCORING_THRESHOLDS,
+        default_keywords() and FEEDBACK_TEMPLATES.
+        """
+        if not isinstance(data, dict):
+            raise ValueError("A rubric file must hold a mapping")
+        criteria = None
+        if 'criteria' in data:
+            criteria = {
+                key: Criterion(
+                    name=str(spec.get('name', key)),
+                    weight=float(spec['weight']),
+                    max_score=float(spec.get('max_score', 5.0))
+                )
+                for key, spec in data['criteria'].items()
+            }
+        return cls(
+            criteria=criteria,
+            thresholds=data.get('thresholds'),
+            keywords=data.get('keywords'),
+            feedback=data.get('feedback'),
+            rubric_id=str(data.get('id', rubric_id)),
+            name=str(data.get('name', rubric_id))
+        )
+    
+    def keyword_categories(self) -> Dict[str, List[str]]:
+        """Keyword lists by KeywordMatcher category"""
+        categories = {
+            'salutation': self.keywords['salutation'],
+            'hobbies': self.keywords['hobbies'],
+            'filler': self.keywords['filler']
+        }
+        for category, keywords in self.keywords['personal_info'].items():
+            categories[f'personal_info.{category}'] = keywords
+        return categories
     
     def get_criterion(self, name: str) -> Criterion:
         """Get criterion by name"""
@@ -64,57 +160,233 @@ class SpeechRubric:
         return category_weights.get(category, 0.0)
 
 
-# Scoring thresholds and ranges
+# Scoring tables, compiled by app.scoring.tables. Criterion tables are keyed by
+# criterion and map its metric to a 0-5 score; the rest are the analyzers'
+# 0-100 metric scales and the letter grade of the overall score.
+_max_error_rate = settings.max_grammar_errors_per_100_words
+
 SCORING_THRESHOLDS = {
+    # Greeting detected (1) or not (0)
+    'salutation': {'below': 0.0, 'steps': [{'at_least': 1, 'value': 5.0}]},
+    # Count of the 5 elements (name, age, school, grade, family) mentioned
+    'personal_info': {
+        'below': 0.0,
+        'steps': [
+            {'at_least': 1, 'value': 1.5},
+            {'at_least': 2, 'value': 2.5},
+            {'at_least': 3, 'value': 3.5},
+            {'at_least': 5, 'value': 5.0}
+        ]
+    },
+    # Hobbies mentioned (1) or not (0)
+    'hobbies': {'below': 0.0, 'steps': [{'at_least': 1, 'value': 5.0}]},
+    # Coherence score (0-100)
+    'flow_coherence': {
+        'below': 2.0,
+        'steps': [
+            {'at_least': 50, 'value': 3.0},
+            {'at_least': 70, 'value': 4.0},
+            {'at_least': 85, 'value': 5.0}
+        ]
+    },
+    # Words per minute: optimal band, acceptable either side of it, poor beyond
+    'speech_rate': {
+        'below': 2.0,
+        'steps': [
+            {'at_least': 100, 'value': 3.5},
+            {'at_least': settings.optimal_wpm_min, 'value': 5.0},
+            {'above': settings.optimal_wpm_max, 'value': 3.5},
+            {'above': 180, 'value': 2.0}
+        ]
+    },
+    # Grammar score (0-100)
+    'grammar': {
+        'below': 2.0,
+        'steps': [
+            {'at_least': 60, 'value': 3.0},
+            {'at_least': 75, 'value': 4.0},
+            {'at_least': 90, 'value': 5.0}
+        ]
+    },
+    # Vocabulary score (0-100)
+    'vocabulary': {
+        'below': 2.0,
+        'steps': [
+            {'at_least': 55, 'value': 3.0},
+            {'at_least': 70, 'value': 4.0},
+            {'at_least': 85, 'value': 5.0}
+        ]
+    },
+    # Clarity score (0-100)
+    'clarity': {
+        'below': 2.0,
+        'steps': [
+            {'at_least': 60, 'value': 3.0},
+            {'at_least': 75, 'value': 4.0},
+            {'at_least': 90, 'value': 5.0}
+        ]
+    },
+    # Engagement score (0-100)
+    'engagement': {
+        'below': 2.0,
+        'steps': [
+            {'at_least': 50, 'value': 3.0},
+            {'at_least': 65, 'value': 4.0},
+            {'at_least': 80, 'value': 5.0}
+        ]
+    },
+
+    # Grammar errors per 100 words -> grammar score, dropping 10 a point past the maximum
+    'grammar_score': {
+        'points': [
+            [0, 100.0],
+            [2, 90.0],
+            [_max_error_rate, 90 - (_max_error_rate - 2) * 6.67],
+            [_max_error_rate, 70.0],
+            [_max_error_rate + 7, 0.0]
+        ],
+        'min': 0.0
+    },
+    # Type-token ratio (%) -> vocabulary score
+    'vocabulary_score': {'points': [[0, 0.0], [30, 50.0], [50, 70.0], [70, 90.0], [100, 100.0]]},
+    # Filler words per 100 words -> clarity score
+    'clarity_score': {
+        'points': [[0, 100.0], [2, 90.0], [5, 69.99], [5, 70.0], [12, 0.0]],
+        'min': 0.0
+    },
+    # Mean similarity of adjacent sentences -> coherence score
+    'coherence_score': {'points': [[0, 0.0], [0.2, 50.0], [0.4, 70.0], [0.6, 85.0], [1.0, 100.0]]},
+    # Coherence score -> flow quality label
+    'flow_quality': {
+        'below': 'Needs Improvement',
+        'steps': [
+            {'at_least': 50, 'value': 'Fair'},
+            {'at_least': 70, 'value': 'Good'},
+            {'at_least': 85, 'value': 'Excellent'}
+        ]
+    },
+    # Overall score (0-100) -> letter grade
+    'grade': {
+        'below': 'F',
+        'steps': [
+            {'at_least': 60, 'value': 'D'},
+            {'at_least': 65, 'value': 'C'},
+            {'at_least': 70, 'value': 'C+'},
+            {'at_least': 75, 'value': 'B'},
+            {'at_least': 80, 'value': 'B+'},
+            {'at_least': 85, 'value': 'A'},
+            {'at_least': 90, 'value': 'A+'}
+        ]
+    }
+}
+
+
+# Feedback text per criterion, chosen by the same step tables as scores (values
+# are templates) and filled in with str.format; a plain string is used as is.
+# TEMPLATE_FIELDS lists the fields each template can use.
+FEEDBACK_TEMPLATES = {
+    # Greeting detected (1) or not (0)
     'salutation': {
-        'excellent': 5.0,  # Has appropriate salutation
-        'good': 3.0,       # Has basic greeting
-        'poor': 0.0        # No salutation
+        'below': "Consider starting with a greeting like 'Hello', 'Hi', or 'Good morning' to make your introduction more engaging.",
+        'steps': [
+            {'at_least': 1, 'value': "Great! Used '{salutation_text}' as a greeting. This creates a positive first impression."}
+        ]
     },
+    # Count of personal information elements mentioned
     'personal_info': {
-        'excellent': 5.0,  # All 5 elements (name, age, school, grade, family)
-        'good': 3.0,       # 3-4 elements
-        'fair': 2.0,       # 2 elements
-        'poor': 1.0        # 1 element
+        'below': "Include more personal details to make your introduction complete. Missing: {missing}.",
+        'steps': [
+            {'at_least': 3, 'value': "Good coverage of personal information. Consider adding: {missing}."},
+            {'at_least': 5, 'value': "Excellent! You included all key personal information (name, age, school, grade, family)."}
+        ]
     },
+    # Hobbies mentioned (1) or not (0)
     'hobbies': {
-        'excellent': 5.0,  # Mentions hobbies with details
-        'good': 3.0,       # Mentions hobbies
-        'poor': 0.0        # No hobbies mentioned
+        'below': "Consider mentioning your hobbies or interests to help others get to know you better.",
+        'steps': [
+            {'at_least': 1, 'value': "Great! You mentioned your hobbies and interests, which makes your introduction more personal."}
+        ]
     },
+    # Coherence score (0-100)
     'flow_coherence': {
-        'excellent': 5.0,  # Coherence score >= 85
-        'good': 4.0,       # Coherence score >= 70
-        'fair': 3.0,       # Coherence score >= 50
-        'poor': 2.0        # Coherence score < 50
+        'below': "Work on connecting your ideas more smoothly. Use transition words like 'also', 'moreover', 'furthermore'. ({flow_quality})",
+        'steps': [
+            {'at_least': 50, 'value': "Fair flow. Try using transition words to connect your ideas better. ({flow_quality})"},
+            {'at_least': 70, 'value': "Good flow between ideas. ({flow_quality})"},
+            {'at_least': 85, 'value': "Excellent flow! Your ideas connect smoothly. ({flow_quality})"}
+        ]
     },
+    'flow_coherence_unavailable': "Flow analysis unavailable right now, so this criterion was not scored. Please try again later.",
+    # Words per minute
     'speech_rate': {
-        'optimal': 5.0,    # 120-150 WPM
-        'acceptable': 3.5, # 100-120 or 150-180 WPM
-        'poor': 2.0        # < 100 or > 180 WPM
+        'below': "Speech rate is {wpm} WPM. This is quite slow. Try to speak more fluently.",
+        'steps': [
+            {'at_least': 100, 'value': "Speech rate is {wpm} WPM. Try speaking a bit faster to sound more confident."},
+            {'at_least': 120, 'value': "Perfect speech rate at {wpm} WPM! This is ideal for clear communication."},
+            {'above': 150, 'value': "Speech rate is {wpm} WPM. Try slowing down slightly to ensure clarity."},
+            {'above': 180, 'value': "Speech rate is {wpm} WPM. This is very fast. Slow down to ensure your audience can follow."}
+        ]
     },
+    # Grammar errors per 100 words, or -1 when there are none
     'grammar': {
-        'excellent': 5.0,  # Grammar score >= 90
-        'good': 4.0,       # Grammar score >= 75
-        'fair': 3.0,       # Grammar score >= 60
-        'poor': 2.0        # Grammar score < 60
+        'below': "Perfect! No grammar errors detected.",
+        'steps': [
+            {'at_least': 0, 'value': "Very good! Only {error_count} minor grammar error(s) detected."},
+            {'above': 2, 'value': "Good effort! Found {error_count} grammar error(s). Review basic grammar rules to improve."},
+            {'above': 5, 'value': "Found {error_count} grammar error(s). Focus on improving grammar through practice and review."}
+        ]
     },
+    'grammar_unavailable': "Grammar check unavailable right now, so this criterion was not scored. Please try again later.",
+    # Vocabulary score (0-100)
     'vocabulary': {
-        'excellent': 5.0,  # Vocabulary score >= 85
-        'good': 4.0,       # Vocabulary score >= 70
-        'fair': 3.0,       # Vocabulary score >= 55
-        'poor': 2.0        # Vocabulary score < 55
+        'below': "Work on expanding your vocabulary. Avoid repeating the same words. (TTR: {ttr}%)",
+        'steps': [
+            {'at_least': 55, 'value': "Fair vocabulary. Try using more varied words to enhance your speech. (TTR: {ttr}%)"},
+            {'at_least': 70, 'value': "Good vocabulary variety. (TTR: {ttr}%)"},
+            {'at_least': 85, 'value': "Excellent vocabulary richness! (TTR: {ttr}%)"}
+        ]
     },
+    # Filler words per 100 words, or -1 when there are none
     'clarity': {
-        'excellent': 5.0,  # Clarity score >= 90
-        'good': 4.0,       # Clarity score >= 75
-        'fair': 3.0,       # Clarity score >= 60
-        'poor': 2.0        # Clarity score < 60
+        'below': "Excellent clarity! No filler words detected.",
+        'steps': [
+            {'at_least': 0, 'value': "Very clear! Only {filler_count} filler word(s) detected."},
+            {'above': 2, 'value': "Good clarity. Found {filler_count} filler word(s). Try to reduce 'um', 'uh', 'like', etc."},
+            {'above': 5, 'value': "Found {filler_count} filler word(s). Practice speaking more deliberately to reduce fillers."}
+        ]
     },
+    # Engagement score (0-100)
     'engagement': {
-        'excellent': 5.0,  # Engagement score >= 80
-        'good': 4.0,       # Engagement score >= 65
-        'fair': 3.0,       # Engagement score >= 50
-        'poor': 2.0        # Engagement score < 50
+        'below': "Work on sounding more positive and engaged. Smile while speaking! ({sentiment_label})",
+        'steps': [
+            {'at_least': 50, 'value': "Fair engagement. Try to sound more enthusiastic and positive. ({sentiment_label})"},
+            {'at_least': 65, 'value': "Good positive tone. ({sentiment_label})"},
+            {'at_least': 80, 'value': "Excellent enthusiasm and positivity! ({sentiment_label})"}
+        ]
+    },
+    # Overall score (0-100)
+    'summary': {
+        'below': "Needs improvement. (Grade: {grade}) Review the feedback carefully and practice your introduction.",
+        'steps': [
+            {'at_least': 60, 'value': "Fair performance. (Grade: {grade}) Work on including more details and improving your delivery."},
+            {'at_least': 70, 'value': "Good effort! (Grade: {grade}) Your introduction covers the basics well. Focus on the areas marked for improvement."},
+            {'at_least': 80, 'value': "Great job! (Grade: {grade}) Your introduction is well-structured with good delivery. Minor improvements will make it perfect."},
+            {'at_least': 90, 'value': "Outstanding performance! (Grade: {grade}) Your self-introduction is excellent with strong content, delivery, and engagement."}
+        ]
     }
 }
+
+TEMPLATE_FIELDS = {
+    'salutation': {'salutation_text'},
+    'personal_info': {'missing', 'count'},
+    'hobbies': set(),
+    'flow_coherence': {'coherence_score', 'flow_quality'},
+    'flow_coherence_unavailable': set(),
+    'speech_rate': {'wpm'},
+    'grammar': {'error_count', 'error_rate', 'grammar_score'},
+    'grammar_unavailable': set(),
+    'vocabulary': {'ttr', 'vocabulary_score'},
+    'clarity': {'filler_count', 'filler_rate', 'clarity_score'},
+    'engagement': {'engagement_score', 'sentiment_label'},
+    'summary': {'overall_score', 'grade'}
+}
@@ -2,355 +2,872 @@
 Main scoring engine - orchestrates all analysis and scoring
 """
 
-from typing import Dict, List
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, wait
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
 from app.nlp.preprocessor import TextPreprocessor
-from app.nlp.keyword_detector import KeywordDetector
 from app.nlp.grammar_checker import GrammarChecker
 from app.nlp.sentiment_analyzer import SentimentAnalyzer
-from app.nlp.vocabulary_analyzer import VocabularyAnalyzer
 from app.nlp.semantic_analyzer import SemanticAnalyzer
-from app.scoring.rubric import SpeechRubric, SCORING_THRESHOLDS
+from app.scoring.registry import CompiledRubric, get_rubric_registry
 from app.scoring.feedback_generator import FeedbackGenerator
-from app.models import CriterionScore, DetailedAnalysis, EvaluationResponse
+from app.scoring.cache import create_result_cache, transcript_digest
+from app.scoring.incremental import SentencePartial, create_session_store
+from app.readiness import ReadinessRegistry, WARMUP_TEXT
+from app.artifacts import ArtifactVerifier
+from app.metrics import StageTimer
+from app.models import (
+    CriterionScore, DetailedAnalysis, EvaluationResponse, BatchItemResult, IncrementalEvaluationResponse
+)
 from app.config import settings
 
+# Criteria scored from a model-backed stage, by stage name; the rest come from the light analyses
+STAGE_CRITERIA = {'grammar': 'grammar', 'semantic': 'flow_coherence'}
+
 
 class SpeechScorer:
     """Main scoring orchestrator"""
     
     def __init__(self):
-        # Initialize all analyzers
+        # Initialize the model-backed analyzers, shared by every rubric.
+        # Construction is cheap: models load in warm_up() or on first use
         self.preprocessor = TextPreprocessor()
-        self.keyword_detector = KeywordDetector()
         self.grammar_checker = GrammarChecker()
         self.sentiment_analyzer = SentimentAnalyzer()
-        self.vocabulary_analyzer = VocabularyAnalyzer()
         self.semantic_analyzer = SemanticAnalyzer()
         
-        # Initialize rubric and feedback generator
-        self.rubric = SpeechRubric()
-        self.feedback_generator = FeedbackGenerator()
+        # Rubrics by id, each with its own keyword matcher (shared by keyword and
+        # filler detection), scoring tables and feedback templates
+        self.rubrics = get_rubric_registry()
+        
+        # Cache keyed on the cleaned transcript plus a fingerprint of the rubric and scoring config
+        self.result_cache = create_result_cache([compiled.fingerprint for compiled in self.rubrics.all()])
+        
+        # Per-sentence partials of recent submissions, for incremental re-evaluation
+        self.edit_sessions = create_session_store()
+        
+        # Grammar and embedding stages overlap here instead of running back to back
+        self._stage_executor = ThreadPoolExecutor(
+            max_workers=settings.stage_workers,
+            thread_name_prefix='stage'
+        )
+        
+        self.artifact_verifier = ArtifactVerifier()
+        self.readiness = ReadinessRegistry(['artifacts', 'preprocessor', 'sentiment', 'semantic', 'grammar'])
+    
+    def preload(self):
+        """
+        Load every model without running inference
+        
+        Used by the pre-fork launcher: weights loaded here are shared
+        copy-on-write by the workers, which then run their own warm_up().
+        """
+        for component in (self.preprocessor, self.sentiment_analyzer, self.semantic_analyzer, self.grammar_checker):
+            component.load()
     
-    def evaluate(self, transcript: str) -> EvaluationResponse:
+    def warm_up(self):
+        """Load every model and run one inference each, recording per-component timings"""
+        sentences = [
+            "Hello everyone, my name is Sam.",
+            "I am fifteen years old and I love reading books."
+        ]
+        self.readiness.run_all([
+            ('artifacts', self.artifact_verifier),
+            ('preprocessor', self.preprocessor, lambda: self.preprocessor.process(WARMUP_TEXT)),
+            ('sentiment', self.sentiment_analyzer, lambda: self.sentiment_analyzer.analyze_sentiment(WARMUP_TEXT)),
+            ('semantic', self.semantic_analyzer, lambda: self.semantic_analyzer.analyze_coherence(sentences)),
+            ('grammar', self.grammar_checker, lambda: self.grammar_checker.check_grammar(WARMUP_TEXT, sentences, escalate=True))
+        ])
+    
+    def readiness_components(self) -> List[Dict]:
+        return self.readiness.components()
+    
+    def worker_stats(self) -> Dict:
+        """Counters kept by the process that scores, reported through the pool"""
+        return {
+            'result_cache': self.result_cache.stats() if self.result_cache else {'enabled': False},
+            'embedding_cache': self.semantic_analyzer.embedding_cache_stats(),
+            'grammar_shadow': self.grammar_checker.shadow_stats()
+        }
+    
+    def evaluate(
+        self,
+        transcript: str,
+        timer: StageTimer = None,
+        emit: Optional[Callable[[str, object], None]] = None,
+        rubric_id: Optional[str] = None
+    ) -> EvaluationResponse:
         """
         Main evaluation method
         
         Args:
             transcript: Raw transcript text
+            timer: Collects per-stage durations when given
+            emit: Called as emit('criterion', CriterionScore) for each criterion as
+                soon as it is scored; the light criteria come first, then grammar
+                and coherence in the order their stages finish
+            rubric_id: Rubric to score against, the default when not given;
+                raises UnknownRubricError for an id that isn't loaded
             
         Returns:
             EvaluationResponse with complete scoring and feedback
         """
+        timer = timer or StageTimer()
+        # Looked up once: a reload during this evaluation doesn't change its rubric
+        compiled = self.rubrics.get(rubric_id)
+        # Cleaned once: the cache key and the tokenizer both start from it
+        with timer.span('preprocess'):
+            cleaned_text = self.preprocessor.clean_text(transcript)
+        with timer.span('cache_lookup'):
+            cache_key = self._cache_key(cleaned_text, compiled)
+            cached = self.result_cache.get(cache_key) if cache_key is not None else None
+        if cached is not None:
+            response = EvaluationResponse(**cached)
+            if emit is not None:
+                for criterion in response.criteria_scores:
+                    emit('criterion', criterion)
+            return response
+        
         # Step 1: Preprocess text
-        preprocessed = self.preprocessor.process(transcript)
+        with timer.span('preprocess'):
+            preprocessed = self.preprocessor.process_cleaned(cleaned_text)
         
-        # Step 2: Run all NLP analyses
-        keyword_analysis = self.keyword_detector.get_keywords_summary(
-            preprocessed['cleaned_text'],
-            preprocessed['words']
-        )
+        # Step 2: Start the slow model-backed stages, run the light analyses
+        # while they work, then collect them within their timeouts
+        pending = self._start_stages({
+            'grammar': (
+                self.grammar_checker.check_grammar,
+                preprocessed['cleaned_text'],
+                preprocessed['sentences'],
+                False,
+                preprocessed['tokens']
+            ),
+            'semantic': (
+                self.semantic_analyzer.analyze_coherence,
+                preprocessed['sentences'],
+                compiled.tables
+            )
+        })
+        light_analyses = self._run_light_analyses(compiled, preprocessed, timer)
         
-        grammar_analysis = self.grammar_checker.check_grammar(preprocessed['cleaned_text'])
-        grammar_error_rate = self.grammar_checker.calculate_error_rate(
-            grammar_analysis['error_count'],
-            preprocessed['word_count']
-        )
-        grammar_score = self.grammar_checker.calculate_grammar_score(grammar_error_rate)
+        on_stage_result = None
+        if emit is not None:
+            for criterion in self._score_light_criteria(compiled, preprocessed, light_analyses):
+                emit('criterion', criterion)
+            
+            def on_stage_result(name, result):
+                criterion = self._score_stage_criterion(compiled, name, result, preprocessed)
+                if criterion is not None:
+                    emit('criterion', criterion)
+        stage_results, degraded_stages = self._collect_stages(pending, timer, on_result=on_stage_result)
+        degraded_stages = self._degraded_stages(degraded_stages, stage_results)
         
-        sentiment_analysis = self.sentiment_analyzer.analyze_sentiment(preprocessed['cleaned_text'])
+        with timer.span('scoring'):
+            response = self._build_response(
+                compiled,
+                preprocessed,
+                light_analyses,
+                stage_results['grammar'],
+                stage_results['semantic'],
+                degraded_stages
+            )
         
-        vocabulary_analysis = self.vocabulary_analyzer.analyze(
-            preprocessed['cleaned_text'],
-            preprocessed['words']
-        )
+        if cache_key is not None and not degraded_stages:
+            with timer.span('cache_store'):
+                self.result_cache.set(cache_key, response.model_dump())
+        
+        return response
+    
+    def evaluate_timed(
+        self,
+        transcript: str,
+        rubric_id: Optional[str] = None,
+        emit: Optional[Callable[[str, object], None]] = None
+    ) -> Tuple[EvaluationResponse, Dict[str, float]]:
+        """evaluate() plus its stage durations; plain values, so it works across process pools"""
+        timer = StageTimer()
+        return self.evaluate(transcript, timer, emit, rubric_id), timer.durations
+    
+    def evaluate_many(
+        self,
+        transcripts: List[str],
+        timer: StageTimer = None,
+        rubric_id: Optional[str] = None
+    ) -> List[BatchItemResult]:
+        """
+        Evaluate several transcripts with shared model passes
+        
+        All sentences go through one batched embedding call and the texts are
+        grammar-checked together. A failure only affects its own item.
+        
+        Args:
+            transcripts: Raw transcript texts
+            timer: Collects per-stage durations, summed over the batch, when given
+            rubric_id: Rubric for the whole batch, the default when not given
+            
+        Returns:
+            One BatchItemResult per transcript, in input order
+        """
+        timer = timer or StageTimer()
+        compiled = self.rubrics.get(rubric_id)
+        results = [None] * len(transcripts)
+        cache_keys = [None] * len(transcripts)
+        preprocessed_items = []
+        
+        for index, transcript in enumerate(transcripts):
+            try:
+                with timer.span('preprocess'):
+                    cleaned_text = self.preprocessor.clean_text(transcript)
+                with timer.span('cache_lookup'):
+                    cache_keys[index] = self._cache_key(cleaned_text, compiled)
+                    cached = self.result_cache.get(cache_keys[index]) if cache_keys[index] is not None else None
+                if cached is not None:
+                    results[index] = BatchItemResult(index=index, result=EvaluationResponse(**cached))
+                    continue
+                with timer.span('preprocess'):
+                    preprocessed_items.append((index, self.preprocessor.process_cleaned(cleaned_text)))
+            except Exception as e:
+                results[index] = BatchItemResult(index=index, error=str(e))
+        
+        if not preprocessed_items:
+            return results
+        
+        pending = self._start_stages({
+            'grammar': (
+                self.grammar_checker.check_grammar_many,
+                [preprocessed['cleaned_text'] for _, preprocessed in preprocessed_items],
+                [preprocessed['sentences'] for _, preprocessed in preprocessed_items],
+                [preprocessed['tokens'] for _, preprocessed in preprocessed_items]
+            ),
+            'semantic': (
+                self.semantic_analyzer.analyze_coherence_many,
+                [preprocessed['sentences'] for _, preprocessed in preprocessed_items],
+                compiled.tables
+            )
+        }, items=len(preprocessed_items))
         
-        semantic_analysis = self.semantic_analyzer.analyze_coherence(preprocessed['sentences'])
-        
-        # Step 3: Score each criterion
-        criteria_scores = self._score_all_criteria(
-            preprocessed,
-            keyword_analysis,
-            grammar_analysis,
-            grammar_error_rate,
-            grammar_score,
-            sentiment_analysis,
-            vocabulary_analysis,
-            semantic_analysis
+        light_analyses = []
+        for index, preprocessed in preprocessed_items:
+            try:
+                light_analyses.append(self._run_light_analyses(compiled, preprocessed, timer))
+            except Exception as e:
+                light_analyses.append(None)
+                results[index] = BatchItemResult(index=index, error=str(e))
+        
+        stage_results, degraded_stages = self._collect_stages(pending, timer, items=len(preprocessed_items))
+        with timer.span('scoring'):
+            batch_scores = self._score_batch(compiled, preprocessed_items, light_analyses, stage_results)
+        
+        for position, (index, preprocessed) in enumerate(preprocessed_items):
+            if light_analyses[position] is None:
+                continue
+            try:
+                # A stage can come back unavailable for some items of a batch and not others
+                item_degraded = self._degraded_stages(
+                    degraded_stages,
+                    {name: results_for_stage[position] for name, results_for_stage in stage_results.items()}
+                )
+                with timer.span('scoring'):
+                    response = self._build_response(
+                        compiled,
+                        preprocessed,
+                        light_analyses[position],
+                        stage_results['grammar'][position],
+                        stage_results['semantic'][position],
+                        item_degraded,
+                        batch_scores[position]
+                    )
+                results[index] = BatchItemResult(index=index, result=response)
+                if cache_keys[index] is not None and not item_degraded:
+                    with timer.span('cache_store'):
+                        self.result_cache.set(cache_keys[index], response.model_dump())
+            except Exception as e:
+                results[index] = BatchItemResult(index=index, error=str(e))
+        
+        return results
+    
+    def _score_batch(
+        self,
+        compiled: CompiledRubric,
+        preprocessed_items: List[Tuple[int, Dict]],
+        light_analyses: List,
+        stage_results: Dict
+    ) -> List[Optional[Dict]]:
+        """
+        Table scores of a whole batch from one ScoringTables.score_arrays call
+        
+        An item whose metrics can't be read gets None and is scored on its own
+        by _build_response, which reports its error.
+        """
+        scores = [None] * len(preprocessed_items)
+        positions = []
+        rows = []
+        for position, (_, preprocessed) in enumerate(preprocessed_items):
+            if light_analyses[position] is None:
+                continue
+            try:
+                _, grammar_score = self._grammar_rates(compiled, stage_results['grammar'][position], preprocessed)
+                rows.append(self._criterion_metrics(
+                    preprocessed,
+                    light_analyses[position],
+                    grammar_score,
+                    stage_results['semantic'][position]
+                ))
+                positions.append(position)
+            except Exception:
+                continue
+        if not rows:
+            return scores
+        
+        metrics = {key: np.array([row[key] for row in rows], dtype=float) for key in rows[0]}
+        available = {
+            key: np.array([stage_results[stage][position].get('available', True) for position in positions])
+            for stage, key in STAGE_CRITERIA.items()
+        }
+        columns = {key: values.tolist() for key, values in compiled.tables.score_arrays(metrics, available).items()}
+        for row, position in enumerate(positions):
+            scores[position] = {key: values[row] for key, values in columns.items()}
+        return scores
+    
+    def evaluate_many_timed(
+        self,
+        transcripts: List[str],
+        rubric_id: Optional[str] = None
+    ) -> Tuple[List[BatchItemResult], Dict[str, float]]:
+        timer = StageTimer()
+        return self.evaluate_many(transcripts, timer, rubric_id), timer.durations
+    
+    def evaluate_incremental(
+        self,
+        transcript: str,
+        session_id: Optional[str] = None,
+        timer: StageTimer = None,
+        rubric_id: Optional[str] = None
+    ) -> IncrementalEvaluationResponse:
+        """
+        Evaluate an edited transcript, re-analyzing only sentences the session hasn't seen
+        
+        New sentences are tokenized, keyword-scanned, grammar-checked and embedded
+        on their own; everything else comes from the session's partials. Word
+        totals, keyword and filler hits, grammar matches and coherence are then
+        recombined over the whole transcript. Sentiment is scored on the full
+        text, since VADER is cheap next to the model-backed stages.
+        
+        Grammar is checked per sentence here, so a LanguageTool rule spanning two
+        sentences can't fire, and phrases don't match across a sentence boundary;
+        scores can differ slightly from evaluate() on the same text.
+        
+        Args:
+            transcript: Raw transcript text
+            session_id: Session of earlier submissions; unknown or missing ids
+                start a new session
+            timer: Collects per-stage durations when given
+            rubric_id: Rubric to score against, the default when not given
+        """
+        timer = timer or StageTimer()
+        compiled = self.rubrics.get(rubric_id)
+        with timer.span('preprocess'):
+            cleaned_text = self.preprocessor.clean_text(transcript)
+            sentences = self.preprocessor.tokenize_sentences(cleaned_text)
+        
+        session, _ = self.edit_sessions.get_or_create(session_id)
+        with session.lock:
+            if session.fingerprint != compiled.fingerprint:
+                # Keyword hits are per rubric; a session switching rubrics starts over
+                session.reset(compiled.fingerprint)
+            partials = {}
+            reused = 0
+            with timer.span('keywords'):
+                for sentence in sentences:
+                    if sentence in session.partials:
+                        reused += 1
+                    if sentence in partials:
+                        continue
+                    partial = session.partials.get(sentence)
+                    if partial is None:
+                        words = self.preprocessor.tokenize_words(sentence)
+                        partial = SentencePartial(Counter(words), len(words), compiled.keyword_matcher.scan(words))
+                    partials[sentence] = partial
+            
+            # Partials left without grammar or embeddings by an outage are retried too
+            unchecked = [sentence for sentence, partial in partials.items() if partial.grammar is None]
+            unencoded = [sentence for sentence, partial in partials.items() if partial.embedding is None]
+            pending = self._start_stages({
+                'grammar': (self.grammar_checker.check_sentences, unchecked),
+                'semantic': (self.semantic_analyzer.encode_sentences, unencoded)
+            })
+            with timer.span('sentiment'):
+                sentiment = self.sentiment_analyzer.analyze_sentiment(cleaned_text)
+            stage_results, degraded_stages = self._collect_stages(pending, timer)
+            
+            if 'grammar' in degraded_stages:
+                grammar_analysis = stage_results['grammar']
+            else:
+                for sentence, grammar in zip(unchecked, stage_results['grammar']):
+                    partials[sentence].grammar = grammar
+                grammar_analysis = self.grammar_checker.summarize_sentences(
+                    [partials[sentence].grammar for sentence in sentences]
+                )
+            
+            if 'semantic' in degraded_stages:
+                semantic_analysis = stage_results['semantic']
+            else:
+                embeddings = stage_results['semantic']
+                if embeddings is not None:
+                    for sentence, embedding in zip(unencoded, embeddings):
+                        partials[sentence].embedding = embedding
+                encoded = [partials[sentence].embedding for sentence in sentences]
+                if len(encoded) >= 2 and any(e is None for e in encoded):
+                    # Without a backend nothing is encoded: coherence wasn't measured
+                    semantic_analysis = self.semantic_analyzer.unavailable_result()
+                else:
+                    semantic_analysis = self.semantic_analyzer.coherence_from_embeddings(
+                        np.stack(encoded) if encoded and all(e is not None for e in encoded) else None,
+                        compiled.tables
+                    )
+            
+            session.update(sentences, partials)
+            with timer.span('keywords'):
+                matches = session.merged_keyword_hits(compiled.keyword_matcher.categories)
+                keywords = compiled.keyword_detector.get_keywords_summary(cleaned_text, [], matches)
+            with timer.span('vocabulary'):
+                vocabulary = compiled.vocabulary_analyzer.analyze_counts(
+                    session.word_count,
+                    len(session.word_counts),
+                    matches
+                )
+            word_count = session.word_count
+        
+        preprocessed = {
+            'cleaned_text': cleaned_text,
+            'sentences': sentences,
+            'word_count': word_count,
+            'sentence_count': len(sentences),
+            'wpm': self.preprocessor.estimate_speech_rate(word_count)
+        }
+        degraded_stages = self._degraded_stages(
+            degraded_stages,
+            {'grammar': grammar_analysis, 'semantic': semantic_analysis}
         )
+        with timer.span('scoring'):
+            response = self._build_response(
+                compiled,
+                preprocessed,
+                {'keywords': keywords, 'sentiment': sentiment, 'vocabulary': vocabulary},
+                grammar_analysis,
+                semantic_analysis,
+                degraded_stages
+            )
+        return IncrementalEvaluationResponse(
+            **dict(response),
+            session_id=session.session_id,
+            sentences_reused=reused,
+            sentences_analyzed=len(sentences) - reused
+        )
+    
+    def evaluate_incremental_timed(
+        self,
+        transcript: str,
+        session_id: Optional[str] = None,
+        rubric_id: Optional[str] = None
+    ) -> Tuple[IncrementalEvaluationResponse, Dict[str, float]]:
+        timer = StageTimer()
+        return self.evaluate_incremental(transcript, session_id, timer, rubric_id), timer.durations
+    
+    def _start_stages(self, stages: Dict[str, tuple], items: int = None) -> Dict:
+        """
+        Submit independent analysis stages to the stage pool
         
-        # Step 4: Calculate overall score
-        overall_score = self._calculate_overall_score(criteria_scores)
+        Args:
+            stages: Stage name mapped to (callable, *args)
+            items: Number of transcripts when running batched stages
+        """
+        started = time.monotonic()
+        futures = {}
+        for name, (fn, *args) in stages.items():
+            futures[name] = self._stage_executor.submit(self._timed_stage, fn, *args)
+        return {'started': started, 'futures': futures, 'items': items}
+    
+    @staticmethod
+    def _timed_stage(fn, *args) -> Tuple[object, float]:
+        # Timed inside the stage thread, so the span excludes time queued for a stage worker
+        start = time.perf_counter()
+        result = fn(*args)
+        return result, time.perf_counter() - start
+    
+    def _collect_stages(
+        self,
+        pending: Dict,
+        timer: StageTimer,
+        items: int = None,
+        on_result: Optional[Callable[[str, object], None]] = None
+    ) -> Tuple[Dict, List[str]]:
+        """
+        Wait for submitted stages, each within its own timeout
+        
+        Stages are collected in the order they finish, and on_result (when given)
+        is called with each one's result, or its fallback, as soon as it is known.
+        In partial-result mode a stage that fails or times out is replaced by its
+        unavailable result and reported as degraded; otherwise the error propagates.
+        """
+        deadlines = {
+            name: pending['started'] + settings.stage_timeouts.get(name, settings.stage_timeout_seconds)
+            for name in pending['futures']
+        }
+        results = {}
+        degraded = []
+        while len(results) < len(deadlines):
+            waiting = {name: future for name, future in pending['futures'].items() if name not in results}
+            next_deadline = min(deadlines[name] for name in waiting)
+            wait(waiting.values(), timeout=max(0.0, next_deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+            
+            for name, future in waiting.items():
+                if not future.done() and time.monotonic() < deadlines[name]:
+                    continue
+                try:
+                    results[name], seconds = future.result(timeout=0)
+                    timer.record(name, seconds)
+                except Exception as e:
+                    if not settings.allow_partial_results:
+                        raise
+                    reason = "timed out" if isinstance(e, FuturesTimeoutError) else str(e)
+                    print(f"Stage '{name}' unavailable: {reason}")
+                    fallback = self._stage_fallback(name, reason)
+                    results[name] = fallback if items is None else [fallback] * items
+                    degraded.append(name)
+                if on_result is not None:
+                    on_result(name, results[name])
+        # Reported in submission order, whatever order the stages finished in
+        order = list(pending['futures'])
+        return {name: results[name] for name in order}, [name for name in order if name in degraded]
+    
+    @staticmethod
+    def _degraded_stages(failed: List[str], stage_results: Dict[str, Dict]) -> List[str]:
+        """
+        Stages that failed or timed out, plus those that returned an unavailable
+        result themselves (LanguageTool down, no embedding model)
+        
+        Either way the result is incomplete: it is reported as degraded and is
+        neither cached nor given a result id.
+        """
+        return [
+            name for name, result in stage_results.items()
+            if name in failed or not result.get('available', True)
+        ]
+    
+    def _stage_fallback(self, name: str, reason: str) -> Dict:
+        if name == 'grammar':
+            return self.grammar_checker.unavailable_result(reason)
+        return self.semantic_analyzer.unavailable_result()
+    
+    def _run_light_analyses(self, compiled: CompiledRubric, preprocessed: Dict, timer: StageTimer) -> Dict:
+        """Keyword, sentiment and vocabulary analyses; pure Python and fast"""
+        with timer.span('keywords'):
+            # One pass over the tokens serves both keyword and filler detection
+            matches = compiled.keyword_matcher.scan(preprocessed['words'])
+            keywords = compiled.keyword_detector.get_keywords_summary(
+                preprocessed['cleaned_text'],
+                preprocessed['words'],
+                matches
+            )
+        with timer.span('sentiment'):
+            sentiment = self.sentiment_analyzer.analyze_sentiment(preprocessed['cleaned_text'])
+        with timer.span('vocabulary'):
+            vocabulary = compiled.vocabulary_analyzer.analyze(
+                preprocessed['cleaned_text'],
+                preprocessed['words'],
+                matches
+            )
+        return {
+            'keywords': keywords,
+            'sentiment': sentiment,
+            'vocabulary': vocabulary
+        }
+    
+    def result_id(self, transcript: str, rubric_id: Optional[str] = None) -> str:
+        """
+        Stable id of a transcript's result under a rubric's current scoring config
+        
+        The same cleaned text, rubric and config always give the same id, which
+        names the result in the cache and in /api/results/{id} and its ETag.
+        """
+        fingerprint = self.rubrics.get(rubric_id).fingerprint
+        return f"{fingerprint}-{transcript_digest(self.preprocessor.clean_text(transcript))}"
+    
+    def is_current(self, result_id: str) -> bool:
+        """Whether a result_id was made under a rubric config that is still loaded"""
+        return self.rubrics.find(result_id.partition('-')[0]) is not None
+    
+    def cached_result(self, result_id: str) -> Optional[Dict]:
+        """The cached result for a result_id, or None if it was never stored, expired or its rubric changed"""
+        fingerprint, _, digest = result_id.partition('-')
+        if self.result_cache is None or not self.is_current(result_id):
+            return None
+        return self.result_cache.get(f"{fingerprint}:{digest}")
+    
+    def remember_result(self, result_id: str, result: EvaluationResponse):
+        """
+        Keep a result scored by a pool worker process in this process's cache
+        
+        Workers cache in their own memory, which /api/results/{result_id} in
+        the serving process can't see.
+        """
+        if self.result_cache is None:
+            return
+        fingerprint, _, digest = result_id.partition('-')
+        self.result_cache.remember(f"{fingerprint}:{digest}", result.model_dump())
+    
+    def _cache_key(self, cleaned_text: str, compiled: CompiledRubric):
+        """Cache key for a cleaned transcript, or None when result caching is disabled"""
+        if self.result_cache is None:
+            return None
+        return self.result_cache.make_key(cleaned_text, compiled.fingerprint)
+    
+    def _build_response(
+        self,
+        compiled: CompiledRubric,
+        preprocessed: Dict,
+        light_analyses: Dict,
+        grammar_analysis: Dict,
+        semantic_analysis: Dict,
+        degraded_stages: List[str] = (),
+        scores: Optional[Dict] = None
+    ) -> EvaluationResponse:
+        """
+        Assemble the scored response from the stage results
+        
+        scores, when given, are this result's row of ScoringTables.score_arrays
+        for a batch scored in one pass; otherwise the tables are read here.
+        """
+        keyword_analysis = light_analyses['keywords']
+        sentiment_analysis = light_analyses['sentiment']
+        vocabulary_analysis = light_analyses['vocabulary']
+        
+        grammar_error_rate, grammar_score = self._grammar_rates(compiled, grammar_analysis, preprocessed)
+        if scores is None:
+            scores = self._criterion_scores(
+                compiled,
+                self._criterion_metrics(preprocessed, light_analyses, grammar_score, semantic_analysis)
+            )
+        
+        # Step 3: Score each criterion of the rubric
+        analyses = {
+            **light_analyses,
+            'preprocessed': preprocessed,
+            'grammar': grammar_analysis,
+            'grammar_error_rate': grammar_error_rate,
+            'grammar_score': grammar_score,
+            'semantic': semantic_analysis
+        }
+        criteria_scores = [
+            self._score_criterion(compiled, key, analyses, scores)
+            for key in compiled.rubric.criteria
+        ]
+        
+        # Step 4: Calculate overall score; the grade is read from the reported (rounded) score
+        if 'overall_score' in scores:
+            overall_score = scores['overall_score']
+        else:
+            overall_score = round(self._calculate_overall_score(criteria_scores), 2)
         
         # Step 5: Create detailed analysis
         detailed_analysis = DetailedAnalysis(
             keywords_found=keyword_analysis['keywords_found'],
             keywords_missing=keyword_analysis['keywords_missing'],
             grammar_errors=grammar_analysis['error_count'],
+            grammar_available=grammar_analysis.get('available', True),
             grammar_error_rate=round(grammar_error_rate, 2),
             filler_words_count=vocabulary_analysis['filler_count'],
             filler_word_rate=vocabulary_analysis['filler_rate'],
             sentiment_score=sentiment_analysis['compound'],
             vocabulary_richness=vocabulary_analysis['ttr'],
             speech_rate_wpm=preprocessed['wpm'],
-            salutation_detected=keyword_analysis.get('salutation_text')
+            salutation_detected=keyword_analysis.get('salutation_text'),
+            coherence_metrics=semantic_analysis.get('metrics')
         )
         
         # Step 6: Generate overall summary
-        grade = self._calculate_grade(overall_score)
-        summary = self.feedback_generator.generate_overall_summary(overall_score, grade)
+        grade = scores.get('grade') or compiled.tables['grade'](overall_score)
+        summary = compiled.feedback_generator.generate_overall_summary(overall_score, grade)
         
         # Step 7: Create response
         return EvaluationResponse(
-            overall_score=round(overall_score, 2),
+            overall_score=overall_score,
             grade=grade,
+            rubric_id=compiled.rubric_id,
             word_count=preprocessed['word_count'],
             sentence_count=preprocessed['sentence_count'],
             criteria_scores=criteria_scores,
             detailed_analysis=detailed_analysis,
-            summary=summary
+            summary=summary,
+            degraded_stages=list(degraded_stages)
+        )
+    
+    def _score_light_criteria(self, compiled: CompiledRubric, preprocessed: Dict, light_analyses: Dict) -> List[CriterionScore]:
+        """The rubric's criteria that need only the preprocessing and light analyses"""
+        scores = self._criterion_scores(compiled, self._criterion_metrics(preprocessed, light_analyses))
+        analyses = {**light_analyses, 'preprocessed': preprocessed}
+        return [
+            self._score_criterion(compiled, key, analyses, scores)
+            for key in compiled.rubric.criteria
+            if key not in STAGE_CRITERIA.values()
+        ]
+    
+    def _score_stage_criterion(
+        self,
+        compiled: CompiledRubric,
+        name: str,
+        result: Dict,
+        preprocessed: Dict
+    ) -> Optional[CriterionScore]:
+        """Criterion scored from a model-backed stage's result, or None if the rubric doesn't weight it"""
+        key = STAGE_CRITERIA[name]
+        if key not in compiled.rubric.criteria:
+            return None
+        if name == 'grammar':
+            grammar_error_rate, grammar_score = self._grammar_rates(compiled, result, preprocessed)
+            analyses = {'grammar': result, 'grammar_error_rate': grammar_error_rate, 'grammar_score': grammar_score}
+            scores = self._criterion_scores(compiled, {'grammar': grammar_score})
+        else:
+            analyses = {'semantic': result}
+            scores = self._criterion_scores(compiled, {'flow_coherence': result['coherence_score']})
+        return self._score_criterion(compiled, key, analyses, scores)
+    
+    def _grammar_rates(self, compiled: CompiledRubric, grammar_analysis: Dict, preprocessed: Dict) -> Tuple[float, float]:
+        grammar_error_rate = self.grammar_checker.calculate_error_rate(
+            grammar_analysis['error_count'],
+            preprocessed['word_count']
         )
+        return grammar_error_rate, self.grammar_checker.calculate_grammar_score(grammar_error_rate, compiled.tables)
     
-    def _score_all_criteria(
+    def _criterion_metrics(
         self,
         preprocessed: Dict,
-        keyword_analysis: Dict,
-        grammar_analysis: Dict,
-        grammar_error_rate: float,
-        grammar_score: float,
-        sentiment_analysis: Dict,
-        vocabulary_analysis: Dict,
-        semantic_analysis: Dict
-    ) -> List[CriterionScore]:
-        """Score all criteria and generate feedback"""
-        
-        scores = []
-        
-        # 1. Salutation (5%)
-        salutation_score = 5.0 if keyword_analysis['salutation_found'] else 0.0
-        scores.append(CriterionScore(
-            criterion="Salutation Level",
-            score=salutation_score,
-            max_score=5.0,
-            weight=5.0,
-            feedback=self.feedback_generator.generate_salutation_feedback(
-                keyword_analysis['salutation_found'],
-                keyword_analysis.get('salutation_text', '')
-            )
-        ))
-        
-        # 2. Personal Information (10%)
-        personal_info = keyword_analysis['personal_info']
+        light_analyses: Dict,
+        grammar_score: Optional[float] = None,
+        semantic_analysis: Optional[Dict] = None
+    ) -> Dict[str, float]:
+        """Each criterion's raw metric, the input to its scoring table"""
+        keyword_analysis = light_analyses['keywords']
+        metrics = {
+            'salutation': 1 if keyword_analysis['salutation_found'] else 0,
+            'personal_info': sum(1 for found in keyword_analysis['personal_info'].values() if found),
+            'hobbies': 1 if keyword_analysis['hobbies_found'] else 0,
+            'speech_rate': preprocessed['wpm'],
+            'vocabulary': light_analyses['vocabulary']['vocabulary_score'],
+            'clarity': light_analyses['vocabulary']['clarity_score'],
+            'engagement': light_analyses['sentiment']['engagement_score']
+        }
+        if grammar_score is not None:
+            metrics['grammar'] = grammar_score
+        if semantic_analysis is not None:
+            metrics['flow_coherence'] = semantic_analysis['coherence_score']
+        return metrics
+    
+    def _criterion_scores(self, compiled: CompiledRubric, metrics: Dict[str, float]) -> Dict[str, float]:
+        return {key: compiled.tables[key](metric) for key, metric in metrics.items()}
+    
+    def _score_criterion(self, compiled: CompiledRubric, key: str, analyses: Dict, scores: Dict[str, float]) -> CriterionScore:
+        """One criterion's score and feedback, named and weighted as the rubric says"""
+        criterion = compiled.rubric.get_criterion(key)
+        score, feedback, available = getattr(self, f'_score_{key}')(compiled.feedback_generator, analyses, scores)
+        return CriterionScore(
+            criterion=criterion.name,
+            score=score,
+            max_score=criterion.max_score,
+            weight=criterion.weight,
+            available=available,
+            feedback=feedback
+        )
+    
+    # Per-criterion scorers: (score, feedback, available) from the analyses
+    
+    def _score_salutation(self, feedback: FeedbackGenerator, analyses: Dict, scores: Dict[str, float]):
+        keyword_analysis = analyses['keywords']
+        return scores['salutation'], feedback.generate_salutation_feedback(
+            keyword_analysis['salutation_found'],
+            keyword_analysis.get('salutation_text', '')
+        ), True
+    
+    def _score_personal_info(self, feedback: FeedbackGenerator, analyses: Dict, scores: Dict[str, float]):
+        personal_info = analyses['keywords']['personal_info']
         personal_info_count = sum(1 for found in personal_info.values() if found)
-        personal_info_score = self._score_personal_info(personal_info_count)
-        scores.append(CriterionScore(
-            criterion="Personal Information",
-            score=personal_info_score,
-            max_score=5.0,
-            weight=10.0,
-            feedback=self.feedback_generator.generate_personal_info_feedback(
-                personal_info,
-                personal_info_count
-            )
-        ))
-        
-        # 3. Hobbies/Interests (10%)
-        hobbies_score = 5.0 if keyword_analysis['hobbies_found'] else 0.0
-        scores.append(CriterionScore(
-            criterion="Hobbies/Interests",
-            score=hobbies_score,
-            max_score=5.0,
-            weight=10.0,
-            feedback=self.feedback_generator.generate_hobbies_feedback(
-                keyword_analysis['hobbies_found']
-            )
-        ))
-        
-        # 4. Flow & Coherence (15%)
-        coherence_score = self._score_coherence(semantic_analysis['coherence_score'])
-        scores.append(CriterionScore(
-            criterion="Flow & Coherence",
-            score=coherence_score,
-            max_score=5.0,
-            weight=15.0,
-            feedback=self.feedback_generator.generate_flow_feedback(
+        return scores['personal_info'], feedback.generate_personal_info_feedback(
+            personal_info,
+            personal_info_count
+        ), True
+    
+    def _score_hobbies(self, feedback: FeedbackGenerator, analyses: Dict, scores: Dict[str, float]):
+        return scores['hobbies'], feedback.generate_hobbies_feedback(
+            analyses['keywords']['hobbies_found']
+        ), True
+    
+    def _score_flow_coherence(self, feedback: FeedbackGenerator, analyses: Dict, scores: Dict[str, float]):
+        semantic_analysis = analyses['semantic']
+        if semantic_analysis.get('available', True):
+            return scores['flow_coherence'], feedback.generate_flow_feedback(
                 semantic_analysis['coherence_score'],
                 semantic_analysis['flow_quality']
-            )
-        ))
-        
-        # 5. Speech Rate (10%)
-        speech_rate_score = self._score_speech_rate(preprocessed['wpm'])
-        scores.append(CriterionScore(
-            criterion="Speech Rate",
-            score=speech_rate_score,
-            max_score=5.0,
-            weight=10.0,
-            feedback=self.feedback_generator.generate_speech_rate_feedback(
-                preprocessed['wpm']
-            )
-        ))
-        
-        # 6. Grammar Accuracy (10%)
-        grammar_criterion_score = self._score_grammar(grammar_score)
-        scores.append(CriterionScore(
-            criterion="Grammar Accuracy",
-            score=grammar_criterion_score,
-            max_score=5.0,
-            weight=10.0,
-            feedback=self.feedback_generator.generate_grammar_feedback(
+            ), True
+        return 0.0, feedback.generate_flow_unavailable_feedback(), False
+    
+    def _score_speech_rate(self, feedback: FeedbackGenerator, analyses: Dict, scores: Dict[str, float]):
+        return scores['speech_rate'], feedback.generate_speech_rate_feedback(
+            analyses['preprocessed']['wpm']
+        ), True
+    
+    def _score_grammar(self, feedback: FeedbackGenerator, analyses: Dict, scores: Dict[str, float]):
+        grammar_analysis = analyses['grammar']
+        if grammar_analysis.get('available', True):
+            return scores['grammar'], feedback.generate_grammar_feedback(
                 grammar_analysis['error_count'],
-                grammar_error_rate,
-                grammar_score
-            )
-        ))
-        
-        # 7. Vocabulary Richness (10%)
-        vocabulary_criterion_score = self._score_vocabulary(vocabulary_analysis['vocabulary_score'])
-        scores.append(CriterionScore(
-            criterion="Vocabulary Richness",
-            score=vocabulary_criterion_score,
-            max_score=5.0,
-            weight=10.0,
-            feedback=self.feedback_generator.generate_vocabulary_feedback(
-                vocabulary_analysis['ttr'],
-                vocabulary_analysis['vocabulary_score']
-            )
-        ))
-        
-        # 8. Clarity (15%)
-        clarity_criterion_score = self._score_clarity(vocabulary_analysis['clarity_score'])
-        scores.append(CriterionScore(
-            criterion="Clarity (Filler Words)",
-            score=clarity_criterion_score,
-            max_score=5.0,
-            weight=15.0,
-            feedback=self.feedback_generator.generate_clarity_feedback(
-                vocabulary_analysis['filler_count'],
-                vocabulary_analysis['filler_rate'],
-                vocabulary_analysis['clarity_score']
-            )
-        ))
-        
-        # 9. Engagement (15%)
-        engagement_criterion_score = self._score_engagement(sentiment_analysis['engagement_score'])
-        scores.append(CriterionScore(
-            criterion="Engagement & Positivity",
-            score=engagement_criterion_score,
-            max_score=5.0,
-            weight=15.0,
-            feedback=self.feedback_generator.generate_engagement_feedback(
-                sentiment_analysis['engagement_score'],
-                sentiment_analysis['sentiment_label']
-            )
-        ))
-        
-        return scores
+                analyses['grammar_error_rate'],
+                analyses['grammar_score']
+            ), True
+        # Not scored rather than assumed perfect; excluded from the overall score
+        return 0.0, feedback.generate_grammar_unavailable_feedback(), False
     
-    def _score_personal_info(self, count: int) -> float:
-        """Score personal information based on count"""
-        if count >= 5:
-            return 5.0
-        elif count >= 3:
-            return 3.5
-        elif count >= 2:
-            return 2.5
-        elif count >= 1:
-            return 1.5
-        else:
-            return 0.0
+    def _score_vocabulary(self, feedback: FeedbackGenerator, analyses: Dict, scores: Dict[str, float]):
+        vocabulary_analysis = analyses['vocabulary']
+        return scores['vocabulary'], feedback.generate_vocabulary_feedback(
+            vocabulary_analysis['ttr'],
+            vocabulary_analysis['vocabulary_score']
+        ), True
     
-    def _score_coherence(self, coherence_score: float) -> float:
-        """Convert coherence score (0-100) to criterion score (0-5)"""
-        if coherence_score >= 85:
-            return 5.0
-        elif coherence_score >= 70:
-            return 4.0
-        elif coherence_score >= 50:
-            return 3.0
-        else:
-            return 2.0
-    
-    def _score_speech_rate(self, wpm: float) -> float:
-        """Score speech rate based on WPM"""
-        if settings.optimal_wpm_min <= wpm <= settings.optimal_wpm_max:
-            return 5.0
-        elif 100 <= wpm < settings.optimal_wpm_min or settings.optimal_wpm_max < wpm <= 180:
-            return 3.5
-        else:
-            return 2.0
-    
-    def _score_grammar(self, grammar_score: float) -> float:
-        """Convert grammar score (0-100) to criterion score (0-5)"""
-        if grammar_score >= 90:
-            return 5.0
-        elif grammar_score >= 75:
-            return 4.0
-        elif grammar_score >= 60:
-            return 3.0
-        else:
-            return 2.0
-    
-    def _score_vocabulary(self, vocab_score: float) -> float:
-        """Convert vocabulary score (0-100) to criterion score (0-5)"""
-        if vocab_score >= 85:
-            return 5.0
-        elif vocab_score >= 70:
-            return 4.0
-        elif vocab_score >= 55:
-            return 3.0
-        else:
-            return 2.0
-    
-    def _score_clarity(self, clarity_score: float) -> float:
-        """Convert clarity score (0-100) to criterion score (0-5)"""
-        if clarity_score >= 90:
-            return 5.0
-        elif clarity_score >= 75:
-            return 4.0
-        elif clarity_score >= 60:
-            return 3.0
-        else:
-            return 2.0
-    
-    def _score_engagement(self, engagement_score: float) -> float:
-        """Convert engagement score (0-100) to criterion score (0-5)"""
-        if engagement_score >= 80:
-            return 5.0
-        elif engagement_score >= 65:
-            return 4.0
-        elif engagement_score >= 50:
-            return 3.0
-        else:
-            return 2.0
+    def _score_clarity(self, feedback: FeedbackGenerator, analyses: Dict, scores: Dict[str, float]):
+        vocabulary_analysis = analyses['vocabulary']
+        return scores['clarity'], feedback.generate_clarity_feedback(
+            vocabulary_analysis['filler_count'],
+            vocabulary_analysis['filler_rate'],
+            vocabulary_analysis['clarity_score']
+        ), True
+    
+    def _score_engagement(self, feedback: FeedbackGenerator, analyses: Dict, scores: Dict[str, float]):
+        sentiment_analysis = analyses['sentiment']
+        return scores['engagement'], feedback.generate_engagement_feedback(
+            sentiment_analysis['engagement_score'],
+            sentiment_analysis['sentiment_label']
+        ), True
     
     def _calculate_overall_score(self, criteria_scores: List[CriterionScore]) -> float:
-        """Calculate weighted overall score (0-100)"""
+        """Calculate weighted overall score (0-100) over the criteria that could be scored"""
         total_score = 0.0
+        total_weight = 0.0
         
         for criterion in criteria_scores:
+            if not criterion.available:
+                continue
             # Convert criterion score (0-5) to percentage (0-100)
             percentage = (criterion.score / criterion.max_score) * 100
             # Apply weight
             weighted_score = percentage * (criterion.weight / 100)
             total_score += weighted_score
+            total_weight += criterion.weight
         
-        return total_score
-    
-    def _calculate_grade(self, overall_score: float) -> str:
-        """Calculate letter grade"""
-        if overall_score >= 90:
-            return 'A+'
-        elif overall_score >= 85:
-            return 'A'
-        elif overall_score >= 80:
-            return 'B+'
-        elif overall_score >= 75:
-            return 'B'
-        elif overall_score >= 70:
-            return 'C+'
-        elif overall_score >= 65:
-            return 'C'
-        elif overall_score >= 60:
-            return 'D'
-        else:
-            return 'F'
+        if total_weight == 0:
+            return 0.0
+        
+        # Re-normalize when an unavailable criterion dropped out of the total
+        return total_score / (total_weight / 100)
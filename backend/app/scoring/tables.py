@@ -0,0 +1,226 @@
+"""
+Compiled scoring tables
+
+Every threshold ladder and linear scale in scoring is a piecewise function of
+one raw metric, described as data in the rubric (see SCORING_THRESHOLDS) and
+compiled once into sorted breakpoints. A lookup is a bisect for one value or a
+NumPy searchsorted for a whole array, so a batch converts its metrics with one
+call per table instead of a Python ladder per item.
+
+Two spec forms:
+
+    {'below': 2.0, 'steps': [{'at_least': 50, 'value': 3.0}, {'above': 80, 'value': 5.0}]}
+        A step function: the value of the last step the metric reaches, or
+        'below' under the first. Values may be labels (letter grades).
+
+    {'points': [[0, 100], [2, 90], [5, 70], [5, 69], [12, 0]], 'min': 0}
+        Linear interpolation between points, extended past the ends along the
+        end segments and clamped to 'min'/'max'. A repeated x is a jump: the
+        earlier point's value applies at x itself, the later one just above.
+"""
+
+import math
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Dict, List, Optional, Union
+import numpy as np
+
+Value = Union[float, str]
+
+
+class ScoringTable:
+    """
+    A compiled piecewise function
+
+    Segment i covers metrics from bounds[i - 1] (inclusive) up to bounds[i] and
+    is the line values[i] + slopes[i] * (metric - starts[i]).
+    """
+
+    def __init__(
+        self,
+        bounds: List[float],
+        values: List[Value],
+        starts: Optional[List[float]] = None,
+        slopes: Optional[List[float]] = None,
+        minimum: Optional[float] = None,
+        maximum: Optional[float] = None
+    ):
+        self.bounds = bounds
+        self.values = values
+        self.starts = starts or [0.0] * len(values)
+        self.slopes = slopes or [0.0] * len(values)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.linear = any(self.slopes)
+
+        self._bounds = np.asarray(bounds, dtype=float)
+        self._values = np.asarray(values, dtype=object if self.labels else float)
+        self._starts = np.asarray(self.starts, dtype=float)
+        self._slopes = np.asarray(self.slopes, dtype=float)
+
+    @property
+    def labels(self) -> bool:
+        return any(isinstance(value, str) for value in self.values)
+
+    def __call__(self, metric: float) -> Value:
+        index = bisect_right(self.bounds, metric)
+        if not self.linear:
+            return self.values[index]
+        value = self.values[index] + self.slopes[index] * (metric - self.starts[index])
+        if self.minimum is not None and value < self.minimum:
+            return self.minimum
+        if self.maximum is not None and value > self.maximum:
+            return self.maximum
+        return value
+
+    def apply(self, metrics) -> np.ndarray:
+        """The table over an array of metrics, element for element the same as calling it"""
+        metrics = np.asarray(metrics, dtype=float)
+        indices = np.searchsorted(self._bounds, metrics, side='right')
+        if not self.linear:
+            return self._values[indices]
+        values = self._values[indices] + self._slopes[indices] * (metrics - self._starts[indices])
+        if self.minimum is not None or self.maximum is not None:
+            values = np.clip(values, self.minimum, self.maximum)
+        return values
+
+
+def _just_above(bound: float) -> float:
+    # Bisecting on the next float up puts the bound itself in the segment below
+    return math.nextafter(float(bound), math.inf)
+
+
+def _compile_steps(spec: Dict) -> ScoringTable:
+    bounds = []
+    values = [spec['below']]
+    for step in spec['steps']:
+        if 'at_least' in step:
+            bound = float(step['at_least'])
+        elif 'above' in step:
+            bound = _just_above(step['above'])
+        else:
+            raise ValueError("each step needs 'at_least' or 'above'")
+        if bounds and bound <= bounds[-1]:
+            raise ValueError("steps must be in ascending order")
+        bounds.append(bound)
+        values.append(step['value'])
+    return ScoringTable(bounds, values)
+
+
+def _compile_points(spec: Dict) -> ScoringTable:
+    points = [(float(x), float(y)) for x, y in spec['points']]
+    if len(points) < 2 or any(b[0] < a[0] for a, b in zip(points, points[1:])):
+        raise ValueError("points need at least two entries in ascending order of x")
+    if all(a[0] == b[0] for a, b in zip(points, points[1:])):
+        raise ValueError("points must span a range of x")
+
+    bounds, values, starts, slopes = [], [], [], []
+    # Set when a jump was just crossed: where the next segment starts
+    jump = None
+    for (x0, y0), (x1, y1) in zip(points, points[1:]):
+        if x0 == x1:
+            if not values:
+                # Flat below a leading jump
+                values.append(y0)
+                starts.append(x0)
+                slopes.append(0.0)
+            jump = _just_above(x0)
+            continue
+        if values:
+            bounds.append(jump if jump is not None else x0)
+        values.append(y0)
+        starts.append(x0)
+        slopes.append((y1 - y0) / (x1 - x0))
+        jump = None
+    if jump is not None:
+        # Flat above a trailing jump
+        bounds.append(jump)
+        values.append(points[-1][1])
+        starts.append(points[-1][0])
+        slopes.append(0.0)
+
+    return ScoringTable(bounds, values, starts, slopes, spec.get('min'), spec.get('max'))
+
+
+def compile_table(spec: Dict) -> ScoringTable:
+    if 'steps' in spec:
+        return _compile_steps(spec)
+    if 'points' in spec:
+        return _compile_points(spec)
+    raise ValueError("a table needs 'steps' or 'points'")
+
+
+class ScoringTables:
+    """
+    A rubric's tables, compiled once
+
+    Criterion tables are named by their rubric key and turn that criterion's
+    metric into its score; the 'grade' table turns the overall score into a
+    letter grade. The rest are the analyzers' metric scales.
+    """
+
+    def __init__(self, rubric):
+        self.criteria = rubric.get_all_criteria()
+        self.tables: Dict[str, ScoringTable] = {}
+        for name, spec in rubric.thresholds.items():
+            try:
+                self.tables[name] = compile_table(spec)
+            except (KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"Scoring table '{name}': {e}") from e
+        missing = [key for key in [*self.criteria, 'grade'] if key not in self.tables]
+        if missing:
+            raise ValueError(f"Rubric has no scoring table for: {', '.join(missing)}")
+
+    def __getitem__(self, name: str) -> ScoringTable:
+        return self.tables[name]
+
+    def score_arrays(self, metrics: Dict[str, np.ndarray], available: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, np.ndarray]:
+        """
+        Criterion scores, overall score and grade for whole arrays of metrics
+
+        Args:
+            metrics: Each criterion's metric, one array entry per result
+            available: Per criterion, which results it could be scored for;
+                unavailable criteria drop out of the overall score as in
+                SpeechScorer._calculate_overall_score
+
+        Returns:
+            An array per criterion key, plus 'overall_score' (rounded to two
+            places, as reported) and 'grade'
+        """
+        available = available or {}
+        scores = {key: self.tables[key].apply(metrics[key]) for key in self.criteria}
+
+        # Summed in rubric order with the scorer's arithmetic, so every
+        # element matches the one-result path exactly
+        total_score = 0.0
+        total_weight = 0.0
+        for key, criterion in self.criteria.items():
+            weighted = (scores[key] / criterion.max_score) * 100 * (criterion.weight / 100)
+            mask = available.get(key)
+            if mask is None:
+                total_score = total_score + weighted
+                total_weight = total_weight + criterion.weight
+            else:
+                total_score = total_score + np.where(mask, weighted, 0.0)
+                total_weight = total_weight + np.where(mask, criterion.weight, 0.0)
+
+        total_weight = np.broadcast_to(total_weight, np.shape(total_score))
+        overall = np.divide(
+            total_score,
+            total_weight / 100,
+            out=np.zeros(np.shape(total_score)),
+            where=total_weight != 0
+        )
+        # round() rather than np.round, which can land one cent off Python's
+        # correctly rounded result and with it change a grade
+        scores['overall_score'] = np.array([round(value, 2) for value in np.ravel(overall).tolist()]).reshape(np.shape(overall))
+        scores['grade'] = self.tables['grade'].apply(scores['overall_score'])
+        return scores
+
+
+@lru_cache(maxsize=1)
+def get_scoring_tables() -> ScoringTables:
+    """The default rubric's tables, shared by the scorer and the analyzers"""
+    from app.scoring.rubric import SpeechRubric
+    return ScoringTables(SpeechRubric())
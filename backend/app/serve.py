@@ -0,0 +1,191 @@
+"""
+Pre-fork multi-worker launcher
+
+Running `uvicorn --workers N` makes every worker import the app and load its own
+sentence transformer, VADER lexicon and LanguageTool JVM, so memory grows by a
+full model set per worker. This launcher loads the read-only models once in a
+master process, freezes the heap, binds the socket and forks the workers, which
+share the model pages copy-on-write. LanguageTool runs as one sidecar server
+that every worker talks to over HTTP.
+
+    python -m app.serve --workers 4 --port 8000
+"""
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, Optional
+import requests
+from app.config import settings
+from app.artifacts import use_languagetool_dir
+
+
+def start_languagetool_sidecar(port: int, timeout: float = 60.0) -> subprocess.Popen:
+    """Start a LanguageTool HTTP server and wait until it answers"""
+    from language_tool_python.utils import get_server_cmd
+
+    use_languagetool_dir()
+    process = subprocess.Popen(
+        get_server_cmd(port),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    url = f"http://127.0.0.1:{port}/v2/languages"
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"LanguageTool sidecar exited with code {process.returncode}")
+        try:
+            if requests.get(url, timeout=1.0).ok:
+                return process
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError(f"LanguageTool sidecar did not start within {timeout:.0f}s")
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(app, sock: socket.socket, log_level: str):
+    import uvicorn
+
+    config = uvicorn.Config(app, log_level=log_level, timeout_keep_alive=5)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class PreforkServer:
+    """Master process: loads models, forks workers and restarts any that die"""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        workers: int,
+        preload: bool = True,
+        sidecar: bool = True,
+        log_level: str = 'info'
+    ):
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.preload = preload
+        self.sidecar = sidecar
+        self.log_level = log_level
+
+        self.children: Dict[int, int] = {}
+        self.sidecar_process: Optional[subprocess.Popen] = None
+        self.stopping = False
+
+    def setup(self):
+        if self.sidecar and settings.grammar_mode != 'rules' and not settings.grammar_server_url:
+            print(f"Starting LanguageTool sidecar on port {settings.grammar_sidecar_port}")
+            try:
+                self.sidecar_process = start_languagetool_sidecar(settings.grammar_sidecar_port)
+                # Workers read this when their GrammarChecker connects
+                settings.grammar_server_url = f"http://127.0.0.1:{settings.grammar_sidecar_port}"
+            except Exception as e:
+                print(f"Warning: Could not start LanguageTool sidecar: {e}")
+
+        # Importing the app builds the scorer; construction is cheap and loads nothing
+        from app.main import app
+        from app.api.routes import scorer
+        self.app = app
+
+        if self.preload:
+            start = time.perf_counter()
+            scorer.preload()
+            print(f"Models loaded in master in {time.perf_counter() - start:.1f}s")
+
+        # Move everything allocated so far out of the collector's reach, so the
+        # workers' GC passes don't write to (and un-share) the model pages
+        gc.collect()
+        gc.freeze()
+
+        self.sock = bind_socket(self.host, self.port)
+
+    def spawn(self, index: int):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            try:
+                run_worker(self.app, self.sock, self.log_level)
+            finally:
+                os._exit(0)
+        self.children[pid] = index
+
+    def stop(self, signum=None, frame=None):
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self):
+        self.setup()
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+
+        for index in range(self.workers):
+            self.spawn(index)
+        print(f"Serving on http://{self.host}:{self.port} with {self.workers} workers (master pid {os.getpid()})")
+
+        try:
+            while self.children:
+                try:
+                    pid, status = os.wait()
+                except ChildProcessError:
+                    break
+                except InterruptedError:
+                    continue
+                index = self.children.pop(pid, None)
+                if index is not None and not self.stopping:
+                    print(f"Worker {pid} exited with status {status}, restarting")
+                    self.spawn(index)
+        finally:
+            if self.sidecar_process is not None:
+                self.sidecar_process.terminate()
+                self.sidecar_process.wait(timeout=10)
+            self.sock.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the API with models shared across pre-forked workers")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', 8000)))
+    parser.add_argument('--workers', type=int, default=settings.serve_workers)
+    parser.add_argument('--log-level', default='info')
+    parser.add_argument('--no-preload', action='store_true', help="Load models in each worker instead of the master")
+    parser.add_argument('--no-sidecar', action='store_true', help="Let each worker start its own LanguageTool")
+    args = parser.parse_args(argv)
+
+    if sys.platform == 'win32':
+        parser.error("the pre-fork launcher needs os.fork; use 'uvicorn app.main:app' on Windows")
+
+    PreforkServer(
+        args.host,
+        args.port,
+        args.workers,
+        preload=not args.no_preload,
+        sidecar=not args.no_sidecar,
+        log_level=args.log_level
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Run the benchmark suites and write one JSON report
+
+Run from backend/:
+    python -m benchmarks --output results.json
+    python -m benchmarks --suites pipeline,load --size 50
+    python -m benchmarks.compare base.json results.json
+"""
+
+import argparse
+from benchmarks.report import configure_settings, environment, write_report
+
+SUITES = ('analyzers', 'pipeline', 'serialization', 'load')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the evaluation pipeline benchmarks")
+    parser.add_argument('--suites', default=','.join(SUITES))
+    parser.add_argument('--size', type=int, default=100, help="Transcripts in the synthetic corpus")
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--repeat', type=int, default=3, help="Passes over the corpus for in-process suites")
+    parser.add_argument('--requests', type=int, default=200, help="Requests per concurrency level in the load test")
+    parser.add_argument('--concurrency', default='1,4,16')
+    parser.add_argument('--caches', action='store_true', help="Keep the result and embedding caches on")
+    parser.add_argument('--output', default=None, help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    configure_settings(caches=args.caches)
+
+    from benchmarks.corpus import generate_corpus
+
+    corpus = generate_corpus(args.size, args.seed)
+    report = {
+        'environment': environment(),
+        'corpus': {
+            'size': len(corpus),
+            'seed': args.seed,
+            'min_chars': min(len(t) for t in corpus),
+            'max_chars': max(len(t) for t in corpus)
+        }
+    }
+
+    suites = [suite for suite in args.suites.split(',') if suite]
+    if 'analyzers' in suites:
+        from benchmarks import analyzers
+        report['analyzers'] = analyzers.run(corpus, args.repeat)
+    if 'pipeline' in suites:
+        from benchmarks import pipeline
+        report['pipeline'] = pipeline.run(corpus, args.repeat)
+    if 'serialization' in suites:
+        from benchmarks import serialization
+        report['serialization'] = serialization.run(corpus, args.repeat)
+    if 'load' in suites:
+        from benchmarks import load
+        report['load'] = load.run(corpus, args.requests, [int(c) for c in args.concurrency.split(',')])
+
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Micro-benchmarks for each analyzer in app/nlp, grouped by transcript length
+
+Run from backend/:  python -m benchmarks.analyzers [--size N] [--repeat N]
+"""
+
+import argparse
+from typing import Dict, List
+from benchmarks.corpus import generate_corpus, group_by_length
+from benchmarks.report import configure_settings, environment, summarize, time_each, write_report
+
+
+def analyzer_cases(scorer) -> Dict:
+    """Analyzer name mapped to a callable taking one preprocessed transcript"""
+    rubric = scorer.rubrics.get()
+    matcher = rubric.keyword_matcher
+
+    def keywords(p):
+        matches = matcher.scan(p['words'])
+        return rubric.keyword_detector.get_keywords_summary(p['cleaned_text'], p['words'], matches)
+
+    def vocabulary(p):
+        return rubric.vocabulary_analyzer.analyze(p['cleaned_text'], p['words'], matcher.scan(p['words']))
+
+    return {
+        'keywords': keywords,
+        'vocabulary': vocabulary,
+        'sentiment': lambda p: scorer.sentiment_analyzer.analyze_sentiment(p['cleaned_text']),
+        'grammar_rules': lambda p: scorer.grammar_checker.rules.check(p['cleaned_text'], tokens=p['tokens']),
+        'grammar': lambda p: scorer.grammar_checker.check_grammar(p['cleaned_text'], p['sentences'], tokens=p['tokens']),
+        'semantic': lambda p: scorer.semantic_analyzer.analyze_coherence(p['sentences'])
+    }
+
+
+def run(corpus: List[str], repeat: int = 3) -> Dict:
+    from app.scoring.scorer import SpeechScorer
+
+    scorer = SpeechScorer()
+    scorer.warm_up()
+    groups = group_by_length(corpus)
+
+    results = {'preprocess': {}}
+    for bucket, texts in groups.items():
+        results['preprocess'][bucket] = summarize(time_each(scorer.preprocessor.process, texts, repeat))
+
+    preprocessed = {bucket: [scorer.preprocessor.process(t) for t in texts] for bucket, texts in groups.items()}
+    for name, fn in analyzer_cases(scorer).items():
+        results[name] = {
+            bucket: summarize(time_each(fn, items, repeat))
+            for bucket, items in preprocessed.items()
+        }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--size', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--caches', action='store_true', help="Keep the embedding cache on")
+    parser.add_argument('--output', default=None)
+    args = parser.parse_args()
+
+    configure_settings(caches=args.caches)
+    write_report({
+        'environment': environment(),
+        'analyzers': run(generate_corpus(args.size, args.seed), args.repeat)
+    }, args.output)
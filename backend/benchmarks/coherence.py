@@ -0,0 +1,56 @@
+"""
+Micro-benchmark: per-pair loop vs vectorized coherence similarity
+
+Run from backend/:  python -m benchmarks.coherence
+"""
+
+import time
+import numpy as np
+from app.nlp.semantic_analyzer import adjacent_similarities, coherence_matrix_metrics
+
+EMBEDDING_DIM = 384  # all-MiniLM-L6-v2
+SENTENCE_COUNTS = [5, 10, 25, 50, 100, 200]
+
+
+def loop_similarities(embeddings):
+    """The previous implementation: np.dot plus two norms per sentence pair"""
+    similarities = []
+    for i in range(len(embeddings) - 1):
+        vec1, vec2 = embeddings[i], embeddings[i + 1]
+        norm1 = np.linalg.norm(vec1)
+        norm2 = np.linalg.norm(vec2)
+        similarities.append(np.dot(vec1, vec2) / (norm1 * norm2) if norm1 and norm2 else 0.0)
+    return np.mean(similarities)
+
+
+def time_call(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def run(repeat: int = 500):
+    rng = np.random.default_rng(0)
+    rows = []
+    for count in SENTENCE_COUNTS:
+        embeddings = rng.standard_normal((count, EMBEDDING_DIM)).astype(np.float32)
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+        
+        similarities = adjacent_similarities(embeddings)
+        assert abs(loop_similarities(embeddings) - similarities.mean()) < 1e-5
+        
+        rows.append({
+            'sentences': count,
+            'loop_us': round(time_call(lambda: loop_similarities(embeddings), repeat), 2),
+            'vectorized_us': round(time_call(lambda: adjacent_similarities(embeddings).mean(), repeat), 2),
+            'full_matrix_us': round(time_call(lambda: coherence_matrix_metrics(embeddings, similarities), repeat), 2)
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    print(f"{'sentences':>10} {'loop (us)':>12} {'vectorized (us)':>16} {'full matrix (us)':>17} {'speedup':>8}")
+    for row in run():
+        speedup = row['loop_us'] / row['vectorized_us']
+        print(f"{row['sentences']:>10} {row['loop_us']:>12} {row['vectorized_us']:>16} {row['full_matrix_us']:>17} {speedup:>7.1f}x")
@@ -0,0 +1,62 @@
+"""
+Compare two benchmark reports and flag latency regressions
+
+Walks both reports for matching latency summaries (anything with p50_ms) and
+prints the relative change. Exits non-zero when a p95 grows by more than
+--threshold, so it can gate CI.
+
+Run from backend/:  python -m benchmarks.compare base.json new.json [--threshold 0.1]
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, Iterator, Tuple
+
+
+def summaries(report: Dict, path: str = '') -> Iterator[Tuple[str, Dict]]:
+    if isinstance(report, dict):
+        if 'p50_ms' in report:
+            yield path, report
+            return
+        for key, value in report.items():
+            if key != 'environment':
+                yield from summaries(value, f"{path}.{key}" if path else key)
+    elif isinstance(report, list):
+        for index, value in enumerate(report):
+            label = f"c{value['concurrency']}" if isinstance(value, dict) and 'concurrency' in value else str(index)
+            yield from summaries(value, f"{path}[{label}]")
+
+
+def compare(base: Dict, new: Dict, threshold: float) -> bool:
+    base_summaries = dict(summaries(base))
+    regressed = False
+    print(f"{'benchmark':<50} {'p50 base':>10} {'p50 new':>10} {'p95 base':>10} {'p95 new':>10} {'change':>8}")
+    for path, summary in summaries(new):
+        old = base_summaries.get(path)
+        if old is None or not old['p95_ms']:
+            continue
+        change = summary['p95_ms'] / old['p95_ms'] - 1
+        flag = ''
+        if change > threshold:
+            flag = '  REGRESSION'
+            regressed = True
+        print(
+            f"{path:<50} {old['p50_ms']:>10.3f} {summary['p50_ms']:>10.3f} "
+            f"{old['p95_ms']:>10.3f} {summary['p95_ms']:>10.3f} {change:>+8.1%}{flag}"
+        )
+    return regressed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('base')
+    parser.add_argument('new')
+    parser.add_argument('--threshold', type=float, default=0.10, help="Allowed relative p95 increase")
+    args = parser.parse_args()
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    sys.exit(1 if compare(base, new, args.threshold) else 0)
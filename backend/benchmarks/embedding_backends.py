@@ -0,0 +1,119 @@
+"""
+Compare embedding backends: load time, encode latency, RSS and agreement
+
+Each backend runs in its own process so resident memory is measured in isolation.
+Export the ONNX models first with: python -m app.nlp.embedding_backends export
+
+Run from backend/:  python -m benchmarks.embedding_backends [--threads N]
+"""
+
+import argparse
+import json
+import multiprocessing
+import resource
+import statistics
+import time
+
+SAMPLE_TRANSCRIPTS = [
+    [
+        "Hello everyone, my name is Sarah Johnson.",
+        "I am 15 years old and I study at Lincoln High School in grade 10.",
+        "I live with my parents and my younger brother.",
+        "I love reading books, especially mystery novels.",
+        "Thank you for listening to my introduction!"
+    ],
+    [
+        "Good morning.",
+        "I am called Ravi and I study in class 7.",
+        "My hobby is dancing and singing.",
+        "Cricket is played with a bat and a ball.",
+        "The weather today is quite cold."
+    ],
+    [
+        "Hi, I'm Aisha.",
+        "My favourite subject is science because I like experiments.",
+        "On weekends I help my mother in the garden.",
+        "We grow tomatoes, beans and marigolds.",
+        "I want to become a botanist one day."
+    ]
+]
+
+
+def current_rss_mb() -> float:
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is kilobytes on Linux; peak rather than current elsewhere
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure_backend(backend_name: str, threads: int, repeat: int, queue):
+    from app.config import settings
+    from app.nlp.embedding_backends import create_embedding_backend
+    from app.nlp.semantic_analyzer import adjacent_similarities
+
+    settings.embedding_threads = threads
+    try:
+        rss_before = current_rss_mb()
+        start = time.perf_counter()
+        backend = create_embedding_backend(backend_name)
+        load_seconds = time.perf_counter() - start
+
+        avg_similarities = []
+        for sentences in SAMPLE_TRANSCRIPTS:
+            avg_similarities.append(float(adjacent_similarities(backend.encode(sentences)).mean()))
+
+        latencies = []
+        for _ in range(repeat):
+            for sentences in SAMPLE_TRANSCRIPTS:
+                start = time.perf_counter()
+                backend.encode(sentences)
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        queue.put({
+            'backend': backend_name,
+            'load_seconds': round(load_seconds, 2),
+            'rss_mb': round(current_rss_mb(), 1),
+            'model_rss_mb': round(current_rss_mb() - rss_before, 1),
+            'encode_ms_p50': round(statistics.median(latencies), 2),
+            'encode_ms_mean': round(statistics.mean(latencies), 2),
+            'avg_similarity': [round(value, 4) for value in avg_similarities]
+        })
+    except Exception as e:
+        queue.put({'backend': backend_name, 'error': str(e)})
+
+
+def run(backends, threads: int = 1, repeat: int = 20):
+    from app.nlp.embedding_backends import EMBEDDING_BACKEND_TOLERANCE
+
+    context = multiprocessing.get_context('spawn')
+    results = []
+    for backend_name in backends:
+        queue = context.Queue()
+        process = context.Process(target=measure_backend, args=(backend_name, threads, repeat, queue))
+        process.start()
+        results.append(queue.get())
+        process.join()
+
+    reference = next((r for r in results if r['backend'] == 'torch' and 'error' not in r), None)
+    for result in results:
+        if reference is None or 'error' in result:
+            continue
+        drift = max(abs(a - b) for a, b in zip(result['avg_similarity'], reference['avg_similarity']))
+        result['max_similarity_drift'] = round(drift, 4)
+        result['within_tolerance'] = drift <= EMBEDDING_BACKEND_TOLERANCE
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--backends', default='torch,onnx,onnx-int8')
+    parser.add_argument('--threads', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.backends.split(','), args.threads, args.repeat), indent=2))
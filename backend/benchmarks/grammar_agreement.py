@@ -0,0 +1,65 @@
+"""
+Agreement of the rule-based grammar fast path with labels and with LanguageTool
+
+The corpus (benchmarks/data/grammar_corpus.jsonl) holds hand-labelled counts of
+the errors LanguageTool's counted categories should report. LanguageTool columns
+are only filled in when a LanguageTool server or JVM is reachable.
+
+Run from backend/:  python -m benchmarks.grammar_agreement
+"""
+
+import json
+import os
+from app.config import settings
+from app.nlp.grammar_checker import GrammarChecker
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), 'data', 'grammar_corpus.jsonl')
+
+
+def load_corpus(path: str = CORPUS_PATH):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def agreement(predicted, expected):
+    exact = sum(1 for p, e in zip(predicted, expected) if p == e)
+    flagged_tp = sum(1 for p, e in zip(predicted, expected) if p > 0 and e > 0)
+    flagged_fp = sum(1 for p, e in zip(predicted, expected) if p > 0 and e == 0)
+    flagged_fn = sum(1 for p, e in zip(predicted, expected) if p == 0 and e > 0)
+    binary = sum(1 for p, e in zip(predicted, expected) if (p > 0) == (e > 0))
+    return {
+        'exact_count_agreement': round(exact / len(expected), 3),
+        'has_error_agreement': round(binary / len(expected), 3),
+        'has_error_precision': round(flagged_tp / (flagged_tp + flagged_fp), 3) if flagged_tp + flagged_fp else 1.0,
+        'has_error_recall': round(flagged_tp / (flagged_tp + flagged_fn), 3) if flagged_tp + flagged_fn else 1.0
+    }
+
+
+def run():
+    corpus = load_corpus()
+    labels = [item['errors'] for item in corpus]
+
+    settings.grammar_mode = 'languagetool'
+    checker = GrammarChecker()
+    rules = [checker._check_rules(item['text'], None) for item in corpus]
+    rule_counts = [r['error_count'] for r in rules]
+
+    report = {
+        'corpus_size': len(corpus),
+        'rules_vs_labels': agreement(rule_counts, labels),
+        'escalation_rate': round(
+            sum(1 for r in rules if r['confidence'] < settings.grammar_escalation_min_confidence) / len(rules), 3
+        )
+    }
+
+    if checker.available:
+        lt_results = [checker._check_languagetool(item['text']) for item in corpus]
+        if all(r['available'] for r in lt_results):
+            lt_counts = [r['error_count'] for r in lt_results]
+            report['languagetool_vs_labels'] = agreement(lt_counts, labels)
+            report['rules_vs_languagetool'] = agreement(rule_counts, lt_counts)
+    return report
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
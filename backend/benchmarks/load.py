@@ -0,0 +1,76 @@
+"""
+HTTP load test against the FastAPI app through an in-process ASGI client
+
+No server, sockets or external services: requests go straight into the app,
+so the numbers include routing, validation, the worker pool and
+serialization, but not the network. Requires httpx.
+
+Run from backend/:  python -m benchmarks.load [--requests N] [--concurrency 1,4,16]
+"""
+
+import argparse
+import asyncio
+import time
+from collections import Counter
+from typing import Dict, List
+from benchmarks.corpus import generate_corpus
+from benchmarks.report import configure_settings, environment, summarize, write_report
+
+
+async def _load(app, corpus: List[str], total: int, concurrency: int) -> Dict:
+    import httpx
+
+    latencies = []
+    statuses = Counter()
+    next_index = 0
+
+    async def client_loop(client):
+        nonlocal next_index
+        while next_index < total:
+            transcript = corpus[next_index % len(corpus)]
+            next_index += 1
+            start = time.perf_counter()
+            response = await client.post('/api/evaluate', json={'transcript': transcript})
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] += 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://benchmark', timeout=120) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        wall_seconds = time.perf_counter() - start
+
+    result = summarize(latencies, wall_seconds)
+    result['concurrency'] = concurrency
+    result['status_codes'] = {str(code): count for code, count in sorted(statuses.items())}
+    return result
+
+
+def run(corpus: List[str], total: int = 200, concurrency_levels=(1, 4, 16)) -> List[Dict]:
+    from app.main import app
+    from app.api.routes import pool
+
+    # Load the models up front rather than inside the first timed requests
+    pool.warm_up()
+    return [asyncio.run(_load(app, corpus, total, level)) for level in concurrency_levels]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--size', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', default='1,4,16')
+    parser.add_argument('--caches', action='store_true', help="Keep the result and embedding caches on")
+    parser.add_argument('--output', default=None)
+    args = parser.parse_args()
+
+    configure_settings(caches=args.caches)
+    write_report({
+        'environment': environment(),
+        'load': run(
+            generate_corpus(args.size, args.seed),
+            args.requests,
+            [int(level) for level in args.concurrency.split(',')]
+        )
+    }, args.output)
@@ -0,0 +1,77 @@
+"""
+In-process benchmark of SpeechScorer.evaluate and evaluate_many
+
+Reports end-to-end latency by transcript length, the mean time per stage,
+and batch throughput.
+
+Run from backend/:  python -m benchmarks.pipeline [--size N] [--repeat N]
+"""
+
+import argparse
+import statistics
+import time
+from typing import Dict, List
+from benchmarks.corpus import generate_corpus, group_by_length
+from benchmarks.report import configure_settings, environment, summarize, write_report
+
+
+def run(corpus: List[str], repeat: int = 3, batch_size: int = 50) -> Dict:
+    from app.scoring.scorer import SpeechScorer
+
+    scorer = SpeechScorer()
+    scorer.warm_up()
+
+    by_length = {}
+    stage_seconds = {}
+    all_latencies = []
+    for bucket, texts in group_by_length(corpus).items():
+        latencies = []
+        for _ in range(repeat):
+            for text in texts:
+                start = time.perf_counter()
+                _, durations = scorer.evaluate_timed(text)
+                latencies.append(time.perf_counter() - start)
+                for stage, seconds in durations.items():
+                    stage_seconds.setdefault(stage, []).append(seconds)
+        by_length[bucket] = summarize(latencies)
+        all_latencies.extend(latencies)
+
+    batch_latencies = []
+    batch_items = 0
+    for _ in range(repeat):
+        for start_index in range(0, len(corpus), batch_size):
+            batch = corpus[start_index:start_index + batch_size]
+            start = time.perf_counter()
+            scorer.evaluate_many(batch)
+            batch_latencies.append(time.perf_counter() - start)
+            batch_items += len(batch)
+
+    batch_summary = summarize(batch_latencies)
+    batch_summary['batch_size'] = batch_size
+    batch_summary['items_per_s'] = round(batch_items / sum(batch_latencies), 2) if batch_latencies else 0.0
+
+    return {
+        'evaluate': summarize(all_latencies),
+        'evaluate_by_length': by_length,
+        'stage_mean_ms': {
+            stage: round(statistics.mean(values) * 1000, 3) for stage, values in stage_seconds.items()
+        },
+        'evaluate_many': batch_summary
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--size', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument('--caches', action='store_true', help="Keep the result and embedding caches on")
+    parser.add_argument('--output', default=None)
+    args = parser.parse_args()
+
+    configure_settings(caches=args.caches)
+    write_report({
+        'environment': environment(),
+        'pipeline': run(generate_corpus(args.size, args.seed), args.repeat, args.batch_size)
+    }, args.output)
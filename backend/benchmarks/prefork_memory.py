@@ -0,0 +1,127 @@
+"""
+Per-worker memory of the pre-fork launcher, with and without shared models
+
+Starts `python -m app.serve` twice, once loading models in the master with a
+shared LanguageTool sidecar, and once loading models and LanguageTool in each
+worker. When the workers are ready, it reads the proportional set size (PSS)
+of every process in each tree from /proc/<pid>/smaps_rollup. PSS splits shared
+pages between the processes mapping them, so the tree total is the real memory
+cost, unlike summed RSS. Linux only.
+
+Run from backend/:  python -m benchmarks.prefork_memory [--workers N]
+"""
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import requests
+
+
+def memory_kb(pid: int) -> dict:
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ('Rss:', 'Pss:', 'Shared_Clean:', 'Private_Dirty:'):
+                values[parts[0].rstrip(':').lower()] = int(parts[1])
+    return values
+
+
+def process_tree(root: int) -> list:
+    parents = {}
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    # The command name may contain spaces, so split after its closing parenthesis
+                    parents[int(entry)] = int(f.read().rsplit(')', 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+
+    tree = [root]
+    for pid in tree:
+        tree.extend(child for child, parent in parents.items() if parent == pid)
+    return tree
+
+
+def wait_until_ready(port: int, workers: int, timeout: float) -> bool:
+    # Requests land on arbitrary workers, so insist on a run of ready answers
+    deadline = time.time() + timeout
+    streak = 0
+    while time.time() < deadline:
+        try:
+            ready = requests.get(f'http://127.0.0.1:{port}/api/ready', timeout=2).status_code == 200
+        except requests.RequestException:
+            ready = False
+        streak = streak + 1 if ready else 0
+        if streak >= workers * 4:
+            return True
+        time.sleep(0.25)
+    return False
+
+
+def measure(mode: str, workers: int, port: int, timeout: float) -> dict:
+    command = [sys.executable, '-m', 'app.serve', '--workers', str(workers), '--port', str(port),
+               '--host', '127.0.0.1', '--log-level', 'warning']
+    if mode == 'per-worker':
+        command += ['--no-preload', '--no-sidecar']
+
+    master = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        if not wait_until_ready(port, workers, timeout):
+            return {'mode': mode, 'error': 'workers did not become ready'}
+
+        # Exercise every model once per worker so lazily touched pages are counted
+        transcript = "Hello everyone, my name is Sam. I am fifteen years old and I love playing football."
+        for index in range(workers * 4):
+            requests.post(f'http://127.0.0.1:{port}/api/evaluate', json={'transcript': f"{transcript} ({index})"})
+
+        processes = []
+        for pid in process_tree(master.pid):
+            try:
+                with open(f'/proc/{pid}/comm') as f:
+                    name = f.read().strip()
+                processes.append({'pid': pid, 'name': name, **memory_kb(pid)})
+            except OSError:
+                continue
+
+        total_pss = sum(p['pss'] for p in processes)
+        return {
+            'mode': mode,
+            'workers': workers,
+            'total_pss_mb': round(total_pss / 1024, 1),
+            'pss_per_worker_mb': round(total_pss / 1024 / workers, 1),
+            'summed_rss_mb': round(sum(p['rss'] for p in processes) / 1024, 1),
+            'processes': processes
+        }
+    finally:
+        master.send_signal(signal.SIGTERM)
+        try:
+            master.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            master.kill()
+
+
+def run(workers: int, port: int, timeout: float):
+    results = [
+        measure('shared', workers, port, timeout),
+        measure('per-worker', workers, port, timeout)
+    ]
+    if all('error' not in r for r in results):
+        saved = results[1]['total_pss_mb'] - results[0]['total_pss_mb']
+        results.append({'saved_mb': round(saved, 1), 'saved_per_worker_mb': round(saved / workers, 1)})
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--timeout', type=float, default=300)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.workers, args.port, args.timeout), indent=2))
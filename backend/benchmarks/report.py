@@ -0,0 +1,108 @@
+"""
+Latency summaries and the JSON report shared by the benchmark suites
+"""
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+
+def configure_settings(caches: bool = False):
+    """
+    Settings for reproducible runs; call before the app or scorer is imported
+
+    Caches are off by default so every iteration measures real work instead
+    of cache hits on the repeated corpus.
+    """
+    from app.config import settings
+
+    settings.warm_up_on_startup = False
+    if not caches:
+        settings.result_cache_enabled = False
+        settings.embedding_cache_size = 0
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Linear-interpolated percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize(latencies: List[float], wall_seconds: float = None) -> Dict:
+    """
+    Latency distribution in milliseconds plus throughput
+
+    Args:
+        latencies: Per-operation durations in seconds
+        wall_seconds: Elapsed time for all operations; defaults to their sum
+            (pass the wall time when operations ran concurrently)
+    """
+    values = sorted(latencies)
+    wall_seconds = sum(values) if wall_seconds is None else wall_seconds
+    return {
+        'count': len(values),
+        'throughput_per_s': round(len(values) / wall_seconds, 2) if wall_seconds else 0.0,
+        'mean_ms': round(statistics.mean(values) * 1000, 3) if values else 0.0,
+        'p50_ms': round(percentile(values, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(values, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(values, 0.99) * 1000, 3),
+        'max_ms': round(values[-1] * 1000, 3) if values else 0.0
+    }
+
+
+def time_each(fn, inputs: List, repeat: int = 1) -> List[float]:
+    latencies = []
+    for _ in range(repeat):
+        for item in inputs:
+            start = time.perf_counter()
+            fn(item)
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def environment() -> Dict:
+    from app.config import settings
+
+    return {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'settings': {
+            'embedding_backend': settings.embedding_backend,
+            'grammar_mode': settings.grammar_mode,
+            'worker_pool_type': settings.worker_pool_type,
+            'worker_pool_size': settings.worker_pool_size,
+            'stage_workers': settings.stage_workers
+        }
+    }
+
+
+def write_report(report: Dict, path: str = None):
+    text = json.dumps(report, indent=2)
+    if path:
+        with open(path, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
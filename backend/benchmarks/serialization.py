@@ -0,0 +1,66 @@
+"""
+Cost of building and serializing evaluation responses
+
+Replays the analyses of real evaluations through SpeechScorer._build_response,
+then times JSON encoding with pydantic's model_dump_json against FastAPI's
+response_model path (validation plus jsonable_encoder), which the routes skip
+by returning the encoded bytes themselves, and the rebuild on a cache hit.
+
+Run from backend/:  python -m benchmarks.serialization [--size N] [--repeat N]
+"""
+
+import argparse
+import json
+from typing import Dict, List
+from benchmarks.corpus import generate_corpus
+from benchmarks.report import configure_settings, environment, summarize, time_each, write_report
+
+
+def run(corpus: List[str], repeat: int = 3) -> Dict:
+    from fastapi.encoders import jsonable_encoder
+    from app.models import EvaluationResponse
+    from app.scoring.scorer import SpeechScorer
+
+    scorer = SpeechScorer()
+    scorer.warm_up()
+
+    # Record what _build_response receives for each transcript, then replay it
+    build = scorer._build_response
+    captured = []
+
+    def capture(*args):
+        captured.append(args)
+        return build(*args)
+
+    scorer._build_response = capture
+    for text in corpus:
+        scorer.evaluate(text)
+    scorer._build_response = build
+
+    results = {'build': summarize(time_each(lambda args: build(*args), captured, repeat))}
+    responses = [build(*args) for args in captured]
+    results['model_dump_json'] = summarize(time_each(lambda r: r.model_dump_json(), responses, repeat))
+    results['response_model'] = summarize(time_each(
+        lambda r: json.dumps(jsonable_encoder(EvaluationResponse.model_validate(r.model_dump()))),
+        responses,
+        repeat
+    ))
+    dumps = [r.model_dump() for r in responses]
+    results['cache_hit'] = summarize(time_each(lambda d: EvaluationResponse(**d), dumps, repeat))
+    results['response_bytes'] = round(sum(len(r.model_dump_json()) for r in responses) / len(responses))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--size', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', default=None)
+    args = parser.parse_args()
+
+    configure_settings()
+    write_report({
+        'environment': environment(),
+        'serialization': run(generate_corpus(args.size, args.seed), args.repeat)
+    }, args.output)
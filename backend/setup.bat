@@ -34,12 +34,12 @@ if %errorlevel% neq 0 (
 echo ✓ Dependencies installed
 echo.
 
-echo Step 4: Downloading NLTK data...
-python -c "import nltk; nltk.download('punkt'); nltk.download('punkt_tab')"
+echo Step 4: Downloading models...
+python -m app.prefetch
 if %errorlevel% neq 0 (
-    echo Warning: NLTK download may have failed
+    echo Warning: Model download may have failed
 )
-echo ✓ NLTK data downloaded
+echo ✓ Models downloaded
 echo.
 
 echo Step 5: Creating .env file...
@@ -0,0 +1,82 @@
+"""
+Results missing a model-backed stage must be flagged as degraded and never cached
+"""
+
+import pytest
+import requests
+from app.scoring.scorer import SpeechScorer
+
+TRANSCRIPT = (
+    "Hello everyone! My name is Sarah and I am 15 years old. I study at Lincoln "
+    "High School in grade 10. I live with my parents and my younger brother. "
+    "I love reading books and playing basketball on weekends. Thank you for listening!"
+)
+
+
+class TimingOutClient:
+    """A LanguageTool client whose every request times out"""
+
+    def check(self, text):
+        raise requests.Timeout("read timed out")
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def scorer(monkeypatch):
+    scorer = SpeechScorer()
+    if scorer.result_cache is None:
+        pytest.skip("result cache is disabled")
+    checker = scorer.grammar_checker
+    monkeypatch.setattr(checker, 'mode', 'languagetool')
+    monkeypatch.setattr(checker, '_loaded', True)
+    monkeypatch.setattr(checker, 'client', TimingOutClient())
+    # Coherence comes back normally, so only grammar is degraded
+    monkeypatch.setattr(
+        scorer.semantic_analyzer,
+        'analyze_coherence',
+        lambda sentences, tables=None: {'coherence_score': 80.0, 'avg_similarity': 0.5, 'flow_quality': 'Good'}
+    )
+    monkeypatch.setattr(
+        scorer.semantic_analyzer,
+        'analyze_coherence_many',
+        lambda sentence_lists, tables=None: [
+            {'coherence_score': 80.0, 'avg_similarity': 0.5, 'flow_quality': 'Good'} for _ in sentence_lists
+        ]
+    )
+    return scorer
+
+
+def cache_key(scorer, transcript):
+    return scorer._cache_key(scorer.preprocessor.clean_text(transcript), scorer.rubrics.get())
+
+
+def test_languagetool_timeout_is_degraded_and_not_cached(scorer):
+    result = scorer.evaluate(TRANSCRIPT)
+
+    assert result.degraded_stages == ['grammar']
+    assert not result.detailed_analysis.grammar_available
+    assert scorer.result_cache.get(cache_key(scorer, TRANSCRIPT)) is None
+
+
+def test_languagetool_timeout_in_batch_is_degraded_and_not_cached(scorer):
+    items = scorer.evaluate_many([TRANSCRIPT])
+
+    assert items[0].result.degraded_stages == ['grammar']
+    assert scorer.result_cache.get(cache_key(scorer, TRANSCRIPT)) is None
+
+
+def test_missing_embedding_model_is_degraded_and_not_cached(monkeypatch):
+    scorer = SpeechScorer()
+    if scorer.result_cache is None:
+        pytest.skip("result cache is disabled")
+    monkeypatch.setattr(scorer.grammar_checker, 'mode', 'rules')
+    # As when downloads are off and the model was never prefetched
+    monkeypatch.setattr(scorer.semantic_analyzer, '_loaded', True)
+    monkeypatch.setattr(scorer.semantic_analyzer, '_backend', None)
+
+    result = scorer.evaluate(TRANSCRIPT)
+
+    assert result.degraded_stages == ['semantic']
+    assert scorer.result_cache.get(cache_key(scorer, TRANSCRIPT)) is None
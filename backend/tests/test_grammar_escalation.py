@@ -0,0 +1,66 @@
+"""
+Hybrid mode: only low-confidence texts are scored by LanguageTool; sampled texts are shadow-checked
+"""
+
+import pytest
+from app.nlp.grammar_checker import GrammarChecker
+
+CLEAN_TEXT = "My name is Sarah. I live with my parents and my younger brother."
+
+
+class OneErrorClient:
+    """A LanguageTool client that reports one grammar error in every text"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def check(self, text):
+        self.calls += 1
+        return [{
+            'offset': 0, 'length': 2, 'message': 'Possible error', 'context': text,
+            'replacements': [], 'issue_type': 'grammar'
+        }]
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def checker(monkeypatch):
+    checker = GrammarChecker()
+    monkeypatch.setattr(checker, 'mode', 'hybrid')
+    monkeypatch.setattr(checker, '_loaded', True)
+    monkeypatch.setattr(checker, 'client', OneErrorClient())
+    monkeypatch.setattr(checker.policy, 'min_confidence', 0.0)
+    # Every confident text is sampled
+    monkeypatch.setattr(checker.policy, 'sample_rate', 1.0)
+    return checker
+
+
+def test_sampled_text_keeps_fast_path_score(checker):
+    result = checker.check_grammar(CLEAN_TEXT)
+
+    assert checker.client.calls == 1
+    assert result['source'] == 'rules'
+    assert result['error_count'] == 0
+    assert checker.shadow_stats()['disagreed'] == 1
+
+
+def test_sampled_batch_keeps_fast_path_scores(checker):
+    results = checker.check_grammar_many([CLEAN_TEXT, CLEAN_TEXT])
+
+    assert [result['source'] for result in results] == ['rules', 'rules']
+    # One batched round-trip; its single match lands in the first text
+    assert checker.client.calls == 1
+    assert checker.shadow_stats()['agreed'] == 1
+    assert checker.shadow_stats()['disagreed'] == 1
+
+
+def test_low_confidence_text_is_scored_by_languagetool(checker, monkeypatch):
+    monkeypatch.setattr(checker.policy, 'min_confidence', 1.1)
+
+    result = checker.check_grammar(CLEAN_TEXT)
+
+    assert result['source'] == 'languagetool'
+    assert result['error_count'] == 1
+    assert checker.shadow_stats()['disagreed'] == 0
@@ -0,0 +1,73 @@
+"""
+Rule-based grammar fast path: each rule, and the false positives it must not raise
+"""
+
+import pytest
+from app.nlp.rule_grammar import RuleBasedGrammarChecker
+
+
+def counted(text):
+    """Matches that count as errors, as (issue type, flagged text) pairs"""
+    matches = RuleBasedGrammarChecker().check(text)
+    return [
+        (m['issue_type'], text[m['offset']:m['offset'] + m['length']])
+        for m in matches if m['issue_type'] != 'duplication'
+    ]
+
+
+def test_clean_text_has_no_errors():
+    assert counted("I live with my parents. We have a dog and an old cat.") == []
+
+
+def test_common_misspelling():
+    assert counted("I go to scool every day.") == [('misspelling', 'scool')]
+
+
+def test_real_words_are_not_misspellings():
+    assert counted("I cant say it. The wont of the town.") == []
+
+
+def test_contraction_is_not_a_misspelling():
+    assert counted("I don't know. That's fine.") == []
+
+
+def test_lowercase_pronoun():
+    assert counted("Yesterday i went home.") == [('misspelling', 'i')]
+
+
+def test_lowercase_sentence_start():
+    assert counted("We left. then we ate.") == [('typographical', 'then')]
+
+
+def test_repeated_word_is_reported_but_not_counted():
+    matches = RuleBasedGrammarChecker().check("I like the the park.")
+    assert [m['issue_type'] for m in matches] == ['duplication']
+
+
+@pytest.mark.parametrize('phrase', [
+    "a apple", "an banana", "a hour", "an university", "an one-time offer"
+])
+def test_article_errors(phrase):
+    assert counted(f"It was {phrase}.") == [('misspelling', phrase.split()[0])]
+
+
+@pytest.mark.parametrize('phrase', [
+    "an unimportant", "an uninvited", "an unusual", "an urgent", "an utter",
+    "an onerous", "a unique", "a unit", "a university", "a usual", "a utility",
+    "a uranium", "a European", "an honest", "a one-time"
+])
+def test_article_sound_exceptions(phrase):
+    assert counted(f"It was {phrase} thing.") == []
+
+
+@pytest.mark.parametrize('text', [
+    "It is short, i.e. the point is clear.",
+    "It is short, i.e. The point is clear.",
+    "We study A.I. in class.",
+    "We study A.I. and robots.",
+    "Bring fruit, e.g. apples.",
+    "e.g. apples are fruit.",
+    "I met Mr. smith today.",
+])
+def test_abbreviations_are_not_errors(text):
+    assert counted(text) == []
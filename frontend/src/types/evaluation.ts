@@ -9,12 +9,14 @@ export interface CriterionScore {
     feedback: string;
     weight: number;
     percentage: number;
+    available?: boolean;
 }
 
 export interface DetailedAnalysis {
     keywords_found: string[];
     keywords_missing: string[];
     grammar_errors: number;
+    grammar_available?: boolean;
     grammar_error_rate: number;
     filler_words_count: number;
     filler_word_rate: number;
@@ -22,6 +24,7 @@ export interface DetailedAnalysis {
     vocabulary_richness: number;
     speech_rate_wpm: number;
     salutation_detected: string | null;
+    coherence_metrics?: Record<string, number> | null;
 }
 
 export interface EvaluationResponse {
@@ -32,6 +35,7 @@ export interface EvaluationResponse {
     criteria_scores: CriterionScore[];
     detailed_analysis: DetailedAnalysis;
     summary: string;
+    degraded_stages?: string[];
 }
 
 export interface TranscriptRequest {